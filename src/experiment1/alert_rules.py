@@ -0,0 +1,196 @@
+"""阈值告警规则引擎：在流式采样上判断"持续超过阈值"，每个样本 O(1)，不回扫历史"""
+import json
+import operator
+import re
+from collections import namedtuple
+
+from process_collector import SystemSample
+
+OPERATORS = {'>': operator.gt, '>=': operator.ge, '<': operator.lt, '<=': operator.le}
+UNITS = {'': 1, 'k': 1024, 'm': 1024 ** 2, 'g': 1024 ** 3}
+# 可用于规则的指标；可选列只有在采集时（列可见或 --columns 指定）才会被判断
+PROCESS_METRICS = ('cpu', 'rss', 'io_read', 'io_write', 'threads', 'fds', 'nice')
+SYSTEM_METRICS = tuple(f for f in SystemSample._fields if f != 'timestamp')
+
+# kind 为 'fired'（开始告警）或 'resolved'（恢复）；系统规则的 pid 为 None
+AlertEvent = namedtuple('AlertEvent', 'timestamp rule kind pid name value')
+
+_NUMBER = r'(\d+(?:\.\d*)?|\.\d+)'
+_RULE_RE = re.compile(
+    r'^\s*(?:(system)\.)?(\w+)\s*(>=|<=|>|<)\s*' + _NUMBER + r'\s*([kmg]?)b?'
+    r'(?:\s+for\s+' + _NUMBER + r'\s*s?)?\s*$', re.IGNORECASE)
+
+
+class AlertRule(object):
+    """一条阈值规则：metric 连续 duration 秒满足 op threshold 时告警
+
+    每条规则只为当前满足条件的进程保存状态（开始满足的时间、是否已告警），
+    不满足条件的进程只付出一次比较的代价。
+    """
+
+    def __init__(self, metric, op, threshold, duration=0.0, system=False,
+                 name=None, max_gap=None):
+        self.metric = metric
+        self.op = op
+        self.threshold = threshold
+        self.duration = duration
+        self.system = system
+        self.name = name or self.describe()
+        # 两次样本间隔超过 max_gap 秒（例如窗口隐藏时暂停采集）视为不连续，重新计时
+        self.max_gap = max_gap
+        self.active = {}        # (pid, create_time) -> [开始满足的时间, 是否已告警, 名称]
+        self.last_time = None
+
+    def describe(self):
+        prefix = 'system.' if self.system else ''
+        text = f"{prefix}{self.metric} {self.op} {_format_threshold(self.metric, self.threshold)}"
+        return f"{text} for {self.duration:g}s" if self.duration else text
+
+    def _continuous(self, timestamp):
+        last, self.last_time = self.last_time, timestamp
+        return last is None or self.max_gap is None or timestamp - last <= self.max_gap
+
+    def evaluate_system(self, sample, events):
+        value = getattr(sample, self.metric)
+        now = sample.timestamp
+        if not self._continuous(now):
+            self._reset(now)
+        self._step(None, None, 'system', value, OPERATORS[self.op](value, self.threshold),
+                   now, self.active, events)
+
+    def evaluate_snapshot(self, snapshot, events):
+        column = snapshot.extra.get(self.metric)
+        if column is None:
+            column = getattr(snapshot, self.metric, None)
+            if column is None:
+                return  # 可选列本次没有采集，保持原状态
+        now = snapshot.timestamp
+        if not self._continuous(now):
+            self._reset(now)
+        test = OPERATORS[self.op]
+        threshold = self.threshold
+        previous = self.active
+        active = {}
+        pids, create_times, names = snapshot.pid, snapshot.create_time, snapshot.name
+        # 先用一次线性扫描筛出满足条件的行，其余进程不产生任何状态
+        for i in [i for i, v in enumerate(column) if v is not None and test(v, threshold)]:
+            key = (pids[i], create_times[i])
+            state = previous.pop(key, None)
+            if state is None:
+                state = [now, False, names[i]]
+            active[key] = state
+            if not state[1] and now - state[0] >= self.duration:
+                state[1] = True
+                events.append(AlertEvent(now, self, 'fired', key[0], names[i], column[i]))
+        # 剩下的是不再满足条件或已经退出的进程
+        for (pid, create_time), state in previous.items():
+            if state[1]:
+                events.append(AlertEvent(now, self, 'resolved', pid, state[2], None))
+        self.active = active
+
+    def _step(self, key, pid, name, value, matched, now, active, events):
+        state = active.get(key)
+        if not matched:
+            if state is not None:
+                del active[key]
+                if state[1]:
+                    events.append(AlertEvent(now, self, 'resolved', pid, name, value))
+            return
+        if state is None:
+            state = active[key] = [now, False, name]
+        if not state[1] and now - state[0] >= self.duration:
+            state[1] = True
+            events.append(AlertEvent(now, self, 'fired', pid, name, value))
+
+    def _reset(self, now):
+        """采样中断：已告警的保持，尚未告警的从现在重新计时"""
+        for state in self.active.values():
+            if not state[1]:
+                state[0] = now
+
+    def firing(self):
+        return [(key, state[2]) for key, state in self.active.items() if state[1]]
+
+
+def _format_threshold(metric, value):
+    if metric in ('rss', 'mem_used', 'mem_total') and value >= 1024 ** 2:
+        for unit, size in (('G', 1024 ** 3), ('M', 1024 ** 2)):
+            if value >= size:
+                return f"{value / size:.4g}{unit}"
+    return f"{value:.4g}"
+
+
+def parse_rule(text, max_gap=None):
+    """解析规则文本，例如 "rss > 2G for 30s"、"cpu >= 90 for 60"、"system.mem_percent > 95\""""
+    match = _RULE_RE.match(text)
+    if match is None:
+        raise ValueError(f"无法解析告警规则: {text}")
+    system, metric, op, number, unit, duration = match.groups()
+    metric = metric.lower()
+    if metric not in (SYSTEM_METRICS if system else PROCESS_METRICS):
+        raise ValueError(f"未知的指标: {metric}")
+    threshold = float(number) * UNITS[unit.lower()]
+    return AlertRule(metric, op, threshold, float(duration or 0),
+                     system=bool(system), max_gap=max_gap)
+
+
+class AlertEngine(object):
+    """管理一组规则，把系统样本和进程快照分派给对应的规则"""
+
+    DEFAULT_RULES = ("rss > 2G for 30s", "cpu > 90 for 30s")
+
+    def __init__(self, rules=(), max_gap=None):
+        self.rules = []
+        self.max_gap = max_gap
+        for rule in rules:
+            self.add_rule(rule)
+
+    def add_rule(self, rule):
+        if isinstance(rule, str):
+            rule = parse_rule(rule, self.max_gap)
+        self.rules.append(rule)
+        return rule
+
+    def evaluate_system(self, sample):
+        events = []
+        for rule in self.rules:
+            if rule.system:
+                rule.evaluate_system(sample, events)
+        return events
+
+    def evaluate_snapshot(self, snapshot):
+        events = []
+        for rule in self.rules:
+            if not rule.system:
+                rule.evaluate_snapshot(snapshot, events)
+        return events
+
+
+def format_event(event):
+    """告警事件的单行中文描述"""
+    target = "系统" if event.pid is None else f"{event.name} (PID {event.pid})"
+    if event.kind == 'resolved':
+        return f"已恢复: {target} {event.rule.name}"
+    value = _format_threshold(event.rule.metric, event.value)
+    return f"告警: {target} {event.rule.name}，当前值 {value}"
+
+
+def event_record(event):
+    """转换为可序列化的字典，供日志使用"""
+    return {'timestamp': round(event.timestamp, 3), 'rule': event.rule.name,
+            'kind': event.kind, 'pid': event.pid, 'name': event.name,
+            'value': event.value}
+
+
+class AlertLog(object):
+    """把告警事件逐条追加到 JSON Lines 文件"""
+
+    def __init__(self, path):
+        self._file = open(path, 'a', encoding='utf-8', buffering=1)
+
+    def write(self, events):
+        for event in events:
+            self._file.write(json.dumps(event_record(event), ensure_ascii=False) + '\n')
+
+    def close(self):
+        self._file.close()
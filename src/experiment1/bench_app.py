@@ -0,0 +1,174 @@
+"""任务管理器整体刷新基准：用合成采集器驱动完整界面（offscreen），
+报告刷新延迟、内存增长和掉帧，可设置阈值在性能回退时返回非零退出码"""
+import argparse
+import os
+import random
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import psutil
+from PyQt5 import QtCore, QtWidgets
+
+import close_app
+from bench_refresh import churn, make_snapshot
+from pipeline_profiler import RollingStats
+
+# 界面帧预算（毫秒），心跳间隔超过它的整数倍即视为掉帧
+FRAME_MS = 1000 / 60
+
+
+class FakeCollector(object):
+    """合成进程采集器：每次采集按 churn_rate 替换一部分进程"""
+
+    def __init__(self, size, churn_rate=0.02, active_ratio=0.1, seed=0):
+        self.rng = random.Random(seed)
+        self.pids = list(range(1, size + 1))
+        self.next_pid = size + 1
+        self.churn_rate = churn_rate
+        self.active_ratio = active_ratio
+        self.columns = ()
+        self.first = True
+
+    def collect(self):
+        if self.first:
+            self.first = False
+        else:
+            self.pids, self.next_pid = churn(self.pids, self.next_pid,
+                                             self.churn_rate, self.rng)
+        return make_snapshot(self.pids, self.rng, self.active_ratio)
+
+
+def percentile(values, p):
+    stats = RollingStats(len(values) or 1)
+    for value in values:
+        stats.add(value)
+    result = stats.percentiles((p,))
+    return result[0] if result else 0.0
+
+
+def bench(size, ticks=20, interval=200, churn_rate=0.02, tree=False, seed=0):
+    """驱动 ticks 次进程刷新，返回结果字典（时间单位毫秒，内存单位 MB）"""
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication(sys.argv[:1])
+    dialog = QtWidgets.QDialog()
+    ui = close_app.Ui_Dialog()
+    ui.collector = FakeCollector(size, churn_rate, seed=seed)
+    # 只由基准自己发起进程刷新：首次绘制后只采集一次，不启动自适应刷新
+    ui.auto_refresh = False
+    ui.setupUi(dialog)
+    dialog.show()
+    if tree:
+        ui.treeModeBox.setChecked(True)
+    ui.processTable.sortByColumn(ui.processModel.COL_CPU, QtCore.Qt.DescendingOrder)
+
+    loop = QtCore.QEventLoop()
+    pending = []       # 尚未完成的请求时间
+    latencies = []
+    heartbeats = []
+
+    def on_sampled(snapshot):
+        # 在界面处理函数之后连接，因此包含模型/树/历史的更新时间
+        if pending:
+            latencies.append((time.perf_counter() - pending.pop(0)) * 1000)
+        if len(latencies) >= ticks:
+            QtCore.QTimer.singleShot(100, loop.quit)  # 留出最后一次重绘的时间
+
+    def request():
+        if len(latencies) + len(pending) >= ticks:
+            return
+        if ui.sampler.request_processes():
+            pending.append(time.perf_counter())
+
+    # 先完成首次填充，再开始计量；启动卡住时直接报错，而不是带着空结果继续
+    first = QtCore.QEventLoop()
+    ui.sampler.processesSampled.connect(lambda s: first.quit())
+    QtCore.QTimer.singleShot(30000, first.quit)
+    first.exec_()
+    if ui.last_snapshot is None:
+        raise RuntimeError(f"30 秒内没有收到首个进程快照（启动阶段 {ui.startup.summary()}）")
+    deadline = time.perf_counter() + 30
+    while 'full' not in ui.startup.marks:
+        if time.perf_counter() > deadline:
+            raise RuntimeError(f"30 秒内首个快照没有全部显示（启动阶段 {ui.startup.summary()}）")
+        app.processEvents()
+    ui.sampler.processesSampled.connect(on_sampled)
+    app.processEvents()
+    startup = ui.startup.summary()
+    ui.profiler.stages.clear()
+    rss_start = psutil.Process().memory_info().rss
+
+    heartbeat = QtCore.QTimer()
+    heartbeat.setTimerType(QtCore.Qt.PreciseTimer)
+    heartbeat.timeout.connect(lambda: heartbeats.append(time.perf_counter()))
+    heartbeat.start(int(FRAME_MS))
+    ticker = QtCore.QTimer()
+    ticker.timeout.connect(request)
+    ticker.start(interval)
+    QtCore.QTimer.singleShot(max(60000, ticks * interval * 10), loop.quit)
+    request()
+    loop.exec_()
+    ticker.stop()
+    heartbeat.stop()
+
+    rss_end = psutil.Process().memory_info().rss
+    dropped_frames = sum(max(0, int((b - a) * 1000 / FRAME_MS) - 1)
+                         for a, b in zip(heartbeats, heartbeats[1:]))
+    summary = ui.profiler.summary()
+    result = {
+        'size': size,
+        'tree': tree,
+        'ticks': len(latencies),
+        'latency_p50': percentile(latencies, 50),
+        'latency_p95': percentile(latencies, 95),
+        'latency_max': max(latencies, default=0.0),
+        'paint_p95': summary.get('paint', {}).get('p95_ms', 0.0),
+        'rss_growth_mb': (rss_end - rss_start) / (1024 * 1024),
+        'dropped_frames': dropped_frames,
+        'dropped_requests': ui.sampler.processes.dropped,
+        'stages': summary,
+        'startup': startup,
+    }
+    ui.sampler.stop()
+    dialog.close()
+    dialog.deleteLater()
+    app.processEvents()
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="任务管理器整体刷新基准（合成进程数据）")
+    parser.add_argument("sizes", type=int, nargs="*", default=[1000, 5000, 20000],
+                        help="合成进程数")
+    parser.add_argument("--ticks", type=int, default=20, help="每组测量的刷新次数")
+    parser.add_argument("--interval", type=int, default=200, help="刷新请求间隔（毫秒）")
+    parser.add_argument("--churn", type=float, default=0.02, help="每次刷新替换的进程比例")
+    parser.add_argument("--tree", action="store_true", help="同时测量树状视图")
+    parser.add_argument("--stages", action="store_true", help="输出各阶段的耗时百分位")
+    parser.add_argument("--fail-p95", type=float, default=0,
+                        help="刷新延迟 p95 超过此毫秒数时返回非零退出码")
+    args = parser.parse_args(argv)
+
+    print(f"{'进程数':>8} {'树':>3} {'p50(ms)':>9} {'p95(ms)':>9} {'最长(ms)':>9} "
+          f"{'重绘p95':>8} {'内存增长(MB)':>12} {'掉帧':>5} {'丢弃请求':>6}")
+    failed = False
+    for size in args.sizes:
+        for tree in ((False, True) if args.tree else (False,)):
+            r = bench(size, args.ticks, args.interval, args.churn, tree)
+            print(f"{size:>11} {'是' if tree else '否':>3} {r['latency_p50']:>9.1f} "
+                  f"{r['latency_p95']:>9.1f} {r['latency_max']:>10.1f} {r['paint_p95']:>11.1f} "
+                  f"{r['rss_growth_mb']:>16.1f} {r['dropped_frames']:>7} "
+                  f"{r['dropped_requests']:>10}")
+            if args.stages:
+                print(f"{'':>12}启动: " + "  ".join(
+                    f"{name} {ms:.1f}ms" for name, ms in r['startup'].items()))
+                for stage, item in r['stages'].items():
+                    print(f"{'':>12}{stage:<10} p50 {item['p50_ms']:>8.2f}  "
+                          f"p95 {item['p95_ms']:>8.2f}")
+            if args.fail_p95 and r['latency_p95'] > args.fail_p95:
+                failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
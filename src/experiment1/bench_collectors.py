@@ -0,0 +1,40 @@
+"""采集后端基准：在同一台机器上比较 psutil 与 /proc 直读两种采集器"""
+import sys
+import time
+
+from process_collector import ProcFsCollector, PsutilCollector
+
+
+def bench(collector, rounds=10):
+    """返回 (进程数, 每轮平均耗时秒)；第一轮用于建立缓存，不计时"""
+    collector.collect()
+    elapsed = 0.0
+    count = 0
+    for _ in range(rounds):
+        start = time.perf_counter()
+        snapshot = collector.collect()
+        elapsed += time.perf_counter() - start
+        count = len(snapshot)
+    return count, elapsed / rounds
+
+
+def main(rounds=10):
+    collectors = [("psutil", PsutilCollector())]
+    if ProcFsCollector.available():
+        collectors.append(("procfs", ProcFsCollector()))
+    else:
+        print("当前平台不支持 procfs 后端，仅测试 psutil")
+
+    print(f"{'后端':>8} {'进程数':>8} {'每轮(ms)':>10} {'每进程(us)':>12}")
+    results = {}
+    for name, collector in collectors:
+        count, elapsed = bench(collector, rounds)
+        results[name] = elapsed
+        print(f"{name:>10} {count:>10} {elapsed * 1000:>12.2f} "
+              f"{elapsed / max(count, 1) * 1e6:>14.1f}")
+    if len(results) == 2:
+        print(f"procfs 相对 psutil 加速 {results['psutil'] / results['procfs']:.1f} 倍")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10)
@@ -0,0 +1,64 @@
+"""逐核 CPU 计算基准：合成 8~512 核的 /proc/stat，比较 numpy 矩阵计算与逐核 Python 计算
+（psutil.cpu_times_percent(percpu=True) 的做法）每次采样的耗时"""
+import argparse
+import sys
+import time
+
+from cpu_cores import STAT_FIELDS, compute_sample, parse_proc_stat
+
+
+def make_stat(cores, tick):
+    """合成一份 /proc/stat，累计时间随 tick 增长"""
+    lines = [b'cpu  0 0 0 0 0 0 0 0 0 0']
+    for i in range(cores):
+        lines.append(b'cpu%d %d %d %d %d %d %d %d %d 0 0' % (
+            i, tick * (i % 7 + 1), tick // 9, tick * 2, tick * 5, tick // 3,
+            tick // 50, tick // 20, tick // 10))
+    lines.append(b'intr 0')
+    lines.append(b'ctxt 0')
+    return b'\n'.join(lines) + b'\n'
+
+
+def python_percent(previous, current):
+    """逐核、逐字段的纯 Python 计算，作为对照"""
+    result = []
+    for line_a, line_b in zip(previous.split(b'\n')[1:], current.split(b'\n')[1:]):
+        if not line_b.startswith(b'cpu'):
+            break
+        a = [float(v) for v in line_a.split()[1:len(STAT_FIELDS) + 1]]
+        b = [float(v) for v in line_b.split()[1:len(STAT_FIELDS) + 1]]
+        delta = [max(y - x, 0.0) for x, y in zip(a, b)]
+        total = sum(delta) or 1.0
+        result.append({name: round(d / total * 100, 1) for name, d in zip(STAT_FIELDS, delta)})
+    return result
+
+
+def timed(func, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="逐核 CPU 计算基准")
+    parser.add_argument("cores", type=int, nargs="*", default=[8, 32, 128, 512])
+    parser.add_argument("--repeat", type=int, default=500)
+    args = parser.parse_args(argv)
+
+    print(f"{'核数':>6} {'numpy(us)':>10} {'逐核 Python(us)':>16}")
+    for cores in args.cores:
+        previous, current = make_stat(cores, 1000), make_stat(cores, 1100)
+
+        def vectorized():
+            ids, a = parse_proc_stat(previous)
+            ids, b = parse_proc_stat(current)
+            compute_sample(ids, b - a)
+
+        print(f"{cores:>8} {timed(vectorized, args.repeat):>10.1f} "
+              f"{timed(lambda: python_percent(previous, current), args.repeat):>18.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
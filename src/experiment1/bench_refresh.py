@@ -0,0 +1,164 @@
+"""进程表格刷新性能基准：用合成进程数据测量模型增量更新的耗时"""
+import os
+import random
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5 import QtCore, QtWidgets
+
+from process_collector import ProcessSnapshot
+from process_model import ProcessTableModel, ProcessFilterProxyModel
+from process_search import ProcessSearchIndex
+from process_tree import ProcessTreeModel, ProcessTreeProxyModel
+from snapshot_recorder import read_frames
+
+
+def make_snapshot(pids, rng, active_ratio):
+    """按给定 PID 列表生成一份快照，只有 active_ratio 比例的进程数值在变化"""
+    snapshot = ProcessSnapshot()
+    for pid in pids:
+        if rng.random() < active_ratio:
+            cpu = round(rng.random() * 100, 1)
+            rss = rng.randrange(1 << 20, 1 << 30)
+        else:
+            cpu = 0.0
+            rss = (pid * 2654435761) % (1 << 30)
+        snapshot.append(pid, f"proc-{pid % 997}", "sleeping", cpu, rss, 1.7e9 + pid,
+                        f"user{pid % 7}", pid // 8)
+    return snapshot
+
+
+def churn(pids, next_pid, rate, rng):
+    """按比例结束旧进程、启动新进程，返回新的 PID 列表和下一个 PID"""
+    pids = list(pids)
+    count = int(len(pids) * rate)
+    for i in rng.sample(range(len(pids)), count):
+        pids[i] = next_pid
+        next_pid += 1
+    return pids, next_pid
+
+
+def bench(size, rounds=5, churn_rate=0.02, active_ratio=0.1, sort=True, seed=0):
+    """返回 (首次填充耗时, 平均增量刷新耗时)，单位秒"""
+    rng = random.Random(seed)
+    model = ProcessTableModel()
+    proxy = ProcessFilterProxyModel()
+    proxy.setSourceModel(model)
+    if sort:
+        proxy.sort(ProcessTableModel.COL_CPU, QtCore.Qt.DescendingOrder)
+
+    pids = list(range(1, size + 1))
+    next_pid = size + 1
+
+    start = time.perf_counter()
+    model.update_snapshot(make_snapshot(pids, rng, active_ratio))
+    fill = time.perf_counter() - start
+
+    elapsed = 0.0
+    for _ in range(rounds):
+        pids, next_pid = churn(pids, next_pid, churn_rate, rng)
+        snapshot = make_snapshot(pids, rng, active_ratio)
+        start = time.perf_counter()
+        model.update_snapshot(snapshot)
+        # 代理模型在布局变化后才按需重建映射，读取行数使这部分开销计入本次刷新
+        proxy.rowCount()
+        elapsed += time.perf_counter() - start
+
+    # 校验索引与行内容一致
+    for pid in pids[::max(1, size // 100)]:
+        assert model.pid_at(model.row_of(pid)) == pid
+    return fill, elapsed / rounds
+
+
+def bench_tree(size, rounds=5, churn_rate=0.02, active_ratio=0.1, seed=0):
+    """树状视图：与 close_app 一样接上按合计 CPU 排序、递归过滤的代理模型，
+    返回 (首次填充耗时, 平均增量刷新耗时)，单位秒"""
+    rng = random.Random(seed)
+    model = ProcessTreeModel(ProcessSearchIndex())
+    proxy = ProcessTreeProxyModel()
+    proxy.setSourceModel(model)
+    proxy.sort(ProcessTreeModel.COL_TOTAL_CPU, QtCore.Qt.DescendingOrder)
+
+    pids = list(range(1, size + 1))
+    next_pid = size + 1
+
+    start = time.perf_counter()
+    model.update_snapshot(make_snapshot(pids, rng, active_ratio))
+    proxy.rowCount()
+    fill = time.perf_counter() - start
+
+    elapsed = 0.0
+    for _ in range(rounds):
+        pids, next_pid = churn(pids, next_pid, churn_rate, rng)
+        snapshot = make_snapshot(pids, rng, active_ratio)
+        start = time.perf_counter()
+        model.update_snapshot(snapshot)
+        proxy.rowCount()
+        elapsed += time.perf_counter() - start
+
+    # 校验增量合计与完整重算一致
+    totals = model.recompute_totals()
+    for pid in pids[::max(1, size // 100)]:
+        node = model._nodes[pid]
+        assert abs(totals[pid][0] - node.total_cpu) < 1e-6 and totals[pid][1] == node.total_rss
+    return fill, elapsed / rounds
+
+
+def bench_replay(path, sort=True):
+    """用录制文件中的真实快照序列重放模型更新，返回 (帧数, 平均耗时, 最大耗时)"""
+    model = ProcessTableModel()
+    proxy = ProcessFilterProxyModel()
+    proxy.setSourceModel(model)
+    if sort:
+        proxy.sort(ProcessTableModel.COL_CPU, QtCore.Qt.DescendingOrder)
+    times = []
+    for frame in read_frames(path):
+        if not isinstance(frame, ProcessSnapshot):
+            continue
+        start = time.perf_counter()
+        model.update_snapshot(frame)
+        proxy.rowCount()
+        times.append(time.perf_counter() - start)
+    if not times:
+        return 0, 0.0, 0.0
+    # 第一帧是首次填充，不计入增量刷新
+    rest = times[1:] or times
+    return len(times), sum(rest) / len(rest), max(rest)
+
+
+def replay_main(path):
+    print(f"{'排序':>4} {'帧数':>6} {'平均刷新(ms)':>14} {'最长刷新(ms)':>14}")
+    for sort in (False, True):
+        frames, mean, worst = bench_replay(path, sort)
+        print(f"{'是' if sort else '否':>4} {frames:>8} {mean * 1000:>16.2f} {worst * 1000:>16.2f}")
+
+
+def main(sizes=(500, 5000, 50000)):
+    print(f"{'进程数':>8} {'排序':>4} {'首次填充(ms)':>14} {'增量刷新(ms)':>14} {'每进程(us)':>12}")
+    for size in sizes:
+        for sort in (False, True):
+            fill, refresh = bench(size, sort=sort)
+            print(f"{size:>10} {'是' if sort else '否':>4} {fill * 1000:>16.1f} "
+                  f"{refresh * 1000:>16.1f} {refresh / size * 1e6:>14.2f}")
+
+
+def tree_main(sizes=(500, 5000, 20000)):
+    print(f"{'进程数':>8} {'首次填充(ms)':>14} {'增量刷新(ms)':>14} {'每进程(us)':>12}")
+    for size in sizes:
+        fill, refresh = bench_tree(size)
+        print(f"{size:>10} {fill * 1000:>16.1f} {refresh * 1000:>16.1f} "
+              f"{refresh / size * 1e6:>14.2f}")
+
+
+if __name__ == "__main__":
+    # 模型和代理模型需要一个 QApplication 实例
+    app = QtWidgets.QApplication(sys.argv[:1])
+    if sys.argv[1:2] == ["--replay"]:
+        replay_main(sys.argv[2])
+        sys.exit()
+    if sys.argv[1:2] == ["--tree"]:
+        tree_main(tuple(int(arg) for arg in sys.argv[2:]) or (500, 5000, 20000))
+        sys.exit()
+    main(tuple(int(arg) for arg in sys.argv[1:]) or (500, 5000, 50000))
@@ -0,0 +1,205 @@
+"""按 cgroup / 容器分组：CPU 和内存优先直接读取 /sys/fs/cgroup 中的计数器"""
+import os
+import re
+import time
+
+from PyQt5 import QtCore
+
+from process_model import SORT_ROLE
+
+_CONTAINER_RE = re.compile(r'(docker|cri-containerd|crio|libpod)[-/]([0-9a-f]{12,64})')
+_POD_RE = re.compile(r'pod([0-9a-f]{8}[-_][0-9a-f]{4}[-_][0-9a-f]{4}[-_][0-9a-f]{4}[-_][0-9a-f]{12})')
+
+
+def container_label(path):
+    """从 cgroup 路径中识别容器或 systemd 单元，返回便于阅读的名称"""
+    match = _CONTAINER_RE.search(path)
+    if match:
+        return f"{match.group(1)} {match.group(2)[:12]}"
+    match = _POD_RE.search(path)
+    if match:
+        return f"pod {match.group(1)[:8]}"
+    name = path.rstrip('/').rsplit('/', 1)[-1]
+    return name or "/"
+
+
+class CgroupCounters(object):
+    """读取 cgroup 级别的 CPU 累计时间和内存用量，兼容 v2 和 v1（含混合模式）"""
+
+    def __init__(self, root='/sys/fs/cgroup'):
+        self.root = root
+        if os.path.exists(os.path.join(root, 'cgroup.controllers')):
+            self._v2 = root
+        elif os.path.isdir(os.path.join(root, 'unified')):
+            self._v2 = os.path.join(root, 'unified')
+        else:
+            self._v2 = None
+        self._v1_cpu = next((os.path.join(root, name) for name in ('cpuacct', 'cpu,cpuacct')
+                             if os.path.isdir(os.path.join(root, name))), None)
+        self._v1_memory = os.path.join(root, 'memory')
+        self._previous = {}   # cgroup 路径 -> (CPU 累计秒数, 单调时钟时间)
+
+    @staticmethod
+    def _read(path):
+        try:
+            with open(path, 'rb') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _cpu_seconds(self, path):
+        if self._v2 is not None:
+            data = self._read(self._v2 + path + '/cpu.stat')
+            if data:
+                for line in data.splitlines():
+                    if line.startswith(b'usage_usec '):
+                        return int(line.split()[1]) / 1e6
+        if self._v1_cpu is not None:
+            data = self._read(self._v1_cpu + path + '/cpuacct.usage')
+            if data:
+                return int(data) / 1e9
+        return None
+
+    def _memory(self, path):
+        if self._v2 is not None:
+            data = self._read(self._v2 + path + '/memory.current')
+            if data:
+                return int(data)
+        data = self._read(self._v1_memory + path + '/memory.usage_in_bytes')
+        return int(data) if data else None
+
+    def sample(self, path, now=None):
+        """返回 (CPU 百分比, 内存字节)；读不到的项为 None，CPU 首次采样也为 None"""
+        if path == '/':
+            return None, None   # 根 cgroup 没有这些计数器
+        now = time.monotonic() if now is None else now
+        cpu = None
+        usage = self._cpu_seconds(path)
+        if usage is not None:
+            previous = self._previous.get(path)
+            self._previous[path] = (usage, now)
+            if previous is not None and now > previous[1]:
+                cpu = round(max(0.0, usage - previous[0]) / (now - previous[1]) * 100, 1)
+        return cpu, self._memory(path)
+
+    def forget(self, paths):
+        """丢弃已经不存在的 cgroup 的上一次读数"""
+        for path in [path for path in self._previous if path not in paths]:
+            del self._previous[path]
+
+
+class CgroupGroup(object):
+    """一个 cgroup 下的进程汇总"""
+    __slots__ = ('path', 'label', 'pids', 'cpu', 'rss', 'source')
+
+    def __init__(self, path):
+        self.path = path
+        self.label = container_label(path)
+        self.pids = []
+        self.cpu = 0.0
+        self.rss = 0
+        self.source = ''
+
+
+def group_snapshot(snapshot, counters=None):
+    """按快照中的 cgroup 列分组；有 cgroup 计数器时直接使用，否则才逐进程求和"""
+    paths = snapshot.extra.get('cgroup')
+    if paths is None:
+        return []
+    groups = {}
+    rows = {}
+    for i, path in enumerate(paths):
+        path = path or '/'
+        group = groups.get(path)
+        if group is None:
+            group = groups[path] = CgroupGroup(path)
+            rows[path] = []
+        group.pids.append(snapshot.pid[i])
+        rows[path].append(i)
+    now = time.monotonic()
+    for path, group in groups.items():
+        cpu, memory = counters.sample(path, now) if counters is not None else (None, None)
+        if cpu is not None and memory is not None:
+            group.cpu, group.rss, group.source = cpu, memory, "cgroup"
+            continue
+        # 计数器不可用（根 cgroup、无权限或首次采样），退回进程合计
+        group.cpu = cpu if cpu is not None else round(
+            sum(snapshot.cpu[i] for i in rows[path]), 1)
+        group.rss = memory if memory is not None else sum(
+            snapshot.rss[i] for i in rows[path])
+        if memory is not None:
+            group.source = "内存取自 cgroup"
+        elif cpu is not None:
+            group.source = "CPU 取自 cgroup"
+        else:
+            group.source = "进程合计"
+    if counters is not None:
+        counters.forget(groups)
+    return list(groups.values())
+
+
+class CgroupTableModel(QtCore.QAbstractTableModel):
+    """cgroup 分组表格；分组集合不变时只发出 dataChanged"""
+
+    HEADERS = ["控制组", "容器/服务", "进程数", "CPU使用率", "内存使用", "数据来源"]
+    COL_PATH, COL_LABEL, COL_COUNT, COL_CPU, COL_RSS, COL_SOURCE = range(6)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._groups = []
+        self.counters = CgroupCounters()
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self._groups)
+
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=QtCore.Qt.DisplayRole):
+        if role == QtCore.Qt.DisplayRole and orientation == QtCore.Qt.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        group = self._groups[index.row()]
+        col = index.column()
+        if role == SORT_ROLE:
+            return (group.path, group.label, len(group.pids), group.cpu, group.rss,
+                    group.source)[col]
+        if role == QtCore.Qt.DisplayRole:
+            if col == self.COL_PATH:
+                return group.path
+            if col == self.COL_LABEL:
+                return group.label
+            if col == self.COL_COUNT:
+                return str(len(group.pids))
+            if col == self.COL_CPU:
+                return f"{group.cpu:.1f}%"
+            if col == self.COL_RSS:
+                return f"{group.rss / (1024 * 1024):.1f} MB"
+            if col == self.COL_SOURCE:
+                return group.source
+        elif role == QtCore.Qt.TextAlignmentRole:
+            if col in (self.COL_COUNT, self.COL_CPU, self.COL_RSS):
+                return int(QtCore.Qt.AlignRight | QtCore.Qt.AlignVCenter)
+        elif role == QtCore.Qt.ToolTipRole and col == self.COL_PATH:
+            return group.path
+        return None
+
+    def group_at(self, row):
+        return self._groups[row]
+
+    def update_snapshot(self, snapshot):
+        groups = sorted(group_snapshot(snapshot, self.counters), key=lambda g: g.path)
+        if [group.path for group in groups] != [group.path for group in self._groups]:
+            self.beginResetModel()
+            self._groups = groups
+            self.endResetModel()
+            return
+        self._groups = groups
+        if groups:
+            self.dataChanged.emit(self.index(0, 0),
+                                  self.index(len(groups) - 1, len(self.HEADERS) - 1),
+                                  [QtCore.Qt.DisplayRole, SORT_ROLE])
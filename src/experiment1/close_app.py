@@ -1,17 +1,39 @@
 from PyQt5 import QtCore, QtGui, QtWidgets
+import argparse
 import sys
-import psutil
 import time
 from datetime import datetime
 
-class ProcessTableWidget(QtWidgets.QTableWidget):
+from alert_rules import AlertEngine, AlertLog, format_event, parse_rule
+from cgroup_model import CgroupTableModel
+from cpu_cores import CpuCoreSampler
+from metrics_chart import ChartPanel, CoreHeatmap
+from metrics_history import MetricsHistory
+from pipeline_profiler import PipelineProfiler, StartupTimer
+from memory_accounting import MemoryAccountant
+from process_collector import (BACKGROUND_COLUMNS, COLLECTOR_BACKENDS, OPTIONAL_COLUMNS,
+                               REMOTE_COLUMNS,
+                               make_collector, sample_system)
+from process_model import SORT_ROLE, ProcessTableModel, ProcessFilterProxyModel
+from process_details import ProcessDetailsPane
+from process_killer import terminate_processes
+from process_sampler import BackgroundTask, ProcessSampler
+from process_tree import ProcessTreeModel, ProcessTreeProxyModel
+from refresh_scheduler import RefreshScheduler
+from remote_hosts import HOST_PID_STRIDE, RemoteCollector, parse_hosts
+from replay_player import ReplayPlayer
+from snapshot_recorder import SnapshotRecorder, check_recording
+
+class ProcessTableView(QtWidgets.QTableView):
+    # 可见的可选列发生变化，参数为列名元组
+    optionalColumnsChanged = QtCore.pyqtSignal(tuple)
+    # 每次重绘完成后发出，用于记录启动阶段的首次绘制
+    painted = QtCore.pyqtSignal()
+
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.setColumnCount(6)
-        self.setHorizontalHeaderLabels([
-            "进程名称", "PID", "状态", "CPU使用率", "内存使用", "启动时间"
-        ])
         self.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectRows)
+        self.setSelectionMode(QtWidgets.QAbstractItemView.ExtendedSelection)
         self.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
         self.setSortingEnabled(True)
         self.horizontalHeader().setSectionResizeMode(QtWidgets.QHeaderView.Interactive)
@@ -21,13 +43,118 @@ class ProcessTableWidget(QtWidgets.QTableWidget):
         self.setHorizontalScrollBarPolicy(QtCore.Qt.ScrollBarAsNeeded)
         self.setVerticalScrollBarPolicy(QtCore.Qt.ScrollBarAsNeeded)
         
-        # 优化表格性能
-        self.setUpdatesEnabled(False)
+        # 优化表格性能：固定行高，避免逐行计算尺寸
+        self.verticalHeader().setSectionResizeMode(QtWidgets.QHeaderView.Fixed)
         self.viewport().setProperty("cursor", QtGui.QCursor(QtCore.Qt.ArrowCursor))
-        self.setStyleSheet("QTableWidget { gridline-color: #d8d8d8; }")
+        self.setStyleSheet("QTableView { gridline-color: #d8d8d8; }")
+        self.profiler = None  # 设置后记录每次重绘耗时（paint 阶段）
+        self.loading = False  # 首个快照到达前，空表格中绘制骨架行
+        # 右键菜单中提供的可选列；远程模式专用的列默认不提供
+        self.menu_columns = tuple(key for key in OPTIONAL_COLUMNS if key not in REMOTE_COLUMNS)
         
-        # 存储进程信息的字典，用于优化更新
-        self.process_items = {}
+        # 右键表头选择显示的可选列
+        header = self.horizontalHeader()
+        header.setContextMenuPolicy(QtCore.Qt.CustomContextMenu)
+        header.customContextMenuRequested.connect(self.show_column_menu)
+
+    def paintEvent(self, event):
+        if self.profiler is None:
+            super().paintEvent(event)
+        else:
+            with self.profiler.measure('paint'):
+                super().paintEvent(event)
+        if self.loading and self.model() is not None and self.model().rowCount() == 0:
+            self.paint_skeleton()
+        self.painted.emit()
+
+    def paint_skeleton(self):
+        """按当前列宽绘制灰色占位条，提示进程列表正在加载"""
+        painter = QtGui.QPainter(self.viewport())
+        painter.setPen(QtCore.Qt.NoPen)
+        painter.setBrush(QtGui.QColor("#ececec"))
+        header = self.horizontalHeader()
+        height = self.verticalHeader().defaultSectionSize()
+        columns = [(header.sectionViewportPosition(col), header.sectionSize(col))
+                   for col in range(header.count()) if not header.isSectionHidden(col)]
+        for row in range(self.viewport().height() // height + 1):
+            y = row * height + height // 4
+            for col, (x, width) in enumerate(columns):
+                # 宽度随行列变化，看起来更像真实内容
+                fraction = 0.45 + 0.1 * ((row * 7 + col * 3) % 5)
+                painter.drawRoundedRect(x + 6, y, max(0, int((width - 12) * fraction)),
+                                        height // 2, 3, 3)
+
+    def setModel(self, model):
+        super().setModel(model)
+        self.set_optional_columns(())
+
+    def optional_columns(self):
+        """当前可见的可选列名"""
+        return tuple(key for key in ProcessTableModel.OPTIONAL_KEYS
+                     if not self.isColumnHidden(ProcessTableModel.column_of(key)))
+
+    def set_optional_columns(self, keys):
+        for key in ProcessTableModel.OPTIONAL_KEYS:
+            self.setColumnHidden(ProcessTableModel.column_of(key), key not in keys)
+
+    def show_column_menu(self, pos):
+        menu = QtWidgets.QMenu(self)
+        visible = self.optional_columns()
+        for key in self.menu_columns:
+            action = menu.addAction(OPTIONAL_COLUMNS[key])
+            action.setCheckable(True)
+            action.setChecked(key in visible)
+            action.setData(key)
+        action = menu.exec_(self.horizontalHeader().mapToGlobal(pos))
+        if action is None:
+            return
+        key = action.data()
+        keys = set(visible) ^ {key}
+        self.set_optional_columns(keys)
+        self.optionalColumnsChanged.emit(self.optional_columns())
+
+class ProcessTreeView(QtWidgets.QTreeView):
+    # 每次重绘完成后发出，树状视图先显示时用于记录启动阶段
+    painted = QtCore.pyqtSignal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.profiler = None  # 设置后记录每次重绘耗时（paint 阶段）
+
+    def paintEvent(self, event):
+        if self.profiler is None:
+            super().paintEvent(event)
+        else:
+            with self.profiler.measure('paint'):
+                super().paintEvent(event)
+        self.painted.emit()
+
+class FirstPaintFilter(QtCore.QObject):
+    """被监视的控件第一次重绘时发出 painted，之后自动移除"""
+    painted = QtCore.pyqtSignal()
+
+    def eventFilter(self, obj, event):
+        if event.type() == QtCore.QEvent.Paint:
+            obj.removeEventFilter(self)
+            self.painted.emit()
+        return False
+
+class ProfilerOverlay(QtWidgets.QLabel):
+    """浮在进程列表右上角的半透明性能统计"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setStyleSheet("background: rgba(0, 0, 0, 170); color: #e0e0e0;"
+                           "font-family: monospace; padding: 6px;")
+        self.setAttribute(QtCore.Qt.WA_TransparentForMouseEvents)
+        self.hide()
+
+    def show_report(self, text):
+        self.setText(text)
+        self.adjustSize()
+        parent = self.parentWidget()
+        self.move(max(0, parent.width() - self.width() - 24), 4)
+        self.raise_()
 
 class SystemInfoWidget(QtWidgets.QWidget):
     def __init__(self, parent=None):
@@ -51,17 +178,45 @@ class SystemInfoWidget(QtWidgets.QWidget):
         
         # 搜索框
         self.searchBox = QtWidgets.QLineEdit()
-        self.searchBox.setPlaceholderText("搜索进程...")
+        self.searchBox.setPlaceholderText("搜索进程... (pid: user: re:)")
         self.searchBox.setMaximumWidth(200)
         layout.addWidget(self.searchBox)
         
         layout.addStretch()
 
 class Ui_Dialog(object):
+    # 进程采集后端，可在启动时通过 --backend 选择
+    collector_backend = "psutil"
+    # 结束进程时等待 SIGTERM 生效的秒数，超时后发送 SIGKILL
+    kill_timeout = 3.0
+    # 后台采集允许占用的单核 CPU 比例，超出时自动拉长刷新间隔
+    cpu_budget = 0.05
+    # 各阶段耗时逐条追加到此文件（JSON Lines），None 表示不记录
+    profile_log = None
+    # 告警规则（见 alert_rules.parse_rule）和告警日志文件
+    alert_rules = AlertEngine.DEFAULT_RULES
+    alert_log = None
+    # 录制采样结果到此文件；或者回放录制文件（replay_speed 为加速倍数）代替实时采样
+    record_path = None
+    replay_path = None
+    replay_speed = 10.0
+    # 进程采集器；为 None 时按 collector_backend 创建（基准测试可注入合成采集器）
+    collector = None
+    # 远程模式：(主机, 端口) 列表，合并显示这些主机上的进程代理（process_agent.py）提供的快照
+    remote_hosts = ()
+    remote_token = ''
+    remote_timeout = 3.0
+    # 为 False 时首次绘制后只采集一次，不启动自适应刷新（基准测试用）
+    auto_refresh = True
+    # 首个快照分批载入：首批行数（尽快出现在屏幕上）和之后每批的行数
+    first_chunk = 100
+    load_chunk = 1000
+
     def setupUi(self, Dialog):
+        setup_start = time.perf_counter()
         # 设置窗口基本属性
         Dialog.setObjectName("Task Manager")
-        Dialog.resize(800, 600)
+        Dialog.resize(1000, 700)
         Dialog.setWindowTitle("任务管理器")
         Dialog.setWindowFlags(Dialog.windowFlags() | QtCore.Qt.WindowMaximizeButtonHint)
         
@@ -72,9 +227,84 @@ class Ui_Dialog(object):
         self.sysInfoWidget = SystemInfoWidget()
         self.mainLayout.addWidget(self.sysInfoWidget)
         
-        # 创建进程表格
-        self.processTable = ProcessTableWidget()
-        self.mainLayout.addWidget(self.processTable)
+        # 逐核 CPU 热力条和负载（只对本机实时采样有效）
+        self.coresWidget = QtWidgets.QWidget()
+        coresLayout = QtWidgets.QHBoxLayout(self.coresWidget)
+        coresLayout.setContentsMargins(0, 0, 0, 0)
+        self.coreHeatmap = CoreHeatmap()
+        coresLayout.addWidget(self.coreHeatmap, 1)
+        self.loadLabel = QtWidgets.QLabel()
+        coresLayout.addWidget(self.loadLabel)
+        self.mainLayout.addWidget(self.coresWidget)
+        
+        # 创建图表面板（系统和选中进程的 CPU/内存曲线）
+        self.chartPanel = ChartPanel()
+        self.mainLayout.addWidget(self.chartPanel)
+        
+        # 创建进程模型和表格视图
+        self.processModel = ProcessTableModel()
+        self.proxyModel = ProcessFilterProxyModel()
+        self.proxyModel.setSourceModel(self.processModel)
+        self.processTable = ProcessTableView()
+        self.processTable.setModel(self.proxyModel)
+        
+        # 创建进程树模型和树状视图，与表格共用搜索索引
+        self.treeModel = ProcessTreeModel(self.processModel.search_index)
+        self.treeProxyModel = ProcessTreeProxyModel()
+        self.treeProxyModel.setSourceModel(self.treeModel)
+        self.processTree = ProcessTreeView()
+        self.processTree.setModel(self.treeProxyModel)
+        self.processTree.setSortingEnabled(True)
+        self.processTree.sortByColumn(ProcessTreeModel.COL_TOTAL_CPU,
+                                      QtCore.Qt.DescendingOrder)
+        self.processTree.setUniformRowHeights(True)
+        self.processTree.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectRows)
+        self.processTree.setSelectionMode(QtWidgets.QAbstractItemView.ExtendedSelection)
+        self.processTree.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+        
+        # 按 cgroup/容器分组的视图，只在可见时采集 cgroup 列
+        self.groupModel = CgroupTableModel()
+        self.groupProxyModel = QtCore.QSortFilterProxyModel()
+        self.groupProxyModel.setSourceModel(self.groupModel)
+        self.groupProxyModel.setSortRole(SORT_ROLE)
+        self.groupProxyModel.setDynamicSortFilter(True)
+        self.groupTable = QtWidgets.QTableView()
+        self.groupTable.setModel(self.groupProxyModel)
+        self.groupTable.setSortingEnabled(True)
+        self.groupTable.sortByColumn(CgroupTableModel.COL_CPU, QtCore.Qt.DescendingOrder)
+        self.groupTable.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectRows)
+        self.groupTable.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+        self.groupTable.verticalHeader().setVisible(False)
+        
+        # 表格、树状和分组视图放在同一个堆叠控件中切换
+        self.viewStack = QtWidgets.QStackedWidget()
+        self.viewStack.addWidget(self.processTable)
+        self.viewStack.addWidget(self.processTree)
+        self.viewStack.addWidget(self.groupTable)
+        
+        # 进程详情侧栏，与进程列表并排，默认隐藏
+        self.detailsPane = ProcessDetailsPane()
+        self.detailsPane.hide()
+        self.splitter = QtWidgets.QSplitter(QtCore.Qt.Horizontal)
+        self.splitter.addWidget(self.viewStack)
+        self.splitter.addWidget(self.detailsPane)
+        self.splitter.setStretchFactor(0, 3)
+        self.splitter.setStretchFactor(1, 1)
+        self.mainLayout.addWidget(self.splitter)
+        self.last_snapshot = None
+        
+        # 刷新流水线自我剖析：F12 显示/隐藏统计，Shift+F12 导出到文件
+        self.profiler = PipelineProfiler(log_path=self.profile_log)
+        self.processModel.profiler = self.profiler
+        self.processTable.profiler = self.profiler
+        self.processTree.profiler = self.profiler
+        # 冷启动计时：首次绘制（paint）、首批进程显示（rows）、首个快照全部载入（full）
+        self.startup = StartupTimer(self.profiler, setup_start)
+        self.profilerOverlay = ProfilerOverlay(self.viewStack)
+        QtWidgets.QShortcut(QtGui.QKeySequence("F12"), Dialog,
+                            activated=self.toggle_profiler_overlay)
+        QtWidgets.QShortcut(QtGui.QKeySequence("Shift+F12"), Dialog,
+                            activated=self.dump_profile)
         
         # 创建按钮布局
         self.buttonLayout = QtWidgets.QHBoxLayout()
@@ -89,189 +319,651 @@ class Ui_Dialog(object):
         self.endTaskButton.setMinimumWidth(100)
         self.buttonLayout.addWidget(self.endTaskButton)
         
+        # 创建结束进程树按钮
+        self.endTreeButton = QtWidgets.QPushButton("结束进程树")
+        self.endTreeButton.setMinimumWidth(100)
+        self.buttonLayout.addWidget(self.endTreeButton)
+        
         # 创建查看详情按钮
         self.detailsButton = QtWidgets.QPushButton("查看详情")
         self.detailsButton.setMinimumWidth(100)
         self.buttonLayout.addWidget(self.detailsButton)
         
+        # 创建树状视图切换按钮
+        self.treeModeBox = QtWidgets.QCheckBox("树状视图")
+        self.buttonLayout.addWidget(self.treeModeBox)
+        
+        # 创建按控制组（容器/systemd 单元）分组的切换按钮
+        self.groupModeBox = QtWidgets.QCheckBox("按控制组分组")
+        self.buttonLayout.addWidget(self.groupModeBox)
+        
         self.buttonLayout.addStretch()
+        
+        # 操作结果提示（非模态）
+        self.statusLabel = QtWidgets.QLabel()
+        self.buttonLayout.addWidget(self.statusLabel)
         self.mainLayout.addLayout(self.buttonLayout)
         
         # 连接信号
-        self.refreshButton.clicked.connect(self.refresh_data)
+        self.refreshButton.clicked.connect(self.on_refresh_clicked)
         self.endTaskButton.clicked.connect(self.end_task)
+        self.endTreeButton.clicked.connect(self.end_process_tree)
+        self.tasks = set()  # 正在后台运行的任务，持有引用直到完成
         self.detailsButton.clicked.connect(self.show_details)
-        self.sysInfoWidget.searchBox.textChanged.connect(self.filter_processes)
+        # 搜索框输入防抖：停止输入 200ms 后才过滤，且只过滤内存中的快照
+        self.searchTimer = QtCore.QTimer()
+        self.searchTimer.setSingleShot(True)
+        self.searchTimer.setInterval(200)
+        self.searchTimer.timeout.connect(self.filter_processes)
+        self.sysInfoWidget.searchBox.textChanged.connect(self.searchTimer.start)
+        self.sysInfoWidget.searchBox.returnPressed.connect(self.filter_processes)
+        self.treeModeBox.toggled.connect(self.set_tree_mode)
+        self.groupModeBox.toggled.connect(self.set_group_mode)
+        self.processTable.optionalColumnsChanged.connect(self.set_optional_columns)
+        self.processTable.selectionModel().selectionChanged.connect(
+            self.on_selection_changed)
+        self.processTree.selectionModel().selectionChanged.connect(
+            self.on_selection_changed)
+        self.chart_key = None  # 图表中显示的进程 (pid, create_time)
         
-        # 创建定时器，定期更新数据
-        self.timer = QtCore.QTimer()
-        self.timer.timeout.connect(self.update_system_info)
-        self.timer.start(1000)  # 每秒更新系统信息
+        # USS/PSS 列可见时在独立线程池中计算，每个进程最多 30 秒刷新一次
+        self.memoryAccountant = MemoryAccountant(max_age=30.0, parent=Dialog)
+        self.memoryAccountant.updated.connect(self.on_memory_measured)
+        self.background_shown = ()   # 当前可见的 USS/PSS 列
         
-        # 创建进程更新定时器
-        self.process_timer = QtCore.QTimer()
-        self.process_timer.timeout.connect(self.refresh_data)
-        self.process_timer.start(5000)  # 每5秒更新进程列表
+        # 保存系统和进程指标的分层历史：细粒度层覆盖最近一段时间，粗粒度层覆盖更久
+        self.history = MetricsHistory()
         
-        # 初始化数据
-        self.refresh_data()
+        # 阈值告警：采样中断超过一分钟（例如窗口隐藏）时重新计时
+        self.alerts = AlertEngine(self.alert_rules, max_gap=60)
+        self.alertLog = AlertLog(self.alert_log) if self.alert_log else None
+        self.trayIcon = None
+        if QtWidgets.QSystemTrayIcon.isSystemTrayAvailable():
+            self.trayIcon = QtWidgets.QSystemTrayIcon(
+                Dialog.style().standardIcon(QtWidgets.QStyle.SP_ComputerIcon), Dialog)
+            self.trayIcon.show()
+        
+        # 创建后台采样器，psutil 调用全部在采样线程中执行
+        self.remote = None
+        if self.collector is None and self.remote_hosts:
+            self.remote = self.collector = RemoteCollector(
+                self.remote_hosts, self.remote_token, self.remote_timeout)
+        if self.collector is None:
+            self.collector = make_collector(self.collector_backend)
+        collect, system_sampler = self.collector.collect, sample_system
+        if self.remote is not None:
+            system_sampler = self.remote.sample_system
+            self.setup_remote_mode(Dialog)
+        self.recorder = None
+        if self.record_path:
+            # 录制在采样线程中完成，不占用界面线程
+            self.recorder = SnapshotRecorder(self.record_path)
+            collect = self.recorder.wrap(collect)
+            sample = system_sampler
+            system_sampler = lambda: self.recorder.record_system(sample())
+            Dialog.finished.connect(self.recorder.close)
+        cores_sampler = None
+        if self.remote is None and not self.replay_path:
+            cores_sampler = CpuCoreSampler().sample
+        else:
+            self.coresWidget.hide()
+        self.sampler = ProcessSampler(collect, system_sampler, cores_sampler, parent=Dialog)
+        
+        # 回放模式：录制文件代替实时采样，信号与采样器一致
+        self.player = None
+        source = self.sampler
+        if self.replay_path:
+            self.player = ReplayPlayer(self.replay_path, self.replay_speed, parent=Dialog)
+            self.player.finished.connect(self.on_replay_finished)
+            source = self.player
+            Dialog.setWindowTitle(f"任务管理器 - 回放 {self.replay_path}")
+            self.refreshButton.setText("暂停回放")
+            self.endTaskButton.setEnabled(False)
+            self.endTreeButton.setEnabled(False)
+        source.systemSampled.connect(self.on_system_sampled)
+        source.processesSampled.connect(self.on_processes_sampled)
+        source.sampleFailed.connect(self.on_sample_failed)
+        self.sampler.coresSampled.connect(self.on_cores_sampled)
+        if self.player is None:
+            self.sampler.start()
+        Dialog.finished.connect(self.sampler.stop)
+        app = QtWidgets.QApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(self.sampler.stop)
+        
+        # 自适应刷新：系统信息每秒、进程列表每5秒；窗口隐藏时暂停进程采集（有告警规则时
+        # 放慢到每 10 秒，最小化后告警照常判断），失去焦点时放慢，选中进程时加快进程采集
+        self.scheduler = RefreshScheduler(Dialog, budget=self.cpu_budget, parent=Dialog)
+        self.scheduler.add_channel("system", self.update_system_info, 1000,
+                                   self.sampler.system, hidden_interval=10000)
+        self.scheduler.add_channel("processes", self.refresh_data, 5000,
+                                   self.sampler.processes, watching_interval=2000,
+                                   hidden_interval=10000 if self.alerts.rules else None)
+        if self.sampler.cores is not None:
+            # 热力条只在窗口可见时有意义，隐藏时暂停
+            self.scheduler.add_channel("cores", self.sampler.request_cores, 1000,
+                                       self.sampler.cores)
+        self.scheduler.intervalsChanged.connect(self.on_intervals_changed)
+        Dialog.finished.connect(self.scheduler.stop)
+        if self.player is not None:
+            Dialog.finished.connect(self.player.stop)
+        Dialog.finished.connect(self.profiler.close_log)
+        if self.alertLog is not None:
+            Dialog.finished.connect(self.alertLog.close)
+        
+        # 延迟首次采集：窗口先以骨架行完成首次绘制，之后才开始采样或回放，
+        # 首个快照再按 CPU（其次内存）从高到低分批载入表格
+        self.loading_rows = None   # (快照, 尚未载入的行号列表)
+        self.loadTimer = QtCore.QTimer(Dialog)
+        self.loadTimer.setSingleShot(True)
+        self.loadTimer.timeout.connect(self.load_next_chunk)
+        self.processTable.loading = True
+        # 以窗口（而不是某个视图）的首次绘制为准，启动时显示哪个视图都能开始采集
+        self.firstPaint = FirstPaintFilter(Dialog)
+        self.firstPaint.painted.connect(self.on_dialog_painted)
+        Dialog.installEventFilter(self.firstPaint)
+        self.processTable.painted.connect(self.on_view_painted)
+        self.processTree.painted.connect(self.on_view_painted)
         
         # 设置最小窗口大小
         Dialog.setMinimumSize(600, 400)
 
+    def on_dialog_painted(self):
+        """窗口首次绘制后才开始采集"""
+        self.startup.mark('paint')
+        # 排队到下一轮事件循环，让这一帧先完成
+        QtCore.QTimer.singleShot(0, self.start_sampling)
+
+    def on_view_painted(self):
+        """记录当前视图第一次显示出进程、以及首个快照全部载入后绘制的时间"""
+        startup = self.startup
+        view = self.processTree if self.tree_mode() else self.processTable
+        if view.model().rowCount() and 'rows' not in startup.marks:
+            startup.mark('rows')
+        if 'rows' in startup.marks and self.loading_rows is None:
+            startup.mark('full')
+            self.processTable.painted.disconnect(self.on_view_painted)
+            self.processTree.painted.disconnect(self.on_view_painted)
+
+    def start_sampling(self):
+        if self.player is not None:
+            self.player.start()
+        elif self.auto_refresh:
+            self.scheduler.start()
+        else:
+            self.update_system_info()
+            self.refresh_data()
+
+    def load_first_snapshot(self, snapshot):
+        """首个快照：最耗 CPU 的进程先显示，其余分批在之后的事件循环中载入。
+        首次采样没有 CPU 基线（均为 0），此时实际按内存排序"""
+        cpu, rss = snapshot.cpu, snapshot.rss
+        order = sorted(range(len(snapshot)), key=lambda i: (cpu[i], rss[i]), reverse=True)
+        self.loading_rows = (snapshot, order[self.first_chunk:])
+        with self.profiler.measure('load'):
+            self.processModel.insert_rows(snapshot, order[:self.first_chunk])
+        self.processTable.loading = False
+        self.loadTimer.start(0)
+
+    def load_next_chunk(self):
+        if self.loading_rows is None:
+            return
+        snapshot, rows = self.loading_rows
+        with self.profiler.measure('load'):
+            self.processModel.insert_rows(snapshot, rows[:self.load_chunk])
+        if len(rows) > self.load_chunk:
+            self.loading_rows = (snapshot, rows[self.load_chunk:])
+            self.loadTimer.start(0)
+        else:
+            self.finish_loading()
+
+    def finish_loading(self):
+        self.loading_rows = None
+        self.loadTimer.stop()
+        self.viewStack.currentWidget().viewport().update()
+
     def update_system_info(self):
-        """只更新系统信息，不更新进程列表"""
-        try:
-            cpu_percent = psutil.cpu_percent()
-            mem = psutil.virtual_memory()
-            mem_total = mem.total / (1024 * 1024 * 1024)  # GB
-            mem_used = mem.used / (1024 * 1024 * 1024)    # GB
-            process_count = len(psutil.pids())
-            
-            self.sysInfoWidget.cpuLabel.setText(f"CPU: {cpu_percent}%")
-            self.sysInfoWidget.memLabel.setText(
-                f"内存: {mem_used:.1f}/{mem_total:.1f} GB ({mem.percent}%)")
-            self.sysInfoWidget.processLabel.setText(f"进程数: {process_count}")
-        except:
-            pass
+        """请求采样线程更新系统信息，不更新进程列表"""
+        self.sampler.request_system()
+
+    def setup_remote_mode(self, Dialog):
+        """远程模式：显示主机列，不能结束进程或读取详情，USS/PSS 和 cgroup 计数器只对本机有效"""
+        Dialog.setWindowTitle(f"任务管理器 - {len(self.remote.hosts)} 台远程主机")
+        self.processModel.pid_stride = HOST_PID_STRIDE
+        self.treeModel.pid_stride = HOST_PID_STRIDE
+        self.processTable.menu_columns = tuple(
+            key for key in OPTIONAL_COLUMNS if key not in BACKGROUND_COLUMNS)
+        self.processTable.set_optional_columns(REMOTE_COLUMNS)
+        self.groupModel.counters = None
+        for button in (self.endTaskButton, self.endTreeButton, self.detailsButton):
+            button.setEnabled(False)
+        Dialog.finished.connect(self.remote.close)
+
+    def show_remote_status(self):
+        """在状态栏显示在线主机数，离线主机的错误放在提示中"""
+        errors = self.remote.errors()
+        self.statusLabel.setText(
+            f"远程主机在线 {len(self.remote.hosts) - len(errors)}/{len(self.remote.hosts)}")
+        self.statusLabel.setToolTip("\n".join(f"{label}: {error}"
+                                              for label, error in errors.items()))
+        self.statusLabel.setStyleSheet("color: #F44336;" if errors else "")
+
+    def on_system_sampled(self, sample):
+        """在界面线程中显示系统信息采样结果"""
+        if self.player is None:
+            self.profiler.record('sys_collect', self.sampler.system.elapsed)
+        with self.profiler.measure('sys_update'):
+            self.show_system_sample(sample)
+        self.handle_alerts(self.alerts.evaluate_system(sample))
+
+    def show_system_sample(self, sample):
+        self.history.add_system(sample)
+        self.chartPanel.add_system_sample(sample)
+        mem_total = sample.mem_total / (1024 * 1024 * 1024)  # GB
+        mem_used = sample.mem_used / (1024 * 1024 * 1024)    # GB
+        self.sysInfoWidget.cpuLabel.setText(f"CPU: {sample.cpu_percent}%")
+        self.sysInfoWidget.memLabel.setText(
+            f"内存: {mem_used:.1f}/{mem_total:.1f} GB ({sample.mem_percent}%)")
+        self.sysInfoWidget.processLabel.setText(f"进程数: {sample.process_count}")
+
+    def on_cores_sampled(self, sample):
+        """更新逐核热力条，负载旁显示 iowait 和 steal 的全核平均"""
+        with self.profiler.measure('cores'):
+            self.coreHeatmap.set_sample(sample)
+            count = len(sample.busy) or 1
+            text = "负载: " + " ".join(f"{value:.2f}" for value in sample.load)
+            text += f"  iowait {sample.iowait.sum() / count:.1f}%"
+            text += f"  steal {sample.steal.sum() / count:.1f}%"
+            self.loadLabel.setText(text)
 
     def refresh_data(self):
-        """更新进程列表，使用增量更新方式"""
+        """请求采样线程采集进程快照，结果到达后再增量更新表格"""
+        if self.player is not None:
+            return
+        self.sampler.request_processes()
+
+    def on_refresh_clicked(self):
+        """实时模式下立即刷新；回放模式下暂停或继续回放"""
+        if self.player is None:
+            self.refresh_data()
+            return
+        paused = not self.player.is_paused()
+        self.player.set_paused(paused)
+        self.refreshButton.setText("继续回放" if paused else "暂停回放")
+
+    def on_processes_sampled(self, snapshot):
+        """在界面线程中把新快照增量更新到表格模型"""
+        profiler = self.profiler
         try:
-            self.processTable.setUpdatesEnabled(False)  # 暂停界面更新
-            current_filter = self.sysInfoWidget.searchBox.text().lower()
-            
-            # 获取当前所有进程
-            current_processes = {}
-            for proc in psutil.process_iter(['pid', 'name', 'status', 'cpu_percent', 
-                                           'memory_info', 'create_time']):
-                try:
-                    pinfo = proc.info
-                    pid = str(pinfo['pid'])
-                    current_processes[pid] = pinfo
-                except:
-                    continue
-            
-            # 删除已经不存在的进程
-            rows_to_remove = []
-            for row in range(self.processTable.rowCount()):
-                pid = self.processTable.item(row, 1).text()
-                if pid not in current_processes:
-                    rows_to_remove.append(row)
-            
-            for row in reversed(rows_to_remove):
-                self.processTable.removeRow(row)
-            
-            # 更新或添加进程
-            for pid, pinfo in current_processes.items():
-                if not self.match_filter(pinfo['name'], current_filter):
-                    continue
-                    
-                row = self.find_process_row(pid)
-                if row == -1:
-                    # 添加新进程
-                    row = self.processTable.rowCount()
-                    self.processTable.insertRow(row)
-                
-                try:
-                    # 更新进程信息
-                    self.processTable.setItem(row, 0, 
-                        QtWidgets.QTableWidgetItem(str(pinfo['name'])))
-                    self.processTable.setItem(row, 1, 
-                        QtWidgets.QTableWidgetItem(str(pid)))
-                    self.processTable.setItem(row, 2, 
-                        QtWidgets.QTableWidgetItem(str(pinfo['status'])))
-                    self.processTable.setItem(row, 3, 
-                        QtWidgets.QTableWidgetItem(f"{pinfo['cpu_percent']:.1f}%"))
-                    memory_mb = pinfo['memory_info'].rss / (1024 * 1024)
-                    self.processTable.setItem(row, 4, 
-                        QtWidgets.QTableWidgetItem(f"{memory_mb:.1f} MB"))
-                    create_time = datetime.fromtimestamp(pinfo['create_time'])
-                    self.processTable.setItem(row, 5, 
-                        QtWidgets.QTableWidgetItem(create_time.strftime("%Y-%m-%d %H:%M:%S")))
-                except:
-                    continue
-            
-            self.processTable.setUpdatesEnabled(True)  # 恢复界面更新
+            if self.player is None:
+                profiler.record('collect', self.sampler.processes.elapsed)
+            self.last_snapshot = snapshot
+            if self.processModel.rowCount() == 0 and len(snapshot) > self.first_chunk:
+                self.load_first_snapshot(snapshot)
+                if self.player is None and self.auto_refresh:
+                    # 首次采样没有 CPU 基线，一秒后再采一次得到真实的 CPU 使用率
+                    QtCore.QTimer.singleShot(1000, self.refresh_data)
+            else:
+                if self.loading_rows is not None:
+                    # 分批载入尚未完成时新快照已到，剩余的行由增量更新一并处理
+                    self.finish_loading()
+                # diff 和 model 两个阶段由模型自己记录
+                self.processModel.update_snapshot(snapshot)
+                self.processTable.loading = False
+            if self.tree_mode():
+                with profiler.measure('tree'):
+                    self.treeModel.update_snapshot(snapshot)
+            elif self.group_mode():
+                with profiler.measure('groups'):
+                    self.groupModel.update_snapshot(snapshot)
+            if self.background_shown:
+                self.memoryAccountant.refresh(snapshot)
+            with profiler.measure('history'):
+                self.history.add_snapshot(snapshot)
+            with profiler.measure('chart'):
+                self.update_process_chart(snapshot.timestamp)
+                self.update_details_pane()
+            with profiler.measure('alerts'):
+                self.handle_alerts(self.alerts.evaluate_snapshot(snapshot))
+            if self.remote is not None:
+                self.show_remote_status()
         except Exception as e:
             print(f"Error refreshing data: {e}")
+        if self.profilerOverlay.isVisible():
+            self.profilerOverlay.show_report(profiler.report())
 
-    def find_process_row(self, pid):
-        """查找进程在表格中的行号"""
-        for row in range(self.processTable.rowCount()):
-            if self.processTable.item(row, 1).text() == str(pid):
-                return row
-        return -1
+    def on_selection_changed(self, *args):
+        """选中进程变化时，用历史数据重新填充进程曲线，并切换详情侧栏"""
+        pid = self.selected_pid()
+        self.scheduler.set_watching(pid is not None)
+        if pid is None:
+            self.chart_key = None
+            self.chartPanel.show_process(None)
+            return
+        row = self.processModel.row_of(pid)
+        if row < 0:
+            return
+        values = self.processModel.row_values(row)
+        if self.detailsPane.isVisible():
+            self.detailsPane.show_process(values)
+        key = (pid, values[5])
+        if key != self.chart_key:
+            self.chart_key = key
+            self.chartPanel.show_process(self.history.process(*key))
 
-    def match_filter(self, process_name, filter_text):
-        """检查进程是否匹配过滤条件"""
-        if not filter_text:
-            return True
-        return filter_text in process_name.lower()
+    def update_process_chart(self, timestamp):
+        """把选中进程的最新数值追加到进程曲线"""
+        if self.chart_key is None:
+            return
+        row = self.processModel.row_of(self.chart_key[0])
+        if row < 0:
+            return
+        pid, name, status, cpu, rss, create_time = self.processModel.row_values(row)
+        if create_time == self.chart_key[1]:
+            self.chartPanel.add_process_sample(timestamp, cpu, rss)
 
-    def filter_processes(self):
-        """根据搜索框过滤进程"""
+    def update_details_pane(self):
+        """每次刷新只更新详情侧栏中的易变字段"""
+        key = self.detailsPane.key
+        if key is None or not self.detailsPane.isVisible():
+            return
+        row = self.processModel.row_of(key[0])
+        if row < 0:
+            self.detailsPane.fields["status"].setText("已退出")
+            return
+        values = self.processModel.row_values(row)
+        if values[5] == key[1]:
+            self.detailsPane.update_volatile(values)
+
+    def handle_alerts(self, events):
+        """记录告警事件；新告警显示在状态栏并发送桌面通知"""
+        if not events:
+            return
+        if self.alertLog is not None:
+            self.alertLog.write(events)
+        fired = [event for event in events if event.kind == 'fired']
+        if not fired:
+            return
+        self.statusLabel.setText(format_event(fired[-1]))
+        if self.trayIcon is not None:
+            if len(fired) == 1:
+                message = format_event(fired[0])
+            else:
+                message = "\n".join(format_event(event) for event in fired[:3])
+                if len(fired) > 3:
+                    message += f"\n... 共 {len(fired)} 条告警"
+            self.trayIcon.showMessage("任务管理器告警", message,
+                                      QtWidgets.QSystemTrayIcon.Warning, 5000)
+
+    def toggle_profiler_overlay(self):
+        overlay = self.profilerOverlay
+        if overlay.isVisible():
+            overlay.hide()
+        else:
+            overlay.show_report(self.profiler.report())
+            overlay.show()
+
+    def dump_profile(self, path=None):
+        """把各阶段百分位和原始耗时导出为 JSON 文件"""
+        if path is None:
+            path = datetime.now().strftime("profile-%Y%m%d-%H%M%S.json")
+        try:
+            self.profiler.dump(path)
+        except OSError as e:
+            self.statusLabel.setText(f"导出性能统计失败: {e}")
+            return
+        self.statusLabel.setText(f"性能统计已导出到 {path}")
+
+    def on_intervals_changed(self, intervals):
+        """在刷新按钮的提示中显示当前刷新间隔"""
+        parts = []
+        for name, label in (("system", "系统信息"), ("processes", "进程列表"),
+                            ("cores", "逐核 CPU")):
+            if name not in intervals:
+                continue
+            interval = intervals.get(name)
+            parts.append(f"{label}: " + ("已暂停" if interval is None
+                                         else f"每 {interval / 1000:.1f} 秒"))
+        self.refreshButton.setToolTip("\n".join(parts))
+
+    def on_sample_failed(self, message):
+        """采样失败显示在状态栏，附上时间以便看出是否已经过去"""
+        if self.processTable.loading:
+            self.processTable.loading = False
+            self.statusLabel.setText(f"采集进程列表失败：{message}")
+        else:
+            self.statusLabel.setText(f"采样失败（{datetime.now():%H:%M:%S}）：{message}")
+        self.statusLabel.setToolTip(message)
+        self.statusLabel.setStyleSheet("color: #F44336;")
+
+    def on_replay_finished(self):
+        """回放结束；文件损坏导致提前结束时保留错误信息"""
+        error = self.player.error
+        self.statusLabel.setText(f"回放中断：{error}" if error else "回放结束")
+
+    def set_optional_columns(self, keys):
+        """可选列显示状态变化：采集器只读取可见列，新显示的列先清空旧值"""
+        self.update_collector_columns()
+
+    def update_collector_columns(self):
+        """采集器需要读取的可选列：表格中可见的列，分组视图另需 cgroup 列；
+        USS/PSS 不由采集器读取，而是由后台线程池单独计算"""
+        visible = self.processTable.optional_columns()
+        keys = [key for key in visible if key not in BACKGROUND_COLUMNS]
+        if self.group_mode() and 'cgroup' not in keys:
+            keys.append('cgroup')
+        for key in set(keys) - set(self.collector.columns):
+            self.processModel.clear_column(key)
+        self.collector.columns = tuple(keys)
+        # 新显示的 USS/PSS 列先清空旧值，再填入仍然有效的缓存结果
+        shown = tuple(key for key in BACKGROUND_COLUMNS
+                      if key in visible and self.remote is None)
+        newly_shown = set(shown) - set(self.background_shown)
+        self.background_shown = shown
+        if newly_shown:
+            for key in newly_shown:
+                self.processModel.clear_column(key)
+            cache = self.memoryAccountant.cache
+            self.on_memory_measured({key: entry[:2] for key, entry in cache.items()})
+            if self.last_snapshot is not None:
+                self.memoryAccountant.refresh(self.last_snapshot)
         self.refresh_data()
 
+    def on_memory_measured(self, results):
+        """把后台计算的 USS/PSS 写入表格"""
+        for i, key in enumerate(BACKGROUND_COLUMNS):
+            if key in self.background_shown:
+                self.processModel.set_extra_values(
+                    key, {k: v[i] for k, v in results.items()})
+
+    def tree_mode(self):
+        return self.viewStack.currentWidget() is self.processTree
+
+    def group_mode(self):
+        return self.viewStack.currentWidget() is self.groupTable
+
+    def set_tree_mode(self, enabled):
+        """切换表格/树状视图；树模型只在可见时更新，切换时用最新快照追平"""
+        if enabled:
+            self.groupModeBox.setChecked(False)
+            if self.last_snapshot is not None:
+                self.treeModel.update_snapshot(self.last_snapshot)
+            self.viewStack.setCurrentWidget(self.processTree)
+        elif self.tree_mode():
+            self.viewStack.setCurrentWidget(self.processTable)
+        self.on_selection_changed()
+
+    def set_group_mode(self, enabled):
+        """切换分组视图；cgroup 列只在分组视图可见时采集"""
+        if enabled:
+            self.treeModeBox.setChecked(False)
+            self.viewStack.setCurrentWidget(self.groupTable)
+            if self.last_snapshot is not None and 'cgroup' in self.last_snapshot.extra:
+                self.groupModel.update_snapshot(self.last_snapshot)
+        elif self.group_mode():
+            self.viewStack.setCurrentWidget(self.processTable)
+        self.update_collector_columns()
+        self.on_selection_changed()
+
+    def selected_pids(self):
+        """返回当前视图中所有选中行的PID"""
+        if self.group_mode():
+            return []  # 分组视图的行是控制组而不是进程
+        if self.tree_mode():
+            rows = self.processTree.selectionModel().selectedRows()
+            return [self.treeModel.pid_at_index(self.treeProxyModel.mapToSource(index))
+                    for index in rows]
+        rows = self.processTable.selectionModel().selectedRows()
+        return [self.processModel.pid_at(self.proxyModel.mapToSource(index).row())
+                for index in rows]
+
+    def selected_keys(self):
+        """返回当前视图中所有选中进程的 (pid, create_time)"""
+        if self.group_mode():
+            return []
+        if self.tree_mode():
+            rows = self.processTree.selectionModel().selectedRows()
+            return [self.treeModel.key_at_index(self.treeProxyModel.mapToSource(index))
+                    for index in rows]
+        rows = self.processTable.selectionModel().selectedRows()
+        return [self.processModel.key_at(self.proxyModel.mapToSource(index).row())
+                for index in rows]
+
+    def selected_pid(self):
+        """返回当前选中的第一个PID，未选中时返回None"""
+        pids = self.selected_pids()
+        return pids[0] if pids else None
+
+    def filter_processes(self):
+        """根据搜索框过滤进程，支持 pid:、user:、re: 前缀"""
+        self.searchTimer.stop()
+        query = self.proxyModel.set_query(self.sysInfoWidget.searchBox.text())
+        self.treeProxyModel.invalidateFilter()
+        searchBox = self.sysInfoWidget.searchBox
+        searchBox.setToolTip(query.error or "")
+        searchBox.setStyleSheet("border: 1px solid #F44336;" if query.error else "")
+
     def end_task(self):
-        selected_rows = self.processTable.selectedItems()
-        if not selected_rows:
+        """结束所有选中的进程"""
+        self.terminate_selected(include_children=False)
+
+    def end_process_tree(self):
+        """结束选中进程及其全部子进程"""
+        self.terminate_selected(include_children=True)
+
+    def terminate_selected(self, include_children):
+        # 连同创建时间一起传给后台任务，确认前后 PID 被复用时不会误杀新进程
+        keys = self.selected_keys()
+        pids = [pid for pid, _ in keys]
+        if not pids:
             QtWidgets.QMessageBox.warning(None, "警告", "请选择要结束的进程")
             return
         
-        # 获取选中行的PID
-        row = selected_rows[0].row()
-        pid = int(self.processTable.item(row, 1).text())
+        if len(pids) == 1:
+            row = self.processModel.row_of(pids[0])
+            name = self.processModel.row_values(row)[1] if row >= 0 else ""
+            target = f"进程 {name} (PID: {pids[0]})"
+        else:
+            target = f"选中的 {len(pids)} 个进程"
+        if include_children:
+            target += " 及其全部子进程"
+        reply = QtWidgets.QMessageBox.question(None, "确认", f"确定要结束{target}?",
+            QtWidgets.QMessageBox.Yes | QtWidgets.QMessageBox.No)
+        if reply != QtWidgets.QMessageBox.Yes:
+            return
         
-        try:
-            process = psutil.Process(pid)
-            process_name = process.name()
-            
-            reply = QtWidgets.QMessageBox.question(None, "确认", 
-                f"确定要结束进程 {process_name} (PID: {pid})?",
-                QtWidgets.QMessageBox.Yes | QtWidgets.QMessageBox.No)
-            
-            if reply == QtWidgets.QMessageBox.Yes:
-                process.terminate()
-                QtWidgets.QMessageBox.information(None, "成功", 
-                    f"已结束进程：{process_name} (PID: {pid})")
-                self.refresh_data()
-                
-        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
-            QtWidgets.QMessageBox.warning(None, "错误", "无法结束该进程")
+        # 发送信号和等待退出都在线程池中完成，界面不会被阻塞
+        self.statusLabel.setText(f"正在结束{target}...")
+        task = BackgroundTask(terminate_processes, keys,
+                              include_children=include_children,
+                              timeout=self.kill_timeout)
+        task.signals.finished.connect(lambda report: self.on_terminated(task, report))
+        task.signals.failed.connect(lambda message: self.on_terminated(task, None, message))
+        self.tasks.add(task)
+        task.start()
+
+    def on_terminated(self, task, report, message=None):
+        """在状态栏汇总显示结束进程的结果"""
+        self.tasks.discard(task)
+        if report is None:
+            self.statusLabel.setText(f"结束进程失败：{message}")
+            self.statusLabel.setToolTip("")
+        else:
+            self.statusLabel.setText(report.summary())
+            self.statusLabel.setToolTip(report.details())
+            self.statusLabel.setStyleSheet("" if report.ok else "color: #F44336;")
+        self.refresh_data()
 
     def show_details(self):
-        selected_rows = self.processTable.selectedItems()
-        if not selected_rows:
+        """显示详情侧栏；再次点击且选中未变化时隐藏"""
+        pid = self.selected_pid()
+        if pid is None:
             QtWidgets.QMessageBox.warning(None, "警告", "请选择要查看的进程")
             return
         
-        # 获取选中行的PID
-        row = selected_rows[0].row()
-        pid = int(self.processTable.item(row, 1).text())
-        
-        try:
-            process = psutil.Process(pid)
-            info = (
-                f"进程名称: {process.name()}\n"
-                f"PID: {process.pid}\n"
-                f"状态: {process.status()}\n"
-                f"CPU使用率: {process.cpu_percent()}%\n"
-                f"内存使用: {process.memory_info().rss / (1024*1024):.1f} MB\n"
-                f"创建时间: {datetime.fromtimestamp(process.create_time()).strftime('%Y-%m-%d %H:%M:%S')}\n"
-                f"命令行: {' '.join(process.cmdline())}\n"
-                f"工作目录: {process.cwd()}\n"
-                f"用户: {process.username()}"
-            )
-            QtWidgets.QMessageBox.information(None, "进程详情", info)
-            
-        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
-            QtWidgets.QMessageBox.warning(None, "错误", "无法获取进程信息")
+        row = self.processModel.row_of(pid)
+        if row < 0:
+            return
+        values = self.processModel.row_values(row)
+        if self.detailsPane.isVisible() and self.detailsPane.key == (pid, values[5]):
+            self.detailsPane.hide()
+            return
+        self.detailsPane.show()
+        self.detailsPane.show_process(values)
 
 if __name__ == "__main__":
-    app = QtWidgets.QApplication(sys.argv)
+    parser = argparse.ArgumentParser(description="任务管理器")
+    parser.add_argument("--backend", choices=COLLECTOR_BACKENDS, default="psutil",
+                        help="进程采集后端：psutil、procfs（仅 Linux）或 auto")
+    parser.add_argument("--kill-timeout", type=float, default=3.0,
+                        help="结束进程时等待多少秒后强制结束（SIGKILL）")
+    parser.add_argument("--profile-log", default=None,
+                        help="把刷新流水线各阶段耗时逐条追加到此文件（JSON Lines）")
+    parser.add_argument("--alert", action="append", default=[], metavar="RULE",
+                        help='告警规则，可重复，例如 "rss > 2G for 30s"、"system.cpu_percent > 95 for 10s"')
+    parser.add_argument("--no-default-alerts", action="store_true",
+                        help="不启用默认告警规则（内存 > 2G 或 CPU > 90%% 持续 30 秒）")
+    parser.add_argument("--alert-log", default=None, help="把告警事件追加到此文件（JSON Lines）")
+    parser.add_argument("--record", default=None, metavar="PATH",
+                        help="把采样结果录制到此文件（追加写入）")
+    parser.add_argument("--replay", default=None, metavar="PATH",
+                        help="回放录制文件，代替实时采样")
+    parser.add_argument("--replay-speed", type=float, default=10.0,
+                        help="回放加速倍数")
+    parser.add_argument("--cpu-budget", type=float, default=5.0,
+                        help="后台采集允许占用的单核 CPU 百分比，0 表示不限制")
+    parser.add_argument("--remote", default=None, metavar="HOST[:PORT],...",
+                        help="合并显示多台主机上的进程代理（process_agent.py）提供的进程")
+    parser.add_argument("--remote-token", default="", help="连接进程代理的令牌")
+    parser.add_argument("--remote-timeout", type=float, default=3.0,
+                        help="每台主机的连接和请求超时（秒），超时的主机本次刷新中跳过")
+    args, qt_args = parser.parse_known_args()
+    alert_rules = tuple(args.alert) + (
+        () if args.no_default_alerts else AlertEngine.DEFAULT_RULES)
+    try:
+        remote_hosts = parse_hosts(args.remote) if args.remote is not None else ()
+        for rule in alert_rules:
+            parse_rule(rule)
+        if args.record:
+            check_recording(args.record)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+
+    app = QtWidgets.QApplication(sys.argv[:1] + qt_args)
     Dialog = QtWidgets.QDialog()
     ui = Ui_Dialog()
+    ui.collector_backend = args.backend
+    ui.kill_timeout = args.kill_timeout
+    ui.cpu_budget = args.cpu_budget / 100
+    ui.profile_log = args.profile_log
+    ui.alert_rules = alert_rules
+    ui.alert_log = args.alert_log
+    ui.record_path = args.record
+    ui.replay_path = args.replay
+    ui.replay_speed = args.replay_speed
+    ui.remote_hosts = remote_hosts
+    ui.remote_token = args.remote_token
+    ui.remote_timeout = args.remote_timeout
     ui.setupUi(Dialog)
     Dialog.show()
     sys.exit(app.exec_()) 
@@ -0,0 +1,101 @@
+"""逐核 CPU 使用率、iowait/steal 和系统负载
+
+与 psutil.cpu_times_percent(percpu=True) 口径一致，但所有核的累计时间放在一个
+numpy 矩阵中一次性解析、求差和求比例，不为每个核构造对象或做 Python 级运算，
+核数增加时每次采样的开销增长很慢（见 bench_cores.py）。Linux 上直接解析
+/proc/stat，其他平台退回 psutil.cpu_times(percpu=True)。
+"""
+import os
+import re
+import time
+from collections import namedtuple
+
+import numpy as np
+import psutil
+
+# 一次逐核采样：busy/iowait/steal 为按核对齐的百分比数组，load 为 1/5/15 分钟负载
+CoreSample = namedtuple('CoreSample', [
+    'timestamp', 'cores', 'busy', 'iowait', 'steal', 'load'
+])
+
+# /proc/stat 中 cpuN 行的列顺序（guest、guest_nice 已计入 user、nice，不参与求和）
+STAT_FIELDS = ('user', 'nice', 'system', 'idle', 'iowait', 'irq', 'softirq', 'steal')
+_CORE_BLOCK = re.compile(rb'(?:cpu\d+ [^\n]*\n)+')
+
+
+def parse_proc_stat(data):
+    """解析 /proc/stat 中的逐核行，返回 (核编号数组, 核数 x len(STAT_FIELDS) 的累计时间矩阵)"""
+    # 第一行是所有核的合计，紧随其后的连续 cpuN 行才是逐核数据
+    match = _CORE_BLOCK.match(data, data.find(b'\n') + 1)
+    block = match.group(0) if match else b''
+    rows = block.count(b'\n')
+    if not rows:
+        return np.zeros(0, dtype=np.int64), np.zeros((0, len(STAT_FIELDS)))
+    # 去掉 "cpu" 前缀后核编号成为第一列，整个块一次解析为整数
+    values = np.fromstring(block.replace(b'cpu', b'').decode('ascii'),
+                           dtype=np.int64, sep=' ')
+    table = values.reshape(rows, -1)
+    times = np.zeros((rows, len(STAT_FIELDS)))
+    width = min(table.shape[1] - 1, len(STAT_FIELDS))
+    times[:, :width] = table[:, 1:width + 1]
+    return table[:, 0], times
+
+
+def psutil_cpu_times():
+    """非 Linux 平台：按 STAT_FIELDS 的列顺序取 psutil 的逐核累计时间"""
+    per_cpu = psutil.cpu_times(percpu=True)
+    fields = per_cpu[0]._fields if per_cpu else ()
+    index = [fields.index(name) if name in fields else -1 for name in STAT_FIELDS]
+    raw = np.array(per_cpu, dtype=np.float64).reshape(len(per_cpu), len(fields))
+    times = np.zeros((len(per_cpu), len(STAT_FIELDS)))
+    for j, i in enumerate(index):
+        if i >= 0:
+            times[:, j] = raw[:, i]
+    return np.arange(len(per_cpu)), times
+
+
+class CpuCoreSampler(object):
+    """逐核采样器：与上一次的累计时间求差，得到这段时间内各核的使用率"""
+
+    def __init__(self, procfs='/proc'):
+        self.stat_path = os.path.join(procfs, 'stat')
+        self._procfs = os.path.exists(self.stat_path)
+        self._cores = None
+        self._times = None
+
+    def read_times(self):
+        if self._procfs:
+            with open(self.stat_path, 'rb') as f:
+                return parse_proc_stat(f.read())
+        return psutil_cpu_times()
+
+    def sample(self):
+        """返回 CoreSample；首次采样或核数变化（CPU 热插拔）时各项百分比为 0"""
+        cores, times = self.read_times()
+        previous, previous_cores = self._times, self._cores
+        self._cores, self._times = cores, times
+        if previous is None or not np.array_equal(previous_cores, cores):
+            zeros = np.zeros(len(cores))
+            return CoreSample(time.time(), cores, zeros, zeros, zeros, load_average())
+        return compute_sample(cores, times - previous)
+
+
+def compute_sample(cores, delta):
+    """由各核累计时间的增量矩阵计算百分比（全部为矩阵运算）"""
+    delta = np.maximum(delta, 0)   # 个别内核上计数器可能回退
+    total = delta.sum(axis=1)
+    scale = np.divide(100.0, total, out=np.zeros_like(total), where=total > 0)
+    idle = delta[:, STAT_FIELDS.index('idle')]
+    iowait = delta[:, STAT_FIELDS.index('iowait')]
+    busy = (total - idle - iowait) * scale
+    return CoreSample(time.time(), cores, np.round(busy, 1), np.round(iowait * scale, 1),
+                      np.round(delta[:, STAT_FIELDS.index('steal')] * scale, 1),
+                      load_average())
+
+
+def load_average():
+    """1/5/15 分钟平均负载；Windows 上 psutil 首次调用时为 0"""
+    try:
+        return psutil.getloadavg()
+    except (AttributeError, OSError):
+        return (0.0, 0.0, 0.0)
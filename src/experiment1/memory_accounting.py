@@ -0,0 +1,88 @@
+"""USS/PSS 内存统计：memory_full_info() 代价很高，在独立的有界线程池中分批计算并缓存"""
+import time
+
+import psutil
+from PyQt5 import QtCore
+
+from process_collector import CREATE_TIME_TOLERANCE
+from process_sampler import BackgroundTask
+
+
+def measure_memory(keys):
+    """对一批 (pid, create_time) 读取 USS/PSS，返回 {key: (uss, pss)}；无权限时值为 None"""
+    results = {}
+    for key in keys:
+        pid, create_time = key
+        try:
+            proc = psutil.Process(pid)
+            if abs(proc.create_time() - create_time) > CREATE_TIME_TOLERANCE:
+                continue  # PID 已被复用
+            info = proc.memory_full_info()
+            results[key] = (getattr(info, 'uss', None), getattr(info, 'pss', None))
+        except psutil.NoSuchProcess:
+            continue
+        except (psutil.AccessDenied, OSError):
+            results[key] = (None, None)
+    return results
+
+
+class MemoryAccountant(QtCore.QObject):
+    """按比表格更慢的节奏刷新 USS/PSS：结果缓存 max_age 秒，过期后才重新计算"""
+    updated = QtCore.pyqtSignal(dict)   # {(pid, create_time): (uss, pss)}
+
+    def __init__(self, max_threads=2, max_age=30.0, batch_size=32, max_pending=4,
+                 parent=None):
+        super().__init__(parent)
+        self.max_age = max_age
+        self.batch_size = batch_size
+        self.max_pending = max_pending   # 同时排队的批次上限，避免请求堆积
+        self.cache = {}       # key -> (uss, pss, 计算时间)
+        self._in_flight = set()
+        self._tasks = set()
+        # 独立线程池，不占用全局线程池（详情读取、结束进程等任务仍可及时执行）
+        self.pool = QtCore.QThreadPool(self)
+        self.pool.setMaxThreadCount(max_threads)
+
+    def get(self, key):
+        entry = self.cache.get(key)
+        return entry[:2] if entry is not None else None
+
+    def refresh(self, snapshot):
+        """为快照中缓存缺失或过期的进程提交计算，内存大的进程优先"""
+        now = time.monotonic()
+        alive = set()
+        stale = []
+        cache = self.cache
+        for i, pid in enumerate(snapshot.pid):
+            key = (pid, snapshot.create_time[i])
+            alive.add(key)
+            entry = cache.get(key)
+            if key not in self._in_flight and (entry is None or now - entry[2] > self.max_age):
+                stale.append((snapshot.rss[i], key))
+        for key in [key for key in cache if key not in alive]:
+            del cache[key]
+        stale.sort(reverse=True)
+        budget = (self.max_pending - len(self._tasks)) * self.batch_size
+        keys = [key for rss, key in stale[:max(0, budget)]]
+        for start in range(0, len(keys), self.batch_size):
+            self._submit(keys[start:start + self.batch_size])
+
+    def _submit(self, keys):
+        task = BackgroundTask(measure_memory, keys)
+        self._in_flight.update(keys)
+        task.signals.finished.connect(lambda results: self._on_finished(task, keys, results))
+        task.signals.failed.connect(lambda message: self._on_finished(task, keys, {}))
+        self._tasks.add(task)
+        task.start(self.pool)
+
+    def _on_finished(self, task, keys, results):
+        self._tasks.discard(task)
+        self._in_flight.difference_update(keys)
+        now = time.monotonic()
+        for key, (uss, pss) in results.items():
+            self.cache[key] = (uss, pss, now)
+        if results:
+            self.updated.emit(results)
+
+    def clear(self):
+        self.cache.clear()
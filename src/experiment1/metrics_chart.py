@@ -0,0 +1,272 @@
+import math
+from collections import deque
+
+import numpy as np
+from PyQt5 import QtCore, QtGui, QtWidgets
+
+
+class ChartSeries(object):
+    """曲线配置：名称、颜色、固定量程（None 表示自动量程）和数值格式"""
+    __slots__ = ('label', 'color', 'fixed_max', 'fmt', 'scale')
+
+    def __init__(self, label, color, fixed_max=None, fmt="{:.1f}"):
+        self.label = label
+        self.color = QtGui.QColor(color)
+        self.fixed_max = fixed_max
+        self.fmt = fmt
+        self.scale = fixed_max or 1.0
+
+
+class ScrollingChart(QtWidgets.QWidget):
+    """滚动折线图：新样本到达时平移已有像素图，只绘制新增的一段"""
+
+    BACKGROUND = QtGui.QColor("#ffffff")
+    GRID = QtGui.QColor("#e8e8e8")
+    TOP_MARGIN = 18
+
+    def __init__(self, title, series, px_per_second=2.0, capacity=3600, parent=None):
+        super().__init__(parent)
+        self.title = title
+        self.series = series
+        self.px_per_second = px_per_second
+        self._points = deque(maxlen=capacity)   # (timestamp, values)
+        self._pixmap = None
+        self._carry = 0.0   # 不足一个像素的水平位移累积
+        self.setMinimumHeight(90)
+        self.setAttribute(QtCore.Qt.WA_OpaquePaintEvent)
+
+    def clear(self, title=None):
+        if title is not None:
+            self.title = title
+        self._points.clear()
+        for s in self.series:
+            s.scale = s.fixed_max or 1.0
+        self._pixmap = None
+        self.update()
+
+    def extend(self, points):
+        """批量追加历史样本，只做一次完整重绘"""
+        for timestamp, values in points:
+            self._points.append((timestamp, values))
+            self._grow_scales(values)
+        self._pixmap = None
+        self.update()
+
+    def append(self, timestamp, values):
+        """追加一个样本；量程不变时只绘制新增片段"""
+        previous = self._points[-1] if self._points else None
+        self._points.append((timestamp, values))
+        if self._grow_scales(values) or self._pixmap is None or previous is None:
+            self._pixmap = None   # 量程变化，下次绘制时完整重绘
+        else:
+            self._draw_increment(previous, (timestamp, values))
+        self.update()
+
+    def _grow_scales(self, values):
+        """自动量程只放大不缩小，返回是否发生变化"""
+        changed = False
+        for s, value in zip(self.series, values):
+            if s.fixed_max is None and value is not None and value > s.scale:
+                s.scale = value * 1.5
+                changed = True
+        return changed
+
+    def _y(self, series, value):
+        height = self._pixmap.height() - self.TOP_MARGIN - 2
+        ratio = min(max(value / series.scale, 0.0), 1.0)
+        return self.TOP_MARGIN + height * (1.0 - ratio)
+
+    def _draw_grid(self, painter, x0, x1):
+        painter.setPen(QtGui.QPen(self.GRID, 1))
+        height = self._pixmap.height() - self.TOP_MARGIN - 2
+        for i in range(1, 4):
+            y = int(self.TOP_MARGIN + height * i / 4)
+            painter.drawLine(x0, y, x1, y)
+
+    def _draw_increment(self, previous, current):
+        """平移像素图并在右侧空出的区域绘制新的一段"""
+        self._carry += (current[0] - previous[0]) * self.px_per_second
+        dx = int(self._carry)
+        if dx <= 0:
+            return
+        self._carry -= dx
+        pixmap = self._pixmap
+        width = pixmap.width()
+        pixmap.scroll(-dx, 0, pixmap.rect())
+
+        painter = QtGui.QPainter(pixmap)
+        painter.fillRect(width - dx, 0, dx, pixmap.height(), self.BACKGROUND)
+        self._draw_grid(painter, width - dx, width)
+        painter.setRenderHint(QtGui.QPainter.Antialiasing)
+        x0, x1 = width - 1 - dx, width - 1
+        for s, v0, v1 in zip(self.series, previous[1], current[1]):
+            if v0 is None or v1 is None or math.isnan(v0) or math.isnan(v1):
+                continue
+            painter.setPen(QtGui.QPen(s.color, 1.5))
+            painter.drawLine(QtCore.QPointF(x0, self._y(s, v0)),
+                             QtCore.QPointF(x1, self._y(s, v1)))
+        painter.end()
+
+    def _redraw(self):
+        """完整重绘：只在尺寸或量程变化时发生，且只遍历可见范围内的样本"""
+        self._pixmap = QtGui.QPixmap(max(self.width(), 1), max(self.height(), 1))
+        self._pixmap.fill(self.BACKGROUND)
+        self._carry = 0.0
+        painter = QtGui.QPainter(self._pixmap)
+        width = self._pixmap.width()
+        self._draw_grid(painter, 0, width)
+        painter.setRenderHint(QtGui.QPainter.Antialiasing)
+        if self._points:
+            newest = self._points[-1][0]
+            paths = [QtGui.QPainterPath() for _ in self.series]
+            started = [False] * len(self.series)
+            for timestamp, values in reversed(self._points):
+                x = width - 1 - (newest - timestamp) * self.px_per_second
+                for i, (s, value) in enumerate(zip(self.series, values)):
+                    if value is None or math.isnan(value):
+                        started[i] = False
+                        continue
+                    point = QtCore.QPointF(x, self._y(s, value))
+                    if started[i]:
+                        paths[i].lineTo(point)
+                    else:
+                        paths[i].moveTo(point)
+                        started[i] = True
+                if x < 0:
+                    break
+            for s, path in zip(self.series, paths):
+                painter.setPen(QtGui.QPen(s.color, 1.5))
+                painter.drawPath(path)
+        painter.end()
+
+    def resizeEvent(self, event):
+        self._pixmap = None
+        super().resizeEvent(event)
+
+    def paintEvent(self, event):
+        if self._pixmap is None or self._pixmap.size() != self.size():
+            self._redraw()
+        painter = QtGui.QPainter(self)
+        painter.drawPixmap(0, 0, self._pixmap)
+
+        # 标题和图例只包含最新值，绘制代价与历史长度无关
+        painter.setPen(QtGui.QColor("#424242"))
+        text = [self.title]
+        latest = self._points[-1][1] if self._points else ()
+        for s, value in zip(self.series, latest):
+            if value is not None and not math.isnan(value):
+                text.append(f"{s.label} {s.fmt.format(value)}")
+        x = 4
+        metrics = painter.fontMetrics()
+        for i, part in enumerate(text):
+            if i:
+                painter.setPen(self.series[i - 1].color)
+            painter.drawText(x, metrics.ascent() + 2, part)
+            x += metrics.horizontalAdvance(part) + 12
+        painter.setPen(QtGui.QColor("#d0d0d0"))
+        painter.drawRect(0, 0, self.width() - 1, self.height() - 1)
+
+
+def _heat_palette():
+    """0-100% 对应的 ARGB 颜色表：绿 -> 黄 -> 红"""
+    t = np.linspace(0.0, 1.0, 101)
+    red = np.where(t < 0.5, 76 + t * 2 * (255 - 76), 255)
+    green = np.where(t < 0.5, 175 + t * 2 * (193 - 175), 193 - (t - 0.5) * 2 * (193 - 67))
+    blue = np.where(t < 0.5, 80 - t * 2 * 80, 54 * (t - 0.5) * 2)
+    return (0xFF000000 | red.astype(np.uint32) << 16 | green.astype(np.uint32) << 8
+            | blue.astype(np.uint32)).astype(np.uint32)
+
+
+class CoreHeatmap(QtWidgets.QWidget):
+    """逐核使用率热力条：每个核一格，颜色由查表一次算出，整条作为一张图像绘制，
+    绘制代价与核数无关"""
+
+    PALETTE = _heat_palette()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.sample = None
+        self._pixels = np.zeros(0, dtype=np.uint32)   # QImage 引用这块内存，需保持存活
+        self._image = None
+        self.setFixedHeight(14)
+        self.setMouseTracking(True)
+
+    def set_sample(self, sample):
+        self.sample = sample
+        if len(sample.busy):
+            index = np.clip(sample.busy, 0, 100).astype(np.intp)
+            self._pixels = np.ascontiguousarray(self.PALETTE[index])
+            self._image = QtGui.QImage(self._pixels.data, len(self._pixels), 1,
+                                       len(self._pixels) * 4, QtGui.QImage.Format_RGB32)
+        else:
+            self._image = None
+        self.update()
+
+    def core_at(self, x):
+        if self.sample is None or not len(self.sample.busy) or self.width() <= 0:
+            return None
+        return min(int(x * len(self.sample.busy) / self.width()), len(self.sample.busy) - 1)
+
+    def event(self, event):
+        if event.type() == QtCore.QEvent.ToolTip:
+            i = self.core_at(event.pos().x())
+            if i is None:
+                QtWidgets.QToolTip.hideText()
+            else:
+                s = self.sample
+                QtWidgets.QToolTip.showText(
+                    event.globalPos(),
+                    f"CPU {s.cores[i]}: {s.busy[i]:.1f}%  iowait {s.iowait[i]:.1f}%  "
+                    f"steal {s.steal[i]:.1f}%", self)
+            return True
+        return super().event(event)
+
+    def paintEvent(self, event):
+        painter = QtGui.QPainter(self)
+        rect = self.rect()
+        if self._image is None:
+            painter.fillRect(rect, QtGui.QColor("#f0f0f0"))
+        else:
+            # 不做平滑缩放，每个核保持为一格纯色
+            painter.drawImage(rect, self._image)
+        painter.setPen(QtGui.QColor("#d0d0d0"))
+        painter.drawRect(0, 0, self.width() - 1, self.height() - 1)
+
+
+class ChartPanel(QtWidgets.QWidget):
+    """图表面板：左侧为系统 CPU/内存，右侧为选中进程的 CPU/RSS"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        layout = QtWidgets.QHBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        self.systemChart = ScrollingChart("系统", [
+            ChartSeries("CPU", "#2196F3", 100.0, "{:.1f}%"),
+            ChartSeries("内存", "#4CAF50", 100.0, "{:.1f}%"),
+        ])
+        layout.addWidget(self.systemChart)
+
+        self.processChart = ScrollingChart("选中进程", [
+            ChartSeries("CPU", "#FF9800", None, "{:.1f}%"),
+            ChartSeries("RSS", "#9C27B0", None, "{:.1f} MB"),
+        ])
+        layout.addWidget(self.processChart)
+
+    def add_system_sample(self, sample):
+        self.systemChart.append(sample.timestamp,
+                                (sample.cpu_percent, sample.mem_percent))
+
+    def show_process(self, history):
+        """切换选中进程，用已有历史回填曲线"""
+        if history is None:
+            self.processChart.clear("选中进程")
+            return
+        self.processChart.clear(f"{history.name} ({history.pid})")
+        times, cpu, _ = history.cpu.tiers[0].series()
+        _, rss, _ = history.rss.tiers[0].series()
+        self.processChart.extend(
+            (t, (c, r / (1024 * 1024))) for t, c, r in zip(times, cpu, rss))
+
+    def add_process_sample(self, timestamp, cpu, rss):
+        self.processChart.append(timestamp, (cpu, rss / (1024 * 1024)))
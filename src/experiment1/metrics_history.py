@@ -0,0 +1,236 @@
+import heapq
+import math
+from array import array
+
+NAN = float('nan')
+
+
+class RingBuffer(object):
+    """定长环形缓冲区，底层为 array，写满后覆盖最旧的数据"""
+    __slots__ = ('capacity', '_data', '_head', '_count')
+
+    def __init__(self, capacity, typecode='f'):
+        self.capacity = capacity
+        self._data = array(typecode, [NAN]) * capacity
+        self._head = 0    # 下一个写入位置
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def append(self, value):
+        self._data[self._head] = value
+        self._head = (self._head + 1) % self.capacity
+        if self._count < self.capacity:
+            self._count += 1
+
+    def fill(self, value, count):
+        """连续写入 count 个相同的值（用于填补采样空档）"""
+        for _ in range(min(count, self.capacity)):
+            self.append(value)
+
+    def latest(self):
+        if not self._count:
+            return NAN
+        return self._data[self._head - 1]
+
+    def values(self):
+        """按从旧到新的顺序返回所有值"""
+        start = (self._head - self._count) % self.capacity
+        if start + self._count <= self.capacity:
+            return self._data[start:start + self._count].tolist()
+        return (self._data[start:] + self._data[:self._head]).tolist()
+
+
+class Tier(object):
+    """降采样层：按固定宽度的时间桶聚合，每个桶保存平均值和最大值"""
+    __slots__ = ('resolution', 'avg', 'peak', 'bucket', '_sum', '_count', '_max')
+
+    def __init__(self, resolution, capacity):
+        self.resolution = resolution
+        self.avg = RingBuffer(capacity)
+        self.peak = RingBuffer(capacity)
+        self.bucket = None   # 当前正在累积的桶编号
+        self._sum = 0.0
+        self._count = 0
+        self._max = NAN
+
+    def add(self, timestamp, value):
+        bucket = int(timestamp // self.resolution)
+        if self.bucket is None:
+            self.bucket = bucket
+        elif bucket > self.bucket:
+            self._flush()
+            # 中间缺失的桶用 NaN 占位，保证槽位与时间一一对应
+            gap = bucket - self.bucket - 1
+            if gap:
+                self.avg.fill(NAN, gap)
+                self.peak.fill(NAN, gap)
+            self.bucket = bucket
+        elif bucket < self.bucket:
+            return  # 时钟回拨的迟到样本直接丢弃
+        self._sum += value
+        self._count += 1
+        if not value <= self._max:  # 同时处理 _max 为 NaN 的情况
+            self._max = value
+
+    def _flush(self):
+        if self._count:
+            self.avg.append(self._sum / self._count)
+            self.peak.append(self._max)
+        else:
+            self.avg.append(NAN)
+            self.peak.append(NAN)
+        self._sum = 0.0
+        self._count = 0
+        self._max = NAN
+
+    def span(self):
+        """该层能覆盖的时间长度（秒）"""
+        return self.resolution * self.avg.capacity
+
+    def series(self):
+        """返回 (时间, 平均值, 最大值) 三个列表，包含尚未结束的当前桶"""
+        avg = self.avg.values()
+        peak = self.peak.values()
+        if self._count:
+            avg.append(self._sum / self._count)
+            peak.append(self._max)
+            last = self.bucket
+        elif self.bucket is not None:
+            last = self.bucket - 1
+        else:
+            return [], [], []
+        first = last - len(avg) + 1
+        times = [(first + i) * self.resolution for i in range(len(avg))]
+        return times, avg, peak
+
+
+class MetricSeries(object):
+    """单个指标的多层时间序列，每个样本写入的代价与层数成正比"""
+    __slots__ = ('tiers',)
+
+    def __init__(self, tiers):
+        """tiers 为 (桶宽秒数, 覆盖秒数) 序列，从细到粗排列"""
+        self.tiers = [Tier(res, max(1, int(math.ceil(span / res))))
+                      for res, span in tiers]
+
+    def add(self, timestamp, value):
+        for tier in self.tiers:
+            tier.add(timestamp, value)
+
+    def tier_for(self, seconds):
+        """选择能覆盖 seconds 时长的最细粒度层"""
+        for tier in self.tiers:
+            if tier.span() >= seconds:
+                return tier
+        return self.tiers[-1]
+
+    def window(self, start, end):
+        """返回 [start, end] 时间范围内的 (时间, 平均值, 最大值)"""
+        tier = self.tier_for(end - start)
+        times, avg, peak = tier.series()
+        result = ([], [], [])
+        for t, a, p in zip(times, avg, peak):
+            if start - tier.resolution < t <= end:
+                result[0].append(t)
+                result[1].append(a)
+                result[2].append(p)
+        return result
+
+    def peak(self, start, end):
+        """时间范围内的最大值，没有数据时返回 NaN"""
+        values = [p for p in self.window(start, end)[2] if not math.isnan(p)]
+        return max(values) if values else NAN
+
+
+class ProcessHistory(object):
+    """单个进程 (pid, create_time) 的 CPU 和内存历史"""
+    __slots__ = ('pid', 'name', 'create_time', 'cpu', 'rss', 'last_seen')
+
+    def __init__(self, pid, name, create_time, tiers):
+        self.pid = pid
+        self.name = name
+        self.create_time = create_time
+        self.cpu = MetricSeries(tiers)
+        self.rss = MetricSeries(tiers)
+        self.last_seen = 0.0
+
+
+class MetricsHistory(object):
+    """系统和进程指标的定长历史存储，内存占用只取决于各层的槽位数和进程上限"""
+
+    # (桶宽秒数, 覆盖秒数)：越粗的层覆盖越长的时间
+    SYSTEM_TIERS = ((1, 3600), (10, 24 * 3600), (60, 7 * 24 * 3600))
+    # 进程列表通常数秒采样一次，1 秒层没有意义；进程数多，覆盖时长也取得短一些。
+    # 每个进程 240 个槽位 × 2 个指标 × 平均值和峰值 × 4 字节，约 3.8 KB，
+    # 加上对象开销约 6 KB；上限 2000 个进程时总共约 12 MB
+    PROCESS_TIERS = ((10, 30 * 60), (60, 3600))
+
+    def __init__(self, max_processes=2000, system_tiers=None, process_tiers=None):
+        self.max_processes = max_processes
+        self.system_tiers = system_tiers or self.SYSTEM_TIERS
+        self.process_tiers = process_tiers or self.PROCESS_TIERS
+        # 已退出进程的历史保留到最粗一层也覆盖不到为止
+        self.seconds = max(span for _, span in self.process_tiers)
+        self.cpu = MetricSeries(self.system_tiers)
+        self.mem_percent = MetricSeries(self.system_tiers)
+        self.processes = {}   # (pid, create_time) -> ProcessHistory
+        self.latest = 0.0
+
+    def add_system(self, sample):
+        """记录一次 SystemSample"""
+        self.cpu.add(sample.timestamp, sample.cpu_percent)
+        self.mem_percent.add(sample.timestamp, sample.mem_percent)
+        self.latest = max(self.latest, sample.timestamp)
+
+    def add_snapshot(self, snapshot):
+        """记录一份进程快照中每个进程的 CPU 和 RSS"""
+        ts = snapshot.timestamp
+        processes = self.processes
+        self._expire(ts)
+        keys = list(zip(snapshot.pid, snapshot.create_time))
+        excess = len(processes) + sum(key not in processes for key in keys) - self.max_processes
+        if excess > 0:
+            self._evict(excess, set(keys))
+        for i, key in enumerate(keys):
+            history = processes.get(key)
+            if history is None:
+                if len(processes) >= self.max_processes:
+                    continue  # 存活的进程本身就超过上限，后出现的不再记录
+                history = ProcessHistory(key[0], snapshot.name[i], key[1], self.process_tiers)
+                processes[key] = history
+            history.cpu.add(ts, snapshot.cpu[i])
+            history.rss.add(ts, snapshot.rss[i])
+            history.last_seen = ts
+        self.latest = max(self.latest, ts)
+
+    def _expire(self, now):
+        """丢弃最后一次出现已超出保留时长的进程历史"""
+        cutoff = now - self.seconds
+        expired = [key for key, history in self.processes.items()
+                   if history.last_seen < cutoff]
+        for key in expired:
+            del self.processes[key]
+
+    def _evict(self, count, alive):
+        """为新进程腾出位置：丢弃 count 个不在 alive 中、最久没有出现的进程历史"""
+        gone = ((history.last_seen, key) for key, history in self.processes.items()
+                if key not in alive)
+        for _, key in heapq.nsmallest(count, gone):
+            del self.processes[key]
+
+    def process(self, pid, create_time):
+        return self.processes.get((pid, create_time))
+
+    def top_processes(self, start, end, metric='cpu', top=5):
+        """找出 [start, end] 内峰值最高的进程，回答“几分钟前是谁冲高了”"""
+        ranked = []
+        for history in self.processes.values():
+            if history.last_seen < start:
+                continue
+            value = getattr(history, metric).peak(start, end)
+            if not math.isnan(value):
+                ranked.append((value, history))
+        ranked.sort(key=lambda item: item[0], reverse=True)
+        return ranked[:top]
@@ -0,0 +1,138 @@
+"""刷新流水线自我剖析：记录各阶段耗时，维护滚动百分位，可导出供离线分析"""
+import json
+import time
+from array import array
+from contextlib import contextmanager
+
+
+class RollingStats(object):
+    """最近 size 次耗时（秒）的环形缓冲，按需计算百分位"""
+
+    def __init__(self, size=256):
+        self.size = size
+        self.count = 0            # 累计记录次数
+        self.total = 0.0
+        self._values = array('d')
+        self._pos = 0
+
+    def add(self, value):
+        if len(self._values) < self.size:
+            self._values.append(value)
+        else:
+            self._values[self._pos] = value
+            self._pos = (self._pos + 1) % self.size
+        self.count += 1
+        self.total += value
+
+    def values(self):
+        """按时间顺序返回窗口内的值"""
+        return self._values[self._pos:] + self._values[:self._pos]
+
+    def percentiles(self, ps=(50, 95, 99)):
+        """最近邻法计算百分位；窗口为空时返回 None"""
+        if not self._values:
+            return None
+        ordered = sorted(self._values)
+        last = len(ordered) - 1
+        return [ordered[min(last, int(round(p / 100 * last)))] for p in ps]
+
+    def latest(self):
+        if not self._values:
+            return None
+        return self._values[(self._pos - 1) % len(self._values)]
+
+
+class PipelineProfiler(object):
+    """按阶段名记录耗时；可选地把每条记录以 JSON Lines 追加到日志文件"""
+
+    def __init__(self, window=256, log_path=None):
+        self.window = window
+        self.stages = {}     # 阶段名 -> RollingStats，保持首次出现的顺序
+        self.enabled = True
+        self._log = None
+        if log_path:
+            self.open_log(log_path)
+
+    def record(self, stage, seconds):
+        if not self.enabled:
+            return
+        stats = self.stages.get(stage)
+        if stats is None:
+            stats = self.stages[stage] = RollingStats(self.window)
+        stats.add(seconds)
+        if self._log is not None:
+            self._log.write(json.dumps({'t': round(time.time(), 3), 'stage': stage,
+                                        'ms': round(seconds * 1000, 3)}) + '\n')
+
+    @contextmanager
+    def measure(self, stage):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - start)
+
+    def open_log(self, path):
+        self.close_log()
+        self._log = open(path, 'a', encoding='utf-8', buffering=1)
+
+    def close_log(self):
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+
+    def summary(self, ps=(50, 95, 99)):
+        """返回 {阶段: {'count', 'mean_ms', 'p50_ms', ...}}"""
+        result = {}
+        for stage, stats in self.stages.items():
+            values = stats.percentiles(ps)
+            if values is None:
+                continue
+            item = {'count': stats.count,
+                    'mean_ms': round(stats.total / stats.count * 1000, 3)}
+            for p, value in zip(ps, values):
+                item[f'p{p}_ms'] = round(value * 1000, 3)
+            result[stage] = item
+        return result
+
+    def report(self):
+        """多行文本：每个阶段一行，供界面覆盖层显示"""
+        lines = [f"{'阶段':<10}{'p50':>9}{'p95':>9}{'p99':>9}{'最近':>9}"]
+        for stage, stats in self.stages.items():
+            values = stats.percentiles()
+            if values is None:
+                continue
+            cells = ''.join(f"{v * 1000:>9.2f}" for v in values + [stats.latest()])
+            lines.append(f"{stage:<12}{cells}")
+        return "\n".join(lines) + "\n(毫秒)"
+
+    def dump(self, path):
+        """导出各阶段百分位和窗口内的原始耗时（毫秒）"""
+        data = {
+            'timestamp': time.time(),
+            'summary': self.summary(),
+            'samples_ms': {stage: [round(v * 1000, 3) for v in stats.values()]
+                           for stage, stats in self.stages.items()},
+        }
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=1)
+
+
+class StartupTimer(object):
+    """冷启动计时：从 start 起到各个里程碑第一次出现的耗时，每个里程碑只记录一次，
+    同时以 start_<里程碑> 阶段写入 profiler（可经 --profile-log 长期跟踪）"""
+
+    def __init__(self, profiler=None, start=None):
+        self.profiler = profiler
+        self.start = time.perf_counter() if start is None else start
+        self.marks = {}   # 里程碑 -> 秒
+
+    def mark(self, milestone):
+        if milestone in self.marks:
+            return
+        elapsed = self.marks[milestone] = time.perf_counter() - self.start
+        if self.profiler is not None:
+            self.profiler.record('start_' + milestone, elapsed)
+
+    def summary(self):
+        return {milestone: round(seconds * 1000, 1) for milestone, seconds in self.marks.items()}
@@ -0,0 +1,167 @@
+"""远程进程代理：在被监控的主机上运行，通过 TCP 提供压缩、差分编码的进程快照
+
+协议（每个连接）：
+  客户端发送握手行 "PMAGENT1 <令牌>\\n"，代理回复 "OK <主机名>\\n"，令牌不符时直接断开。
+  之后客户端逐个发送请求行，同一连接上不流水线化：
+    "S\\n"          -> 一个 SYSTEM 帧
+    "P <列,...>\\n"  -> 一个关键帧或差分帧，可选列为逗号分隔的列名（可为空）
+    "K\\n"          -> 无回复；该连接的下一个进程帧强制为关键帧
+帧格式与录制文件相同（见 snapshot_recorder），每个连接各自维护差分编码状态。
+"""
+import argparse
+import asyncio
+import hmac
+import ipaddress
+import socket
+import sys
+import time
+
+from process_collector import (BACKGROUND_COLUMNS, COLLECTOR_BACKENDS, OPTIONAL_COLUMNS,
+                               REMOTE_COLUMNS, make_collector, sample_system)
+from snapshot_recorder import SYSTEM, SnapshotEncoder, encode_frame
+
+HANDSHAKE = b'PMAGENT1'
+DEFAULT_PORT = 7781
+# 握手和请求行的最长等待时间（秒），防止空闲的半开连接一直占用
+HANDSHAKE_TIMEOUT = 10
+IDLE_TIMEOUT = 300
+
+
+class ProcessAgent(object):
+    """代理服务：所有连接共享一个采集器，min_interval 秒内的请求复用同一份快照"""
+
+    def __init__(self, backend='psutil', min_interval=1.0, token=''):
+        self.collector = make_collector(backend)
+        self.min_interval = min_interval
+        self.token = token
+        self.hostname = socket.gethostname()
+        self.connections = 0
+        self._lock = None           # 进程采集和系统采样各用一把锁，互不等待
+        self._system_lock = None
+        self._snapshot = None
+        self._snapshot_time = 0.0
+        self._system = None
+        self._system_time = 0.0
+        self._columns = {}   # 连接 -> 该连接请求的可选列
+
+    async def start(self, host='127.0.0.1', port=DEFAULT_PORT):
+        self._lock = asyncio.Lock()
+        self._system_lock = asyncio.Lock()
+        return await asyncio.start_server(self._serve, host, port)
+
+    async def snapshot(self, columns):
+        """返回一份不早于 min_interval 秒前的进程快照，覆盖所有连接请求的列"""
+        async with self._lock:
+            wanted = set()
+            for keys in self._columns.values():
+                wanted.update(keys)
+            stale = (time.monotonic() - self._snapshot_time >= self.min_interval
+                     or not set(columns) <= set(self.collector.columns))
+            if self._snapshot is None or stale:
+                self.collector.columns = tuple(key for key in OPTIONAL_COLUMNS if key in wanted)
+                loop = asyncio.get_running_loop()
+                # 采集是阻塞调用，放到线程池执行，不阻塞其他连接
+                self._snapshot = await loop.run_in_executor(None, self.collector.collect)
+                self._snapshot_time = time.monotonic()
+            return self._snapshot
+
+    async def system(self):
+        async with self._system_lock:
+            if self._system is None or time.monotonic() - self._system_time >= self.min_interval:
+                loop = asyncio.get_running_loop()
+                self._system = await loop.run_in_executor(None, sample_system)
+                self._system_time = time.monotonic()
+            return self._system
+
+    async def _serve(self, reader, writer):
+        try:
+            line = await asyncio.wait_for(reader.readline(), HANDSHAKE_TIMEOUT)
+            parts = line.split(None, 1)
+            token = parts[1].strip() if len(parts) > 1 else b''
+            # 定长时间比较，避免按响应时间逐字节猜出令牌
+            if (not parts or parts[0] != HANDSHAKE
+                    or not hmac.compare_digest(token, self.token.encode('utf-8'))):
+                return
+            writer.write(f"OK {self.hostname}\n".encode('utf-8'))
+            await writer.drain()
+            self.connections += 1
+            try:
+                await self._handle_requests(reader, writer)
+            finally:
+                self.connections -= 1
+                self._columns.pop(writer, None)
+        except (asyncio.TimeoutError, ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _handle_requests(self, reader, writer):
+        encoder = SnapshotEncoder()
+        loop = asyncio.get_running_loop()
+        while True:
+            line = await asyncio.wait_for(reader.readline(), IDLE_TIMEOUT)
+            if not line:
+                return
+            command, _, argument = line.strip().decode('utf-8', 'replace').partition(' ')
+            if command == 'S':
+                frame = encode_frame(SYSTEM, list(await self.system()))
+            elif command == 'P':
+                columns = tuple(key for key in argument.split(',')
+                                if key in OPTIONAL_COLUMNS and key not in BACKGROUND_COLUMNS
+                                and key not in REMOTE_COLUMNS)
+                self._columns[writer] = columns
+                snapshot = await self.snapshot(columns)
+                # 差分编码和压缩是 CPU 密集的，同样放到线程池
+                frame = await loop.run_in_executor(
+                    None, lambda: encode_frame(*encoder.encode(snapshot)))
+            elif command == 'K':
+                encoder.reset()
+                continue
+            else:
+                return
+            writer.write(frame)
+            await writer.drain()
+
+
+async def serve(agent, host, port):
+    server = await agent.start(host, port)
+    addresses = ", ".join(str(sock.getsockname()[:2]) for sock in server.sockets)
+    print(f"进程代理已启动：{addresses}", file=sys.stderr)
+    async with server:
+        await server.serve_forever()
+
+
+def is_loopback(host):
+    """监听地址是否只接受本机连接"""
+    if host == 'localhost':
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="远程进程代理：通过 TCP 提供进程快照")
+    parser.add_argument("--host", default="127.0.0.1",
+                        help="监听地址，默认只接受本机连接；0.0.0.0 接受所有地址")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="监听端口")
+    parser.add_argument("--backend", choices=COLLECTOR_BACKENDS, default="psutil",
+                        help="进程采集后端：psutil、procfs（仅 Linux）或 auto")
+    parser.add_argument("--min-interval", type=float, default=1.0,
+                        help="两次采集的最短间隔（秒），期间的请求共用同一份快照")
+    parser.add_argument("--token", default="", help="连接令牌，客户端必须提供相同的令牌")
+    args = parser.parse_args(argv)
+    if not args.token and not is_loopback(args.host):
+        parser.error("监听非本机地址时必须用 --token 设置连接令牌")
+
+    agent = ProcessAgent(args.backend, args.min_interval, args.token)
+    try:
+        asyncio.run(serve(agent, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,488 @@
+import os
+import sys
+import time
+from array import array
+from collections import OrderedDict, namedtuple
+
+import psutil
+
+try:
+    import pwd
+except ImportError:  # Windows 没有 pwd 模块，procfs 后端也仅用于 Linux
+    pwd = None
+
+
+# 系统整体指标的一次采样（不可变）
+SystemSample = namedtuple('SystemSample', [
+    'timestamp', 'cpu_percent', 'mem_total', 'mem_used', 'mem_percent', 'process_count'
+])
+
+
+# 可选列：列名 -> 表头。采集器只为当前可见的可选列读取数据
+OPTIONAL_COLUMNS = OrderedDict([
+    ('io_read', "读取速率"),
+    ('io_write', "写入速率"),
+    ('threads', "线程数"),
+    ('fds', "句柄数"),
+    ('nice', "优先级"),
+    ('user', "用户"),
+    ('cmdline', "命令行"),
+    ('cgroup', "控制组"),
+    ('uss', "独占内存"),
+    ('pss', "比例内存"),
+    ('host', "主机"),
+])
+# 由界面的后台线程池按较慢节奏单独计算的可选列，采集器不读取
+BACKGROUND_COLUMNS = ('uss', 'pss')
+# 只在远程模式中由 RemoteCollector 填写的可选列，本地采集器不读取
+REMOTE_COLUMNS = ('host',)
+# 用 (pid, create_time) 校验进程身份时允许的误差（秒）。两个后端都用 btime 加
+# starttime 换算创建时间，同一进程的结果一致，误差只需覆盖浮点舍入
+CREATE_TIME_TOLERANCE = 0.01
+
+
+def read_cgroup(pid, procfs='/proc'):
+    """读取进程所属的 cgroup 路径；优先 cgroup v2，混合模式下退回 v1 的 memory 控制器
+
+    非 Linux 或无法读取时返回空字符串。
+    """
+    try:
+        with open(f'{procfs}/{pid}/cgroup', 'rb') as f:
+            data = f.read().decode('utf-8', 'replace')
+    except OSError:
+        return ''
+    unified = None
+    controllers = {}
+    for line in data.splitlines():
+        parts = line.split(':', 2)
+        if len(parts) != 3:
+            continue
+        if parts[0] == '0' and not parts[1]:
+            unified = parts[2]
+        else:
+            for controller in parts[1].split(','):
+                controllers[controller] = parts[2]
+    if unified and unified != '/':
+        return unified
+    for controller in ('memory', 'cpu', 'cpuacct', 'name=systemd'):
+        path = controllers.get(controller)
+        if path and path != '/':
+            return path
+    return unified or controllers.get('name=systemd', '/')
+
+
+class ProcessSnapshot(object):
+    """列式进程快照：每个字段是一个按行对齐的数组"""
+
+    FIELDS = ('pid', 'name', 'status', 'cpu', 'rss', 'create_time', 'user', 'ppid')
+
+    def __init__(self, timestamp=None, columns=()):
+        self.timestamp = time.time() if timestamp is None else timestamp
+        self.pid = array('q')
+        self.name = []
+        self.status = []
+        self.cpu = array('d')
+        self.rss = array('Q')
+        self.create_time = array('d')
+        self.user = []
+        self.ppid = array('q')
+        # 可选列：列名 -> 与行对齐的值列表（不可用时为 None）
+        self.extra = {name: [] for name in columns}
+
+    def __len__(self):
+        return len(self.pid)
+
+    def append(self, pid, name, status, cpu, rss, create_time, user='', ppid=0):
+        """追加一行进程数据"""
+        self.pid.append(pid)
+        self.name.append(name)
+        self.status.append(status)
+        self.cpu.append(cpu)
+        self.rss.append(rss)
+        self.create_time.append(create_time)
+        self.user.append(user)
+        self.ppid.append(ppid)
+
+    def append_extra(self, values):
+        """为最后追加的一行补充可选列，values 中缺少的列记为 None"""
+        for name, column in self.extra.items():
+            column.append(values.get(name) if values else None)
+
+    def row(self, i):
+        """以元组形式返回第 i 行"""
+        return (self.pid[i], self.name[i], self.status[i],
+                self.cpu[i], self.rss[i], self.create_time[i], self.user[i],
+                self.ppid[i])
+
+
+def sample_system():
+    """采集 CPU、内存和进程数等系统整体指标"""
+    mem = psutil.virtual_memory()
+    return SystemSample(
+        timestamp=time.time(),
+        cpu_percent=psutil.cpu_percent(),
+        mem_total=mem.total,
+        mem_used=mem.used,
+        mem_percent=mem.percent,
+        process_count=len(psutil.pids()),
+    )
+
+
+# psutil 6.x、7.x 的 Linux 实现中，私有的 _parse_stat_file() 返回含 'create_time'
+# （starttime 节拍数）的字典，并在 oneshot 内缓存。只在这个测试过的版本范围内使用
+STAT_STARTTIME = sys.platform.startswith('linux') and (6,) <= psutil.version_info < (8,)
+
+
+def start_stamp(proc):
+    """不经缓存读取进程的启动时间戳，只用于和之前的值比较以发现 PID 复用。
+    psutil 的 create_time() 第一次调用后就被缓存；Linux 上直接取 oneshot 内
+    已经读取的 stat 中的 starttime，其他情况没有免费的读数，返回 None"""
+    if STAT_STARTTIME:
+        return proc._proc._parse_stat_file()['create_time']
+    return None
+
+
+class CachedProcess(object):
+    """跨采样周期复用的 psutil.Process 及其不变属性"""
+    __slots__ = ('proc', 'pid', 'create_time', 'start', 'name', 'ppid', 'user',
+                 'cpu_time', 'sample_time', 'io', 'cmdline', 'cgroup')
+
+    def __init__(self, proc, name, create_time, start, ppid, user):
+        self.proc = proc
+        self.pid = proc.pid
+        self.name = name
+        self.create_time = create_time
+        self.start = start        # start_stamp() 的结果，变化说明 PID 被复用；可能为 None
+        self.ppid = ppid
+        self.user = user
+        self.cpu_time = None      # 上次采样时的累计 CPU 时间（秒）
+        self.sample_time = None   # 上次采样的单调时钟时间
+        self.io = None            # 上次采样的 (读字节, 写字节, 时间)
+        self.cmdline = None       # 命令行只在第一次需要时读取
+        self.cgroup = None        # cgroup 在进程生命周期内基本不变，同样只读一次
+
+    @property
+    def key(self):
+        """(pid, create_time) 唯一标识一个进程，PID 被复用时会变化"""
+        return (self.pid, self.create_time)
+
+
+class PsutilCollector(object):
+    """基于 psutil 的进程采集器，缓存 Process 对象以计算真实的区间 CPU 使用率"""
+
+    def __init__(self, columns=()):
+        self._cache = {}  # pid -> CachedProcess
+        # 需要采集的可选列（元组整体替换，可在界面线程中修改）
+        self.columns = tuple(columns)
+
+    def __len__(self):
+        return len(self._cache)
+
+    def collect(self):
+        """采集一次进程快照，同时对缓存做对账：新增、复用、淘汰"""
+        columns = self.columns
+        snapshot = ProcessSnapshot(columns=columns)
+        pids = psutil.pids()
+        now = time.monotonic()
+
+        # 淘汰已经退出的进程
+        alive = set(pids)
+        for pid in [pid for pid in self._cache if pid not in alive]:
+            del self._cache[pid]
+
+        for pid in pids:
+            entry = self._cache.get(pid)
+            try:
+                if entry is None:
+                    entry = self._track(pid)
+                status, cpu_time, ppid, rss, start = self._sample(entry.proc)
+                if self._reused(entry, start, cpu_time):
+                    entry = self._track(pid)
+                    status, cpu_time, ppid, rss, start = self._sample(entry.proc)
+                entry.ppid = ppid  # 父进程退出后会被重新托管，ppid 可以合法地变化
+            except (psutil.NoSuchProcess, psutil.ZombieProcess):
+                self._cache.pop(pid, None)
+                continue
+            except psutil.AccessDenied:
+                # 无权读取易变属性时仍显示该进程，数值置零
+                if entry is not None and pid in self._cache:
+                    snapshot.append(pid, entry.name, '', 0.0, 0, entry.create_time,
+                                    entry.user, entry.ppid)
+                    snapshot.append_extra(None)
+                continue
+
+            if entry.cpu_time is None:
+                cpu = 0.0  # 首次采样没有基线
+            else:
+                elapsed = now - entry.sample_time
+                cpu = (cpu_time - entry.cpu_time) / elapsed * 100 if elapsed > 0 else 0.0
+            entry.cpu_time = cpu_time
+            entry.sample_time = now
+
+            snapshot.append(pid, entry.name, status, round(cpu, 1), rss,
+                            entry.create_time, entry.user, ppid)
+            if columns:
+                snapshot.append_extra(self._sample_optional(entry, columns, now))
+        return snapshot
+
+    @staticmethod
+    def _sample_optional(entry, columns, now):
+        """只读取可见的可选列，每项单独处理权限错误"""
+        proc = entry.proc
+        values = {}
+        with proc.oneshot():
+            if 'io_read' in columns or 'io_write' in columns:
+                try:
+                    io = proc.io_counters()
+                    previous = entry.io
+                    entry.io = (io.read_bytes, io.write_bytes, now)
+                    if previous is not None and now > previous[2]:
+                        elapsed = now - previous[2]
+                        values['io_read'] = (io.read_bytes - previous[0]) / elapsed
+                        values['io_write'] = (io.write_bytes - previous[1]) / elapsed
+                except (psutil.AccessDenied, psutil.NoSuchProcess, AttributeError):
+                    pass
+            for name, getter in (('threads', proc.num_threads),
+                                 ('fds', getattr(proc, 'num_fds', None)
+                                  or getattr(proc, 'num_handles', None)),
+                                 ('nice', proc.nice)):
+                if name in columns and getter is not None:
+                    try:
+                        values[name] = getter()
+                    except (psutil.AccessDenied, psutil.NoSuchProcess):
+                        pass
+            if 'cmdline' in columns:
+                if entry.cmdline is None:
+                    try:
+                        entry.cmdline = ' '.join(proc.cmdline())
+                    except (psutil.AccessDenied, psutil.NoSuchProcess):
+                        entry.cmdline = ''
+                values['cmdline'] = entry.cmdline
+        if 'cgroup' in columns:
+            if entry.cgroup is None:
+                entry.cgroup = read_cgroup(entry.pid)
+            values['cgroup'] = entry.cgroup
+        values['user'] = entry.user
+        return values
+
+    def _track(self, pid):
+        """为新出现（或被复用）的 PID 建立缓存项，只在此时读取不变属性"""
+        proc = psutil.Process(pid)
+        with proc.oneshot():
+            try:
+                user = proc.username()
+            except (psutil.AccessDenied, KeyError):
+                user = ''
+            entry = CachedProcess(proc, proc.name(), proc.create_time(), start_stamp(proc),
+                                  proc.ppid(), user)
+        self._cache[pid] = entry
+        return entry
+
+    @staticmethod
+    def _reused(entry, start, cpu_time):
+        """判断缓存的 Process 是否已指向复用了 PID 的新进程"""
+        if start is not None:
+            return start != entry.start
+        # 没有启动时间戳时不逐个检查，只在缓存的读数异常（累计 CPU 时间倒退）时确认一次
+        return (entry.cpu_time is not None and cpu_time < entry.cpu_time
+                and not entry.proc.is_running())
+
+    @staticmethod
+    def _sample(proc):
+        """读取易变属性和启动时间戳；oneshot 下 stat/statm 各只读取一次"""
+        with proc.oneshot():
+            cpu_times = proc.cpu_times()
+            return (proc.status(), cpu_times.user + cpu_times.system,
+                    proc.ppid(), proc.memory_info().rss, start_stamp(proc))
+
+
+class ProcFsCollector(object):
+    """Linux 专用采集器：直接批量读取 /proc/<pid>/stat 和 statm，绕过 psutil 的逐属性开销"""
+
+    # /proc/<pid>/stat 状态字符 -> 与 psutil 一致的状态名
+    STATUS = {
+        'R': psutil.STATUS_RUNNING, 'S': psutil.STATUS_SLEEPING,
+        'D': psutil.STATUS_DISK_SLEEP, 'T': psutil.STATUS_STOPPED,
+        't': psutil.STATUS_TRACING_STOP, 'Z': psutil.STATUS_ZOMBIE,
+        'X': psutil.STATUS_DEAD, 'x': psutil.STATUS_DEAD,
+        'K': 'wake-kill', 'W': psutil.STATUS_WAKING,
+        'I': psutil.STATUS_IDLE, 'P': psutil.STATUS_PARKED,
+    }
+
+    def __init__(self, procfs='/proc', columns=()):
+        self.procfs = procfs
+        self.columns = tuple(columns)
+        self.clock_ticks = os.sysconf('SC_CLK_TCK')
+        self.page_size = os.sysconf('SC_PAGE_SIZE')
+        self.boot_time = self._read_boot_time()
+        # pid -> [starttime, name, ppid, cpu_ticks, sample_time, user, io, cmdline, cgroup]
+        self._cache = {}
+        self._users = {}  # uid -> 用户名
+
+    @staticmethod
+    def available(procfs='/proc'):
+        return sys.platform.startswith('linux') and os.path.exists(
+            os.path.join(procfs, 'self', 'stat'))
+
+    def __len__(self):
+        return len(self._cache)
+
+    def _read_boot_time(self):
+        with open(os.path.join(self.procfs, 'stat'), 'rb') as f:
+            for line in f:
+                if line.startswith(b'btime'):
+                    return float(line.split()[1])
+        return psutil.boot_time()
+
+    def _read(self, path):
+        """用底层 os.read 读取整个小文件，避免创建文件对象"""
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            return os.read(fd, 4096)
+        finally:
+            os.close(fd)
+
+    def collect(self):
+        """遍历 /proc 生成快照，结构与 PsutilCollector 完全相同"""
+        columns = self.columns
+        snapshot = ProcessSnapshot(columns=columns)
+        now = time.monotonic()
+        cache = self._cache
+        seen = set()
+        status_map = self.STATUS
+        ticks = self.clock_ticks
+        page_size = self.page_size
+
+        with os.scandir(self.procfs) as entries:
+            for entry in entries:
+                name = entry.name
+                if not name.isdigit():
+                    continue
+                pid = int(name)
+                try:
+                    data = self._read(entry.path + '/stat')
+                    statm = self._read(entry.path + '/statm')
+                except OSError:
+                    continue  # 进程已退出或无权访问
+
+                # comm 可能包含空格和括号，以最后一个 ')' 为界
+                rparen = data.rindex(b')')
+                fields = data[rparen + 2:].split(b' ', 22)
+                starttime = int(fields[19])
+                cpu_ticks = int(fields[11]) + int(fields[12])
+
+                cached = cache.get(pid)
+                if cached is None or cached[0] != starttime:
+                    # 新进程或 PID 被复用：重新读取名称，并丢弃 CPU 基线
+                    comm = data[data.index(b'(') + 1:rparen]
+                    cached = [starttime, self._process_name(entry.path, comm),
+                              int(fields[1]), None, None, self._owner(entry),
+                              None, None, None]
+                    cache[pid] = cached
+
+                if cached[3] is None:
+                    cpu = 0.0
+                else:
+                    elapsed = now - cached[4]
+                    cpu = ((cpu_ticks - cached[3]) / ticks / elapsed * 100
+                           if elapsed > 0 else 0.0)
+                cached[3] = cpu_ticks
+                cached[4] = now
+                seen.add(pid)
+
+                # 与 psutil 一致，RSS 取 statm 的第二项（resident 页数）
+                rss = int(statm.split(b' ', 2)[1]) * page_size
+                snapshot.append(pid, cached[1],
+                                status_map.get(fields[0].decode(), '?'),
+                                round(cpu, 1), rss,
+                                self.boot_time + starttime / ticks, cached[5],
+                                int(fields[1]))
+                if columns:
+                    snapshot.append_extra(
+                        self._sample_optional(entry.path, cached, fields, columns, now))
+
+        for pid in [pid for pid in cache if pid not in seen]:
+            del cache[pid]
+        return snapshot
+
+    def _sample_optional(self, path, cached, fields, columns, now):
+        """可选列：线程数和优先级直接取自已读取的 stat，其余按需读取"""
+        values = {'threads': int(fields[17]), 'nice': int(fields[16]),
+                  'user': cached[5]}
+        if 'io_read' in columns or 'io_write' in columns:
+            try:
+                io = dict(line.split(b': ') for line in
+                          self._read(path + '/io').splitlines())
+                read, write = int(io[b'read_bytes']), int(io[b'write_bytes'])
+                previous = cached[6]
+                cached[6] = (read, write, now)
+                if previous is not None and now > previous[2]:
+                    elapsed = now - previous[2]
+                    values['io_read'] = (read - previous[0]) / elapsed
+                    values['io_write'] = (write - previous[1]) / elapsed
+            except (OSError, KeyError, ValueError):
+                pass
+        if 'fds' in columns:
+            try:
+                values['fds'] = len(os.listdir(path + '/fd'))
+            except OSError:
+                pass
+        if 'cmdline' in columns:
+            if cached[7] is None:
+                try:
+                    cached[7] = self._read(path + '/cmdline').rstrip(b'\0').replace(
+                        b'\0', b' ').decode('utf-8', 'replace')
+                except OSError:
+                    cached[7] = ''
+            values['cmdline'] = cached[7]
+        if 'cgroup' in columns:
+            if cached[8] is None:
+                cached[8] = read_cgroup(os.path.basename(path), self.procfs)
+            values['cgroup'] = cached[8]
+        return values
+
+    def _owner(self, entry):
+        """进程所有者用户名，按 uid 缓存"""
+        try:
+            uid = entry.stat().st_uid
+        except OSError:
+            return ''
+        user = self._users.get(uid)
+        if user is None:
+            try:
+                user = pwd.getpwuid(uid).pw_name
+            except KeyError:
+                user = str(uid)
+            self._users[uid] = user
+        return user
+
+    def _process_name(self, path, comm):
+        """comm 最长 15 字节，被截断时和 psutil 一样从 cmdline 补全"""
+        name = comm.decode('utf-8', 'replace')
+        if len(comm) >= 15:
+            try:
+                cmdline = self._read(path + '/cmdline').split(b'\0')
+            except OSError:
+                return name
+            if cmdline and cmdline[0]:
+                exe = os.path.basename(cmdline[0].decode('utf-8', 'replace'))
+                if exe.startswith(name):
+                    return exe
+        return name
+
+
+# 可在启动时选择的采集后端
+COLLECTOR_BACKENDS = ('psutil', 'procfs', 'auto')
+
+
+def make_collector(backend='psutil', columns=()):
+    """按名称创建采集器；auto 在 Linux 上优先使用 /proc 直读"""
+    if backend == 'auto':
+        backend = 'procfs' if ProcFsCollector.available() else 'psutil'
+    if backend == 'procfs':
+        if not ProcFsCollector.available():
+            raise RuntimeError("procfs 采集后端仅支持 Linux")
+        return ProcFsCollector(columns=columns)
+    if backend == 'psutil':
+        return PsutilCollector(columns=columns)
+    raise ValueError(f"未知的采集后端: {backend}")
@@ -0,0 +1,192 @@
+from collections import OrderedDict
+from datetime import datetime
+
+import psutil
+from PyQt5 import QtCore, QtWidgets
+
+from process_collector import CREATE_TIME_TOLERANCE
+from process_sampler import BackgroundTask
+
+
+def _safe(func, default="无权限"):
+    try:
+        return func()
+    except psutil.AccessDenied:
+        return default
+    except (psutil.ZombieProcess, OSError):
+        return "不可用"
+
+
+def fetch_details(pid, create_time):
+    """在 oneshot 中一次性读取进程的昂贵字段；PID 已被复用时抛出 NoSuchProcess"""
+    proc = psutil.Process(pid)
+    if abs(proc.create_time() - create_time) > CREATE_TIME_TOLERANCE:
+        raise psutil.NoSuchProcess(pid)
+    connections = getattr(proc, 'net_connections', None) or proc.connections
+    with proc.oneshot():
+        return {
+            'cmdline': _safe(lambda: ' '.join(proc.cmdline())),
+            'exe': _safe(proc.exe),
+            'cwd': _safe(proc.cwd),
+            'username': _safe(proc.username),
+            'num_threads': _safe(proc.num_threads),
+            'threads': _safe(lambda: [
+                f"{t.id}  user {t.user_time:.2f}s  sys {t.system_time:.2f}s"
+                for t in proc.threads()], []),
+            'open_files': _safe(lambda: [f.path for f in proc.open_files()], []),
+            'connections': _safe(lambda: [
+                f"{c.type.name if hasattr(c.type, 'name') else c.type} "
+                f"{_addr(c.laddr)} -> {_addr(c.raddr) or '-'} {c.status}"
+                for c in connections()], []),
+            'environ': _safe(lambda: [f"{k}={v}" for k, v in sorted(proc.environ().items())], []),
+        }
+
+
+def _addr(addr):
+    if not addr:
+        return ''
+    return f"{addr.ip}:{addr.port}" if hasattr(addr, 'ip') else str(addr)
+
+
+class DetailsCache(object):
+    """按 (pid, create_time) 缓存进程详情，最近最少使用的先被淘汰"""
+
+    def __init__(self, capacity=64):
+        self.capacity = capacity
+        self._items = OrderedDict()
+
+    def get(self, key):
+        details = self._items.get(key)
+        if details is not None:
+            self._items.move_to_end(key)
+        return details
+
+    def put(self, key, details):
+        self._items[key] = details
+        self._items.move_to_end(key)
+        while len(self._items) > self.capacity:
+            self._items.popitem(last=False)
+
+    def discard(self, key):
+        self._items.pop(key, None)
+
+
+class ProcessDetailsPane(QtWidgets.QWidget):
+    """进程详情侧栏：易变字段随每次刷新更新，昂贵字段在后台读取一次并缓存"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.cache = DetailsCache()
+        self.key = None          # 当前显示的进程 (pid, create_time)
+        self._tasks = {}         # 正在读取的 key -> BackgroundTask
+
+        layout = QtWidgets.QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        # 易变字段：直接取自最新快照，不额外调用 psutil
+        form = QtWidgets.QFormLayout()
+        self.fields = {}
+        for key, label in (("name", "进程名称"), ("pid", "PID"), ("status", "状态"),
+                           ("cpu", "CPU使用率"), ("rss", "内存使用"),
+                           ("create_time", "创建时间"), ("username", "用户"),
+                           ("exe", "可执行文件"), ("cwd", "工作目录"),
+                           ("num_threads", "线程数")):
+            value = QtWidgets.QLabel("-")
+            value.setTextInteractionFlags(QtCore.Qt.TextSelectableByMouse)
+            value.setWordWrap(True)
+            form.addRow(label + ":", value)
+            self.fields[key] = value
+        layout.addLayout(form)
+
+        # 昂贵字段：分页显示
+        self.tabs = QtWidgets.QTabWidget()
+        self.lists = {}
+        for key, label in (("cmdline", "命令行"), ("threads", "线程"),
+                           ("open_files", "打开的文件"), ("connections", "网络连接"),
+                           ("environ", "环境变量")):
+            text = QtWidgets.QPlainTextEdit()
+            text.setReadOnly(True)
+            text.setLineWrapMode(QtWidgets.QPlainTextEdit.NoWrap)
+            self.tabs.addTab(text, label)
+            self.lists[key] = text
+        layout.addWidget(self.tabs)
+
+        self.reloadButton = QtWidgets.QPushButton("重新读取详情")
+        self.reloadButton.clicked.connect(self.reload)
+        layout.addWidget(self.reloadButton)
+        self.setMinimumWidth(260)
+
+    def show_process(self, values):
+        """切换到新进程；values 为模型行 (pid, name, status, cpu, rss, create_time)"""
+        if values is None:
+            self.key = None
+            self._clear()
+            return
+        key = (values[0], values[5])
+        changed = key != self.key
+        self.key = key
+        self.update_volatile(values)
+        if not changed:
+            return
+        details = self.cache.get(key)
+        if details is not None:
+            self._show_details(details)
+        else:
+            self._clear_details("加载中...")
+            self._fetch(key)
+
+    def update_volatile(self, values):
+        """每次刷新只更新易变字段"""
+        pid, name, status, cpu, rss, create_time = values
+        self.fields["name"].setText(name)
+        self.fields["pid"].setText(str(pid))
+        self.fields["status"].setText(status)
+        self.fields["cpu"].setText(f"{cpu:.1f}%")
+        self.fields["rss"].setText(f"{rss / (1024 * 1024):.1f} MB")
+        self.fields["create_time"].setText(
+            datetime.fromtimestamp(create_time).strftime("%Y-%m-%d %H:%M:%S"))
+
+    def reload(self):
+        if self.key is not None:
+            self.cache.discard(self.key)
+            self._clear_details("加载中...")
+            self._fetch(self.key)
+
+    def _fetch(self, key):
+        if key in self._tasks:
+            return
+        task = BackgroundTask(fetch_details, *key)
+        task.signals.finished.connect(lambda details: self._on_fetched(key, details))
+        task.signals.failed.connect(lambda message: self._on_failed(key, message))
+        self._tasks[key] = task
+        task.start()
+
+    def _on_fetched(self, key, details):
+        self._tasks.pop(key, None)
+        self.cache.put(key, details)
+        if key == self.key:
+            self._show_details(details)
+
+    def _on_failed(self, key, message):
+        self._tasks.pop(key, None)
+        if key == self.key:
+            self._clear_details(f"无法获取进程信息: {message}")
+
+    def _show_details(self, details):
+        for key in ("username", "exe", "cwd", "num_threads"):
+            self.fields[key].setText(str(details[key]))
+        for key, text in self.lists.items():
+            value = details[key]
+            text.setPlainText("\n".join(value) if isinstance(value, list) else str(value))
+
+    def _clear_details(self, message):
+        for key in ("username", "exe", "cwd", "num_threads"):
+            self.fields[key].setText(message if key == "username" else "-")
+        for text in self.lists.values():
+            text.setPlainText("")
+
+    def _clear(self):
+        for value in self.fields.values():
+            value.setText("-")
+        for text in self.lists.values():
+            text.setPlainText("")
@@ -0,0 +1,139 @@
+import os
+
+import psutil
+
+from process_collector import CREATE_TIME_TOLERANCE
+
+
+class TerminationReport(object):
+    """一次批量结束进程的结果汇总"""
+
+    def __init__(self):
+        self.terminated = []   # 收到 SIGTERM 后正常退出的 PID
+        self.killed = []       # 超时后被 SIGKILL 强制结束的 PID
+        self.gone = []         # 发送信号前已经退出的 PID
+        self.failed = {}       # PID -> 失败原因
+
+    @property
+    def ok(self):
+        return not self.failed
+
+    def summary(self):
+        parts = []
+        if self.terminated:
+            parts.append(f"已结束 {len(self.terminated)} 个")
+        if self.killed:
+            parts.append(f"强制结束 {len(self.killed)} 个")
+        if self.gone:
+            parts.append(f"{len(self.gone)} 个已退出")
+        if self.failed:
+            parts.append(f"{len(self.failed)} 个失败")
+        return "，".join(parts) or "没有需要结束的进程"
+
+    def details(self):
+        lines = [f"PID {pid}: {reason}" for pid, reason in sorted(self.failed.items())]
+        if self.killed:
+            lines.append("强制结束: " + ", ".join(map(str, sorted(self.killed))))
+        return "\n".join(lines)
+
+
+def children_map():
+    """一次遍历建立 父PID -> [子PID] 映射，避免对每个根进程各扫描一遍"""
+    children = {}
+    for proc in psutil.process_iter(['ppid']):
+        ppid = proc.info['ppid']
+        if ppid is not None and ppid != proc.pid:
+            children.setdefault(ppid, []).append(proc.pid)
+    return children
+
+
+def expand_tree(pids, children):
+    """返回 pids 及其全部子孙进程，子孙排在祖先之前（先结束子进程）"""
+    order = []
+    seen = set()
+    stack = [(pid, False) for pid in pids]
+    while stack:
+        pid, expanded = stack.pop()
+        if expanded:
+            order.append(pid)
+            continue
+        if pid in seen:
+            continue
+        seen.add(pid)
+        stack.append((pid, True))
+        for child in children.get(pid, ()):
+            stack.append((child, False))
+    return order
+
+
+def terminate_processes(targets, include_children=False, timeout=3.0, kill_timeout=1.0):
+    """批量结束进程：先统一发送 SIGTERM，等待 timeout 秒后对仍存活的进程发送 SIGKILL。
+    targets 为 (pid, create_time) 序列，创建时间对不上的进程说明 PID 已被复用，按已退出处理"""
+    report = TerminationReport()
+    own_pid = os.getpid()
+
+    roots = {}   # 通过身份校验的根进程 pid -> Process
+    for pid, create_time in targets:
+        try:
+            proc = psutil.Process(pid)
+            if abs(proc.create_time() - create_time) > CREATE_TIME_TOLERANCE:
+                report.gone.append(pid)
+                continue
+            roots[pid] = proc
+        except psutil.NoSuchProcess:
+            report.gone.append(pid)
+        except psutil.AccessDenied:
+            report.failed[pid] = "权限不足"
+    pids = list(roots)
+    if include_children:
+        # 只展开通过校验的根进程，避免顺带结束复用了 PID 的新进程的子进程
+        pids = expand_tree(pids, children_map())
+
+    procs = []
+    for pid in pids:
+        if pid == own_pid:
+            report.failed[pid] = "不能结束任务管理器自身"
+            continue
+        try:
+            # 根进程沿用校验过的 Process，psutil 发信号前会再次确认 PID 未被复用
+            proc = roots.get(pid) or psutil.Process(pid)
+            proc.terminate()
+            procs.append(proc)
+        except psutil.ZombieProcess:
+            # ZombieProcess 是 NoSuchProcess 的子类，必须先捕获
+            report.failed[pid] = "僵尸进程"
+        except psutil.NoSuchProcess:
+            report.gone.append(pid)
+        except psutil.AccessDenied:
+            report.failed[pid] = "权限不足"
+
+    gone, alive = psutil.wait_procs(procs, timeout=timeout)
+    report.terminated.extend(proc.pid for proc in gone)
+
+    for proc in alive:
+        try:
+            proc.kill()
+        except psutil.NoSuchProcess:
+            report.terminated.append(proc.pid)
+        except psutil.AccessDenied:
+            report.failed[proc.pid] = "权限不足，无法强制结束"
+    alive = [proc for proc in alive if proc.pid not in report.failed
+             and proc.pid not in report.terminated]
+    gone, alive = psutil.wait_procs(alive, timeout=kill_timeout)
+    report.killed.extend(proc.pid for proc in gone)
+    for proc in alive:
+        if _is_zombie(proc):
+            # 已经结束，只是还没被父进程回收
+            report.killed.append(proc.pid)
+        else:
+            report.failed[proc.pid] = "强制结束后仍未退出"
+    return report
+
+
+def _is_zombie(proc):
+    try:
+        return proc.status() == psutil.STATUS_ZOMBIE
+    except (psutil.NoSuchProcess, psutil.ZombieProcess):
+        return True
+    except psutil.AccessDenied:
+        return False
@@ -0,0 +1,402 @@
+import time
+from array import array
+from datetime import datetime
+from itertools import compress
+
+from PyQt5 import QtCore
+
+from process_collector import OPTIONAL_COLUMNS
+from process_search import ProcessQuery, ProcessSearchIndex
+
+# 排序时使用的原始数值角色
+SORT_ROLE = QtCore.Qt.UserRole
+
+
+def contiguous_ranges(rows):
+    """把有序行号列表合并为连续区间 [(start, end), ...]"""
+    ranges = []
+    for row in rows:
+        if ranges and ranges[-1][1] == row - 1:
+            ranges[-1][1] = row
+        else:
+            ranges.append([row, row])
+    return ranges
+
+
+def format_rate(value):
+    """把字节/秒格式化为带单位的速率"""
+    for unit in ("B/s", "KB/s", "MB/s"):
+        if value < 1024:
+            return f"{value:.0f} {unit}" if unit == "B/s" else f"{value:.1f} {unit}"
+        value /= 1024
+    return f"{value:.1f} GB/s"
+
+
+class ProcessTableModel(QtCore.QAbstractTableModel):
+    """进程表格模型，底层是与快照同构的列式数组"""
+
+    BASE_HEADERS = ["进程名称", "PID", "状态", "CPU使用率", "内存使用", "启动时间"]
+    COL_NAME, COL_PID, COL_STATUS, COL_CPU, COL_RSS, COL_CREATE = range(6)
+    # 可选列排在基础列之后，默认隐藏，只有可见时才由采集器读取
+    OPTIONAL_KEYS = tuple(OPTIONAL_COLUMNS)
+    HEADERS = BASE_HEADERS + list(OPTIONAL_COLUMNS.values())
+    TEXT_COLUMNS = ('user', 'cmdline', 'cgroup', 'host')
+    # 一次刷新中被删除的行超过这么多个连续区间时，改为在一次布局变化内完成更新。
+    # 代理模型排序时，布局变化会引起一次完整的重新排序（每次比较都要回调 Python），
+    # 要到数千个区间才比逐区间删除划算，因此使用更大的阈值（见 bench_refresh.py）
+    LAYOUT_RANGES = 256
+    SORTED_LAYOUT_RANGES = 4096
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._pid = array('q')
+        self._name = []
+        self._status = []
+        self._cpu = array('d')
+        self._rss = array('Q')
+        self._create_time = array('d')
+        self._user = []
+        # 可选列：列名 -> 值列表（未采集时为 None）
+        self._extra = {key: [] for key in self.OPTIONAL_KEYS}
+        # 名称/用户索引，供搜索框快速过滤
+        self.search_index = ProcessSearchIndex()
+        # PID -> 源模型行号索引，随插入和删除同步维护；
+        # 排序只发生在代理模型中，不会改变源模型行号
+        self._row_of_pid = {}
+        # 按表格列顺序排列的列数组（原地修改，引用始终有效）
+        self._table_columns = (self._name, self._pid, self._status,
+                               self._cpu, self._rss, self._create_time)
+        # 可选的 PipelineProfiler：分别记录比对（diff）和发出模型信号（model）的耗时
+        self.profiler = None
+        # 远程模式中 PID 按主机编码（见 remote_hosts），非 0 时 PID 列只显示主机内的 PID
+        self.pid_stride = 0
+        # 当前使用的布局变化阈值，由代理模型按是否排序设置
+        self.layout_ranges = self.LAYOUT_RANGES
+
+    def index(self, row, column, parent=QtCore.QModelIndex()):
+        # 默认实现每次都要回调 rowCount 和 columnCount 检查范围；代理模型排序时
+        # 每次比较都会创建两个源索引，这里直接检查
+        if 0 <= row < len(self._pid) and 0 <= column < len(self.HEADERS) \
+                and not parent.isValid():
+            return self.createIndex(row, column)
+        return QtCore.QModelIndex()
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._pid)
+
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=QtCore.Qt.DisplayRole):
+        if role == QtCore.Qt.DisplayRole and orientation == QtCore.Qt.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row, col = index.row(), index.column()
+        if col >= len(self.BASE_HEADERS):
+            return self._optional_data(row, self.OPTIONAL_KEYS[col - len(self.BASE_HEADERS)], role)
+        if role == SORT_ROLE:
+            return self.sort_key(row, col)
+        if role == QtCore.Qt.DisplayRole:
+            if col == self.COL_NAME:
+                return self._name[row]
+            if col == self.COL_PID:
+                pid = self._pid[row]
+                return str(pid % self.pid_stride if self.pid_stride else pid)
+            if col == self.COL_STATUS:
+                return self._status[row]
+            if col == self.COL_CPU:
+                return f"{self._cpu[row]:.1f}%"
+            if col == self.COL_RSS:
+                return f"{self._rss[row] / (1024 * 1024):.1f} MB"
+            if col == self.COL_CREATE:
+                return datetime.fromtimestamp(
+                    self._create_time[row]).strftime("%Y-%m-%d %H:%M:%S")
+        elif role == QtCore.Qt.TextAlignmentRole:
+            if col in (self.COL_PID, self.COL_CPU, self.COL_RSS):
+                return int(QtCore.Qt.AlignRight | QtCore.Qt.AlignVCenter)
+        return None
+
+    def _optional_data(self, row, key, role):
+        value = self._extra[key][row]
+        text = key in self.TEXT_COLUMNS
+        if role == QtCore.Qt.DisplayRole:
+            if value is None:
+                return "" if text else "-"
+            if key in ('io_read', 'io_write'):
+                return format_rate(value)
+            if key in ('uss', 'pss'):
+                return f"{value / (1024 * 1024):.1f} MB"
+            return value if text else str(value)
+        if role == QtCore.Qt.TextAlignmentRole and not text:
+            return int(QtCore.Qt.AlignRight | QtCore.Qt.AlignVCenter)
+        if role == QtCore.Qt.ToolTipRole and key == 'cmdline':
+            return value
+        return None
+
+    def sort_key(self, row, col):
+        """第 row 行第 col 列的排序值（即 SORT_ROLE 的数据），代理模型排序时会频繁调用"""
+        if col >= len(self.BASE_HEADERS):
+            key = self.OPTIONAL_KEYS[col - len(self.BASE_HEADERS)]
+            value = self._extra[key][row]
+            text = key in self.TEXT_COLUMNS
+            if value is None:
+                return '' if text else -1
+            return value.lower() if text else value
+        if col == self.COL_NAME:
+            return self._name[row].lower()
+        return self._table_columns[col][row]
+
+    @classmethod
+    def column_of(cls, key):
+        """可选列名对应的表格列号"""
+        return len(cls.BASE_HEADERS) + cls.OPTIONAL_KEYS.index(key)
+
+    def clear_column(self, key):
+        """清空一个可选列的旧值（重新显示该列时调用，避免展示过期数据）"""
+        values = self._extra[key]
+        values[:] = [None] * len(values)
+        if values:
+            col = self.column_of(key)
+            self.dataChanged.emit(self.index(0, col), self.index(len(values) - 1, col),
+                                  [QtCore.Qt.DisplayRole, SORT_ROLE])
+
+    def set_extra_values(self, key, values):
+        """写入单独计算的可选列，values 为 {(pid, create_time): 值}"""
+        column = self._extra[key]
+        changed = []
+        for (pid, create_time), value in values.items():
+            row = self._row_of_pid.get(pid)
+            if row is not None and self._create_time[row] == create_time \
+                    and column[row] != value:
+                column[row] = value
+                changed.append(row)
+        changed.sort()
+        col = self.column_of(key)
+        for start, end in contiguous_ranges(changed):
+            self.dataChanged.emit(self.index(start, col), self.index(end, col),
+                                  [QtCore.Qt.DisplayRole, SORT_ROLE])
+
+    def pid_at(self, row):
+        """返回源模型第 row 行的 PID"""
+        return self._pid[row]
+
+    def key_at(self, row):
+        """返回源模型第 row 行的 (pid, create_time)，可用于识别 PID 复用"""
+        return (self._pid[row], self._create_time[row])
+
+    def row_values(self, row):
+        """以元组 (pid, name, status, cpu, rss, create_time) 返回源模型第 row 行"""
+        return (self._pid[row], self._name[row], self._status[row],
+                self._cpu[row], self._rss[row], self._create_time[row])
+
+    def row_of(self, pid):
+        """O(1) 查找 PID 所在的源模型行号，不存在时返回 -1"""
+        return self._row_of_pid.get(pid, -1)
+
+    def update_snapshot(self, snapshot):
+        """用新快照增量更新模型，只对真正变化的行发出 dataChanged"""
+        row_of_pid = self._row_of_pid
+        clock = time.perf_counter
+        t0 = clock()
+
+        alive = set(snapshot.pid)
+        removed = sorted(row for pid, row in row_of_pid.items() if pid not in alive)
+        ranges = contiguous_ranges(removed)
+        diff_time = clock() - t0
+        # 退出的进程分散在很多区间中时，逐区间删除会让模型和代理模型各移动一遍全部行，
+        # 这时改为在一次布局变化内完成整次更新：存活行一次压缩到位，代理模型只重建一次
+        batch = len(ranges) > self.layout_ranges
+        if batch:
+            self.layoutAboutToBeChanged.emit()
+            persistent = self.persistentIndexList()
+            persistent_pids = [self._pid[index.row()] for index in persistent]
+            self._compact(removed)
+        else:
+            # 删除已经不存在的进程（从后往前按区间删除）
+            for start, end in reversed(ranges):
+                self.beginRemoveRows(QtCore.QModelIndex(), start, end)
+                for pid in self._pid[start:end + 1]:
+                    del row_of_pid[pid]
+                    self.search_index.remove(pid)
+                for column in self._columns():
+                    del column[start:end + 1]
+                self.endRemoveRows()
+        if removed:
+            # 只需重建第一个被删除行之后的索引
+            self._reindex(removed[0])
+
+        # 更新已存在的进程，只记录值发生变化的行
+        t1 = clock()
+        changed = []
+        added = []
+        for i, pid in enumerate(snapshot.pid):
+            row = row_of_pid.get(pid)
+            if row is None:
+                added.append(i)
+            elif self._assign_row(row, snapshot, i):
+                changed.append(row)
+        diff_time += clock() - t1
+
+        if batch:
+            # 新进程追加到末尾；布局变化之后视图会重新读取所有行，不必再逐行通知
+            self._extend(snapshot, added)
+            self.changePersistentIndexList(persistent, [
+                self.index(row_of_pid[pid], index.column()) if pid in row_of_pid
+                else QtCore.QModelIndex()
+                for pid, index in zip(persistent_pids, persistent)])
+            self.layoutChanged.emit()
+        else:
+            changed.sort()
+            last_col = len(self.HEADERS) - 1
+            for start, end in contiguous_ranges(changed):
+                self.dataChanged.emit(self.index(start, 0), self.index(end, last_col),
+                                      [QtCore.Qt.DisplayRole, SORT_ROLE])
+            # 新进程统一追加到末尾
+            self._append_rows(snapshot, added)
+        if self.profiler is not None:
+            self.profiler.record('diff', diff_time)
+            self.profiler.record('model', clock() - t0 - diff_time)
+
+    def insert_rows(self, snapshot, indices):
+        """只追加快照中指定行里尚未显示的进程，用于首个快照的分批载入"""
+        row_of_pid = self._row_of_pid
+        self._append_rows(snapshot, [i for i in indices
+                                     if snapshot.pid[i] not in row_of_pid])
+
+    def _append_rows(self, snapshot, indices):
+        if not indices:
+            return
+        first = len(self._pid)
+        self.beginInsertRows(QtCore.QModelIndex(), first, first + len(indices) - 1)
+        self._extend(snapshot, indices)
+        self.endInsertRows()
+
+    def _extend(self, snapshot, indices):
+        """把快照中指定的行追加到各列末尾（不发出信号）"""
+        row_of_pid = self._row_of_pid
+        for row, i in enumerate(indices, len(self._pid)):
+            pid = snapshot.pid[i]
+            row_of_pid[pid] = row
+            self._pid.append(pid)
+            self._name.append(snapshot.name[i])
+            self._status.append(snapshot.status[i])
+            self._cpu.append(snapshot.cpu[i])
+            self._rss.append(snapshot.rss[i])
+            self._create_time.append(snapshot.create_time[i])
+            self._user.append(snapshot.user[i])
+            for key, values in self._extra.items():
+                column = snapshot.extra.get(key)
+                values.append(column[i] if column is not None else None)
+            self.search_index.add(pid, snapshot.name[i], snapshot.user[i])
+
+    def _compact(self, removed):
+        """一次遍历删除 removed 中的所有行（不发出信号），存活行保持原有顺序"""
+        keep = [True] * len(self._pid)
+        for row in removed:
+            keep[row] = False
+            pid = self._pid[row]
+            del self._row_of_pid[pid]
+            self.search_index.remove(pid)
+        for column in self._columns():
+            # 原地替换内容，_table_columns 中的引用保持有效
+            if isinstance(column, array):
+                column[:] = array(column.typecode, compress(column, keep))
+            else:
+                column[:] = compress(column, keep)
+
+    def _reindex(self, first_row):
+        """重建 first_row 及之后各行的 PID 索引"""
+        row_of_pid = self._row_of_pid
+        pids = self._pid
+        for row in range(first_row, len(pids)):
+            row_of_pid[pids[row]] = row
+
+    def _columns(self):
+        return (self._pid, self._name, self._status,
+                self._cpu, self._rss, self._create_time, self._user) + tuple(
+                    self._extra.values())
+
+    def _assign_row(self, row, snapshot, i):
+        """把快照第 i 行写入模型第 row 行，返回是否有变化"""
+        changed = False
+        renamed = False
+        if self._name[row] != snapshot.name[i]:
+            self._name[row] = snapshot.name[i]
+            changed = renamed = True
+        if self._status[row] != snapshot.status[i]:
+            self._status[row] = snapshot.status[i]
+            changed = True
+        if self._cpu[row] != snapshot.cpu[i]:
+            self._cpu[row] = snapshot.cpu[i]
+            changed = True
+        if self._rss[row] != snapshot.rss[i]:
+            self._rss[row] = snapshot.rss[i]
+            changed = True
+        if self._create_time[row] != snapshot.create_time[i]:
+            self._create_time[row] = snapshot.create_time[i]
+            changed = True
+        if self._user[row] != snapshot.user[i]:
+            self._user[row] = snapshot.user[i]
+            changed = renamed = True
+        for key, column in snapshot.extra.items():
+            # 只有本次采集了的可选列才会出现在快照中
+            values = self._extra[key]
+            if values[row] != column[i]:
+                values[row] = column[i]
+                changed = True
+        if renamed:
+            # PID 被复用或进程改名时同步更新搜索索引
+            self.search_index.add(self._pid[row], self._name[row], self._user[row])
+        return changed
+
+
+class ProcessFilterProxyModel(QtCore.QSortFilterProxyModel):
+    """按搜索索引过滤、按原始数值排序的代理模型"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setSortRole(SORT_ROLE)
+        self.setDynamicSortFilter(True)
+        self._index = None
+
+    def setSourceModel(self, model):
+        super().setSourceModel(model)
+        self._index = getattr(model, 'search_index', None)
+        self._update_layout_ranges()
+
+    def sort(self, column, order=QtCore.Qt.AscendingOrder):
+        super().sort(column, order)
+        self._update_layout_ranges()
+
+    def _update_layout_ranges(self):
+        model = self.sourceModel()
+        if isinstance(model, ProcessTableModel):
+            model.layout_ranges = (model.SORTED_LAYOUT_RANGES if self.sortColumn() >= 0
+                                   else model.LAYOUT_RANGES)
+
+    def set_query(self, text):
+        """设置搜索文本，返回解析后的查询（可检查其 error）"""
+        query = ProcessQuery(text)
+        self._index.set_query(query)
+        self.invalidateFilter()
+        return query
+
+    def lessThan(self, left, right):
+        # 直接比较源模型的排序值，省去每次比较中的两次 data() 调用和 QVariant 转换
+        model = self.sourceModel()
+        col = left.column()
+        return model.sort_key(left.row(), col) < model.sort_key(right.row(), col)
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        result = self._index.result if self._index is not None else None
+        if result is None:
+            return True
+        return self.sourceModel().pid_at(source_row) in result
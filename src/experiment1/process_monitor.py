@@ -0,0 +1,173 @@
+"""无界面进程监控：与任务管理器共用采集逻辑，按固定间隔输出 JSON Lines 或 CSV"""
+import argparse
+import csv
+import heapq
+import json
+import sys
+import time
+
+from alert_rules import AlertEngine, event_record
+from process_collector import (BACKGROUND_COLUMNS, COLLECTOR_BACKENDS, OPTIONAL_COLUMNS,
+                               REMOTE_COLUMNS, make_collector, sample_system)
+from snapshot_recorder import SnapshotRecorder, check_recording
+
+# 输出的进程字段，顺序即 CSV 列顺序
+PROCESS_FIELDS = ('pid', 'ppid', 'name', 'user', 'status', 'cpu', 'rss', 'create_time')
+
+
+def top_rows(snapshot, top, sort_key):
+    """返回最重的 top 个进程的行号；top 为 0 时返回全部行"""
+    column = getattr(snapshot, sort_key)
+    if not top or top >= len(snapshot):
+        return sorted(range(len(snapshot)), key=column.__getitem__, reverse=True)
+    return heapq.nlargest(top, range(len(snapshot)), key=column.__getitem__)
+
+
+def process_record(snapshot, i, extra_columns=()):
+    record = {field: getattr(snapshot, field)[i] for field in PROCESS_FIELDS}
+    for key in extra_columns:
+        record[key] = snapshot.extra[key][i]
+    return record
+
+
+class JsonLinesWriter(object):
+    """每个采样周期输出一行 JSON，包含系统指标和进程列表"""
+
+    def __init__(self, stream, extra_columns=()):
+        self.stream = stream
+        self.extra_columns = tuple(extra_columns)
+
+    def write(self, system, snapshot, rows):
+        record = {
+            'timestamp': round(snapshot.timestamp, 3),
+            'system': system._asdict() if system is not None else None,
+            'process_count': len(snapshot),
+            'processes': [process_record(snapshot, i, self.extra_columns) for i in rows],
+        }
+        self.stream.write(json.dumps(record, ensure_ascii=False, separators=(',', ':')))
+        self.stream.write('\n')
+        self.stream.flush()
+
+
+def at_start(stream):
+    """流是否位于开头；追加到已有内容的文件时返回 False，终端和管道视为开头"""
+    try:
+        return stream.tell() == 0
+    except (OSError, ValueError):
+        return True
+
+
+class CsvWriter(object):
+    """每个进程输出一行 CSV，首列为采样时间戳，表头只在输出为空时写一次"""
+
+    def __init__(self, stream, extra_columns=()):
+        self.stream = stream
+        self.extra_columns = tuple(extra_columns)
+        self.writer = csv.writer(stream)
+        if at_start(stream):
+            self.writer.writerow(('timestamp',) + PROCESS_FIELDS + self.extra_columns)
+
+    def write(self, system, snapshot, rows):
+        ts = round(snapshot.timestamp, 3)
+        columns = [getattr(snapshot, field) for field in PROCESS_FIELDS]
+        columns += [snapshot.extra[key] for key in self.extra_columns]
+        self.writer.writerows([(ts,) + tuple(column[i] for column in columns)
+                               for i in rows])
+        self.stream.flush()
+
+
+WRITERS = {'jsonl': JsonLinesWriter, 'csv': CsvWriter}
+
+
+def write_alerts(events, stream=sys.stderr):
+    """告警事件以 JSON Lines 写到标准错误，不混入采样输出"""
+    for event in events:
+        stream.write(json.dumps(event_record(event), ensure_ascii=False) + '\n')
+    if events:
+        stream.flush()
+
+
+def run(collector, writer, interval=5.0, count=0, top=0, sort_key='cpu',
+        with_system=True, alerts=None, recorder=None):
+    """采样主循环；count 为 0 时一直运行，按起始时间对齐间隔以避免漂移"""
+    start = time.monotonic()
+    n = 0
+    while not count or n < count:
+        system = sample_system() if with_system or alerts is not None else None
+        snapshot = collector.collect()
+        if recorder is not None:
+            if system is not None:
+                recorder.record_system(system)
+            recorder.record_snapshot(snapshot)
+        if alerts is not None:
+            write_alerts(alerts.evaluate_system(system) + alerts.evaluate_snapshot(snapshot))
+        writer.write(system if with_system else None, snapshot,
+                     top_rows(snapshot, top, sort_key))
+        n += 1
+        if count and n >= count:
+            break
+        delay = start + n * interval - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="无界面进程监控，输出 JSON Lines 或 CSV")
+    parser.add_argument("--interval", type=float, default=5.0, help="采样间隔（秒）")
+    parser.add_argument("--format", choices=sorted(WRITERS), default="jsonl",
+                        help="输出格式")
+    parser.add_argument("--top", type=int, default=0,
+                        help="只输出最重的 N 个进程，0 表示全部")
+    parser.add_argument("--sort", choices=("cpu", "rss"), default="cpu",
+                        help="--top 的排序依据")
+    parser.add_argument("--count", type=int, default=0, help="采样次数，0 表示一直运行")
+    parser.add_argument("--backend", choices=COLLECTOR_BACKENDS, default="psutil",
+                        help="进程采集后端")
+    parser.add_argument("--no-system", action="store_true",
+                        help="JSON Lines 中不输出系统整体指标")
+    parser.add_argument("--output", default="-", help="输出文件，默认为标准输出")
+    available = [key for key in OPTIONAL_COLUMNS
+                 if key not in BACKGROUND_COLUMNS and key not in REMOTE_COLUMNS]
+    parser.add_argument("--columns", default="",
+                        help="额外采集的可选列，逗号分隔: " + ",".join(available))
+    parser.add_argument("--alert", action="append", default=[], metavar="RULE",
+                        help='告警规则，可重复，例如 "rss > 2G for 30s"；事件写到标准错误')
+    parser.add_argument("--record", default=None, metavar="PATH",
+                        help="同时把采样结果录制到此文件，可在任务管理器中用 --replay 回放")
+    args = parser.parse_args(argv)
+    columns = tuple(key for key in args.columns.split(",") if key)
+    unknown = [key for key in columns if key not in available]
+    if unknown:
+        parser.error("未知的列: " + ",".join(unknown))
+    # 参数和采集后端先校验完，出错时不会留下空的输出文件
+    try:
+        collector = make_collector(args.backend, columns)
+        alerts = AlertEngine(args.alert, max_gap=args.interval * 3) if args.alert else None
+        if args.record:
+            check_recording(args.record)
+    except (OSError, ValueError, RuntimeError) as e:
+        parser.error(str(e))
+
+    recorder = None
+    stream = sys.stdout if args.output == "-" else open(
+        args.output, "a", encoding="utf-8", newline="")
+    try:
+        if args.record:
+            recorder = SnapshotRecorder(args.record)
+        # 第一次采样只用来建立 CPU 基线
+        collector.collect()
+        sample_system()
+        time.sleep(min(args.interval, 1.0))
+        run(collector, WRITERS[args.format](stream, columns), args.interval, args.count,
+            args.top, args.sort, not args.no_system and args.format == "jsonl", alerts, recorder)
+    except (KeyboardInterrupt, BrokenPipeError):
+        pass
+    finally:
+        if stream is not sys.stdout:
+            stream.close()
+        if recorder is not None:
+            recorder.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+import time
+
+from PyQt5 import QtCore
+
+from process_collector import PsutilCollector, sample_system
+
+
+class SamplerWorker(QtCore.QObject):
+    """在后台线程中执行采集函数，把结果通过信号发回"""
+    finished = QtCore.pyqtSignal(object)
+    failed = QtCore.pyqtSignal(str)
+
+    def __init__(self, func):
+        super().__init__()
+        self._func = func
+        self.cpu_time = 0.0   # 上一次采集消耗的线程 CPU 时间（秒）
+        self.elapsed = 0.0    # 上一次采集的墙钟耗时（秒）
+
+    @QtCore.pyqtSlot()
+    def run(self):
+        start, cpu_start = time.perf_counter(), time.thread_time()
+        try:
+            result = self._func()
+        except Exception as e:
+            self.failed.emit(str(e))
+            return
+        finally:
+            self.cpu_time = time.thread_time() - cpu_start
+            self.elapsed = time.perf_counter() - start
+        self.finished.emit(result)
+
+
+class BackgroundTask(QtCore.QRunnable):
+    """在全局线程池中执行一次性任务，结果通过排队信号回到界面线程"""
+
+    class Signals(QtCore.QObject):
+        finished = QtCore.pyqtSignal(object)
+        failed = QtCore.pyqtSignal(str)
+
+    def __init__(self, func, *args, **kwargs):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.signals = self.Signals()
+        self._func = func
+        self._args = args
+        self._kwargs = kwargs
+
+    def start(self, pool=None):
+        """提交到线程池（默认全局线程池）；应先连接好信号再调用，调用方需持有引用直到任务结束"""
+        (pool or QtCore.QThreadPool.globalInstance()).start(self)
+
+    def run(self):
+        try:
+            result = self._func(*self._args, **self._kwargs)
+        except Exception as e:
+            self.signals.failed.emit(str(e))
+            return
+        self.signals.finished.emit(result)
+
+
+class SamplerChannel(QtCore.QObject):
+    """一个采集通道：独占一个 QThread，同一时刻最多只有一次采集在进行"""
+    sampled = QtCore.pyqtSignal(object)
+    failed = QtCore.pyqtSignal(str)
+    _requested = QtCore.pyqtSignal()
+
+    def __init__(self, func, name, parent=None):
+        super().__init__(parent)
+        self.name = name
+        self.busy = False
+        self.dropped = 0  # 因上一次采集未完成而被丢弃的请求数
+
+        self._thread = QtCore.QThread()
+        self._thread.setObjectName(f"sampler-{name}")
+        self._worker = SamplerWorker(func)
+        self._worker.moveToThread(self._thread)
+
+        # 跨线程连接，信号会自动排队到对方线程的事件循环
+        self._requested.connect(self._worker.run)
+        self._worker.finished.connect(self._on_finished)
+        self._worker.failed.connect(self._on_failed)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        if self._thread.isRunning():
+            self._thread.quit()
+            self._thread.wait()
+
+    @property
+    def cpu_time(self):
+        """上一次采集消耗的 CPU 时间；采集进行中不会被改写"""
+        return self._worker.cpu_time
+
+    @property
+    def elapsed(self):
+        return self._worker.elapsed
+
+    def request(self):
+        """请求一次采集；上一次尚未完成时直接丢弃，避免请求堆积"""
+        if self.busy:
+            self.dropped += 1
+            return False
+        self.busy = True
+        self._requested.emit()
+        return True
+
+    def _on_finished(self, result):
+        self.busy = False
+        self.sampled.emit(result)
+
+    def _on_failed(self, message):
+        self.busy = False
+        self.failed.emit(message)
+
+
+class ProcessSampler(QtCore.QObject):
+    """后台采样器：系统指标和进程列表各用一个线程，互不阻塞；
+    可选的逐核 CPU 采样同样使用独立线程"""
+    systemSampled = QtCore.pyqtSignal(object)
+    processesSampled = QtCore.pyqtSignal(object)
+    coresSampled = QtCore.pyqtSignal(object)
+    sampleFailed = QtCore.pyqtSignal(str)
+
+    def __init__(self, collector=None, system_sampler=sample_system, cores_sampler=None,
+                 parent=None):
+        super().__init__(parent)
+        if collector is None:
+            collector = PsutilCollector().collect
+        self.system = SamplerChannel(system_sampler, "system", self)
+        self.processes = SamplerChannel(collector, "processes", self)
+        self.system.sampled.connect(self.systemSampled)
+        self.processes.sampled.connect(self.processesSampled)
+        self.system.failed.connect(self.sampleFailed)
+        self.processes.failed.connect(self.sampleFailed)
+        self.cores = None
+        if cores_sampler is not None:
+            self.cores = SamplerChannel(cores_sampler, "cores", self)
+            self.cores.sampled.connect(self.coresSampled)
+            self.cores.failed.connect(self.sampleFailed)
+
+    def channels(self):
+        return [channel for channel in (self.system, self.processes, self.cores)
+                if channel is not None]
+
+    def start(self):
+        for channel in self.channels():
+            channel.start()
+
+    def stop(self):
+        """结束后台线程，可重复调用"""
+        for channel in self.channels():
+            channel.stop()
+
+    def request_system(self):
+        return self.system.request()
+
+    def request_processes(self):
+        return self.processes.request()
+
+    def request_cores(self):
+        return self.cores.request() if self.cores is not None else False
@@ -0,0 +1,149 @@
+import re
+
+
+class ProcessQuery(object):
+    """搜索框查询：普通文本按名称子串匹配，另支持 pid:、user:、re: 前缀和 /正则/"""
+
+    def __init__(self, text):
+        self.text = text.strip()
+        self.kind = 'all'
+        self.value = None
+        self.error = None
+        text = self.text
+        lowered = text.lower()
+        if not text:
+            return
+        if lowered.startswith('pid:'):
+            self.kind = 'pid'
+            try:
+                self.value = int(text[4:].strip())
+            except ValueError:
+                self.error = "PID 必须是整数"
+        elif lowered.startswith('user:'):
+            self.kind = 'user'
+            self.value = lowered[5:].strip()
+        elif lowered.startswith('re:') or (len(text) > 1 and text[0] == text[-1] == '/'):
+            pattern = text[3:] if lowered.startswith('re:') else text[1:-1]
+            self.kind = 'regex'
+            try:
+                self.value = re.compile(pattern, re.IGNORECASE)
+            except re.error as e:
+                self.error = f"正则表达式错误: {e}"
+        else:
+            self.kind = 'text'
+            self.value = lowered
+
+    def is_empty(self):
+        return self.kind == 'all'
+
+    def matches(self, pid, name, user):
+        """判断单个进程是否匹配（name、user 均为小写）"""
+        if self.error:
+            return False
+        if self.kind == 'all':
+            return True
+        if self.kind == 'text':
+            return self.value in name or (self.value.isdigit() and str(pid) == self.value)
+        if self.kind == 'pid':
+            return pid == self.value
+        if self.kind == 'user':
+            return self.value in user
+        return self.value.search(name) is not None
+
+
+class ProcessSearchIndex(object):
+    """进程名称索引：名称去重后建立三元组倒排表，并随进程增删增量维护
+
+    同时维护当前查询的结果集，新进程加入时立即判断是否匹配，
+    因此代理模型过滤时只需做一次集合查找。
+    """
+
+    def __init__(self):
+        self._info = {}       # pid -> (小写名称, 小写用户名)
+        self._by_name = {}    # 小写名称 -> {pid}
+        self._by_user = {}    # 小写用户名 -> {pid}
+        self._trigrams = {}   # 三元组 -> {小写名称}
+        self.query = ProcessQuery('')
+        self.result = None    # 当前查询的匹配 PID 集合，None 表示不过滤
+
+    def __len__(self):
+        return len(self._info)
+
+    @staticmethod
+    def trigrams(text):
+        return {text[i:i + 3] for i in range(len(text) - 2)}
+
+    def add(self, pid, name, user=''):
+        name = name.lower()
+        user = user.lower()
+        if pid in self._info:
+            self.remove(pid)
+        self._info[pid] = (name, user)
+        pids = self._by_name.get(name)
+        if pids is None:
+            pids = self._by_name[name] = set()
+            for tri in self.trigrams(name):
+                self._trigrams.setdefault(tri, set()).add(name)
+        pids.add(pid)
+        self._by_user.setdefault(user, set()).add(pid)
+        if self.result is not None and self.query.matches(pid, name, user):
+            self.result.add(pid)
+
+    def remove(self, pid):
+        info = self._info.pop(pid, None)
+        if info is None:
+            return
+        name, user = info
+        pids = self._by_name[name]
+        pids.discard(pid)
+        if not pids:
+            del self._by_name[name]
+            for tri in self.trigrams(name):
+                names = self._trigrams[tri]
+                names.discard(name)
+                if not names:
+                    del self._trigrams[tri]
+        users = self._by_user[user]
+        users.discard(pid)
+        if not users:
+            del self._by_user[user]
+        if self.result is not None:
+            self.result.discard(pid)
+
+    def set_query(self, query):
+        """设置当前查询并计算结果集"""
+        self.query = query
+        self.result = None if query.is_empty() else self.search(query)
+
+    def search(self, query):
+        """返回匹配查询的 PID 集合，只在去重后的名称上求值"""
+        if query.error:
+            return set()
+        if query.kind == 'pid':
+            return {query.value} if query.value in self._info else set()
+        if query.kind == 'user':
+            return self._union(pids for user, pids in self._by_user.items()
+                               if query.value in user)
+        if query.kind == 'regex':
+            return self._union(pids for name, pids in self._by_name.items()
+                               if query.value.search(name))
+
+        text = query.value
+        if len(text) >= 3:
+            # 按三元组倒排表求交集得到候选名称，再逐个确认子串
+            sets = sorted((self._trigrams.get(tri, ()) for tri in self.trigrams(text)),
+                          key=len)
+            candidates = set(sets[0]).intersection(*sets[1:]) if sets else set()
+        else:
+            candidates = self._by_name.keys()
+        result = self._union(self._by_name[name] for name in candidates if text in name)
+        if text.isdigit() and int(text) in self._info:
+            result.add(int(text))
+        return result
+
+    @staticmethod
+    def _union(sets):
+        result = set()
+        for pids in sets:
+            result |= pids
+        return result
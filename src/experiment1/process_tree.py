@@ -0,0 +1,434 @@
+from PyQt5 import QtCore
+
+from process_model import SORT_ROLE, ProcessFilterProxyModel, contiguous_ranges
+
+
+class ProcessNode(object):
+    """进程树节点，total_* 为包含所有子孙进程在内的合计值"""
+    __slots__ = ('pid', 'ppid', 'name', 'status', 'cpu', 'rss', 'create_time',
+                 'total_cpu', 'total_rss', 'parent', 'children', 'row')
+
+    def __init__(self, pid, ppid=0, name='', status='', cpu=0.0, rss=0, create_time=0.0):
+        self.pid = pid
+        self.ppid = ppid
+        self.name = name
+        self.status = status
+        self.cpu = cpu
+        self.rss = rss
+        self.create_time = create_time
+        self.total_cpu = cpu
+        self.total_rss = rss
+        self.parent = None
+        self.children = []
+        self.row = 0
+
+    def ancestors(self):
+        node = self.parent
+        while node is not None and node.parent is not None:
+            yield node
+            node = node.parent
+
+
+class ProcessTreeModel(QtCore.QAbstractItemModel):
+    """按父子关系组织的进程树模型，CPU 和内存合计值随快照增量向上汇总"""
+
+    HEADERS = ["进程名称", "PID", "状态", "CPU使用率", "内存使用", "合计CPU", "合计内存"]
+    COL_NAME, COL_PID, COL_STATUS, COL_CPU, COL_RSS, COL_TOTAL_CPU, COL_TOTAL_RSS = range(7)
+    # 一次刷新中退出和新出现的进程超过这个数量时，不再按父节点逐区间发出行信号，
+    # 而是在一次布局变化内完成更新
+    LAYOUT_NODES = 64
+
+    def __init__(self, search_index=None, parent=None):
+        super().__init__(parent)
+        self._root = ProcessNode(-1)
+        self._nodes = {}      # pid -> ProcessNode
+        self._orphans = {}    # 尚未出现的父 PID -> {挂在根下等待的子节点}
+        # 与表格模型共用的搜索索引（结果集按 PID 计算，两种视图一致）
+        self.search_index = search_index
+        # 远程模式中 PID 按主机编码（见 remote_hosts），非 0 时 PID 列只显示主机内的 PID
+        self.pid_stride = 0
+        # 在布局变化内更新时为 False，各结构操作不再逐个发出行信号
+        self._notify = True
+
+    def __len__(self):
+        return len(self._nodes)
+
+    # ---- Qt 模型接口 ----
+
+    def _node(self, index):
+        return index.internalPointer() if index.isValid() else self._root
+
+    def index(self, row, column, parent=QtCore.QModelIndex()):
+        node = self._node(parent)
+        if 0 <= row < len(node.children) and 0 <= column < len(self.HEADERS):
+            return self.createIndex(row, column, node.children[row])
+        return QtCore.QModelIndex()
+
+    def parent(self, index):
+        if not index.isValid():
+            return QtCore.QModelIndex()
+        parent = index.internalPointer().parent
+        if parent is None or parent is self._root:
+            return QtCore.QModelIndex()
+        return self.createIndex(parent.row, 0, parent)
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        if parent.column() > 0:
+            return 0
+        return len(self._node(parent).children)
+
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        return len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=QtCore.Qt.DisplayRole):
+        if role == QtCore.Qt.DisplayRole and orientation == QtCore.Qt.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        node = index.internalPointer()
+        col = index.column()
+        if role == SORT_ROLE:
+            return self.sort_key(node, col)
+        if role == QtCore.Qt.DisplayRole:
+            if col == self.COL_NAME:
+                return node.name
+            if col == self.COL_PID:
+                return str(node.pid % self.pid_stride if self.pid_stride else node.pid)
+            if col == self.COL_STATUS:
+                return node.status
+            if col == self.COL_CPU:
+                return f"{node.cpu:.1f}%"
+            if col == self.COL_RSS:
+                return f"{node.rss / (1024 * 1024):.1f} MB"
+            if col == self.COL_TOTAL_CPU:
+                return f"{max(node.total_cpu, 0.0):.1f}%"
+            if col == self.COL_TOTAL_RSS:
+                return f"{max(node.total_rss, 0) / (1024 * 1024):.1f} MB"
+        elif role == QtCore.Qt.TextAlignmentRole:
+            if col != self.COL_NAME and col != self.COL_STATUS:
+                return int(QtCore.Qt.AlignRight | QtCore.Qt.AlignVCenter)
+        return None
+
+    def sort_key(self, node, col):
+        """节点在第 col 列的排序值（即 SORT_ROLE 的数据）"""
+        if col == self.COL_NAME:
+            return node.name.lower()
+        return (None, node.pid, node.status, node.cpu, node.rss,
+                node.total_cpu, node.total_rss)[col]
+
+    def pid_at_index(self, index):
+        return index.internalPointer().pid if index.isValid() else None
+
+    def key_at_index(self, index):
+        """返回 (pid, create_time)，无效索引返回 None"""
+        if not index.isValid():
+            return None
+        node = index.internalPointer()
+        return (node.pid, node.create_time)
+
+    def index_of(self, pid):
+        node = self._nodes.get(pid)
+        if node is None:
+            return QtCore.QModelIndex()
+        return self.createIndex(node.row, 0, node)
+
+    def _index_of_node(self, node):
+        if node is self._root:
+            return QtCore.QModelIndex()
+        return self.createIndex(node.row, 0, node)
+
+    # ---- 增量更新 ----
+
+    def update_snapshot(self, snapshot):
+        """按快照增量更新进程树，只沿变化节点的祖先链修正合计值"""
+        alive = set(snapshot.pid)
+        removed = [node for pid, node in self._nodes.items() if pid not in alive]
+        added = []
+        reparented = False
+        for i, pid in enumerate(snapshot.pid):
+            node = self._nodes.get(pid)
+            if node is None:
+                added.append(i)
+            elif node.ppid != snapshot.ppid[i]:
+                reparented = True
+
+        dirty = set()
+        if not reparented and self._is_simple_delta(snapshot, removed, added):
+            # 只有叶子进程退出、新进程挂到已有节点下：按父节点合并成连续区间发出行信号
+            self._remove_leaves(removed, dirty)
+            self._update_nodes(snapshot, dirty)
+            self._insert_nodes(snapshot, added, dirty)
+            self._emit_changed(dirty)
+            return
+
+        # 需要移动子树或变化很多时，在一次布局变化内逐个处理：排序代理模型把每次
+        # 移动都当作一次布局变化，逐个发出的开销随节点数平方增长。
+        # 先取出持久索引指向的节点（同时保持引用，已删除的节点不会被回收）
+        self.layoutAboutToBeChanged.emit()
+        persistent = self.persistentIndexList()
+        persistent_nodes = [index.internalPointer() for index in persistent]
+        self._notify = False
+        try:
+            for node in removed:
+                self._remove(node, dirty)
+            self._update_nodes(snapshot, dirty)
+            for i in added:
+                self._add_node(snapshot, i, dirty)
+        finally:
+            self._notify = True
+        self.changePersistentIndexList(persistent, [
+            self.createIndex(node.row, index.column(), node) if node.parent is not None
+            else QtCore.QModelIndex()
+            for node, index in zip(persistent_nodes, persistent)])
+        # 布局变化之后视图和代理模型会重新读取所有行，不必再发出 dataChanged
+        self.layoutChanged.emit()
+
+    def _is_simple_delta(self, snapshot, removed, added):
+        """本次变化是否不涉及子树移动，且数量不大"""
+        if len(removed) + len(added) > self.LAYOUT_NODES:
+            return False
+        if any(node.children for node in removed):
+            return False
+        added_pids = {snapshot.pid[i] for i in added}
+        for i in added:
+            # 新进程的父进程也是新出现的，或者已有子进程在等待它：都需要移动节点
+            if snapshot.ppid[i] in added_pids or snapshot.pid[i] in self._orphans:
+                return False
+        return True
+
+    def _update_nodes(self, snapshot, dirty):
+        """更新已有节点的数值，父 PID 变化时移动子树"""
+        for i, pid in enumerate(snapshot.pid):
+            node = self._nodes.get(pid)
+            if node is None:
+                continue
+            ppid = snapshot.ppid[i]
+            if ppid != node.ppid:
+                self._forget_orphan(node)
+                node.ppid = ppid
+                self._reparent(node, dirty)
+            # 创建时间不显示，但 key_at_index 依赖它识别 PID 复用，每次都要更新
+            node.create_time = snapshot.create_time[i]
+            d_cpu = snapshot.cpu[i] - node.cpu
+            d_rss = snapshot.rss[i] - node.rss
+            if (d_cpu or d_rss or node.status != snapshot.status[i]
+                    or node.name != snapshot.name[i]):
+                node.name = snapshot.name[i]
+                node.status = snapshot.status[i]
+                node.cpu = snapshot.cpu[i]
+                node.rss = snapshot.rss[i]
+                self._propagate(node, d_cpu, d_rss, dirty)
+
+    def _new_node(self, snapshot, i):
+        node = ProcessNode(snapshot.pid[i], snapshot.ppid[i], snapshot.name[i],
+                           snapshot.status[i], snapshot.cpu[i], snapshot.rss[i],
+                           snapshot.create_time[i])
+        self._nodes[node.pid] = node
+        return node
+
+    def _add_node(self, snapshot, i, dirty):
+        node = self._new_node(snapshot, i)
+        self._attach(node, self._parent_for(node), dirty)
+        # 先出现的子进程此时可以挂到新出现的父进程下
+        waiting = self._orphans.pop(node.pid, None)
+        if waiting:
+            for child in list(waiting):
+                self._reparent(child, dirty)
+
+    def _remove_leaves(self, removed, dirty):
+        """删除没有子进程的已退出节点，同一父节点下的连续行合并为一次删除"""
+        by_parent = {}
+        for node in removed:
+            node.total_cpu = node.cpu
+            node.total_rss = node.rss
+            self._propagate_subtree(node, -1, dirty)
+            self._forget_orphan(node)
+            by_parent.setdefault(id(node.parent), (node.parent, []))[1].append(node.row)
+        for parent, rows in by_parent.values():
+            rows.sort()
+            parent_index = self._index_of_node(parent)
+            for start, end in reversed(contiguous_ranges(rows)):
+                self.beginRemoveRows(parent_index, start, end)
+                del parent.children[start:end + 1]
+                # 每次删除后都修正后续兄弟的行号，信号之间模型始终保持一致
+                for row in range(start, len(parent.children)):
+                    parent.children[row].row = row
+                self.endRemoveRows()
+        for node in removed:
+            node.parent = None
+            del self._nodes[node.pid]
+            dirty.discard(node)
+
+    def _insert_nodes(self, snapshot, added, dirty):
+        """新进程追加到各自父节点的子列表末尾，每个父节点发出一次插入"""
+        by_parent = {}
+        for i in added:
+            node = self._new_node(snapshot, i)
+            parent = self._parent_for(node)
+            by_parent.setdefault(id(parent), (parent, []))[1].append(node)
+        for parent, nodes in by_parent.values():
+            first = len(parent.children)
+            self.beginInsertRows(self._index_of_node(parent), first, first + len(nodes) - 1)
+            for row, node in enumerate(nodes, first):
+                node.parent = parent
+                node.row = row
+            parent.children.extend(nodes)
+            self.endInsertRows()
+            for node in nodes:
+                if parent is self._root and node.ppid and node.ppid != node.pid:
+                    self._orphans.setdefault(node.ppid, set()).add(node)
+                self._propagate_subtree(node, 1, dirty)
+
+    def _parent_for(self, node):
+        """找到节点应挂载的父节点；父进程缺失或会形成环时挂在根下"""
+        parent = self._nodes.get(node.ppid)
+        if parent is None or parent is node:
+            return self._root
+        ancestor = parent
+        while ancestor is not None:
+            if ancestor is node:
+                return self._root
+            ancestor = ancestor.parent
+        return parent
+
+    def _propagate(self, node, d_cpu, d_rss, dirty):
+        """节点自身数值变化：节点和全部祖先的合计值加上差值"""
+        node.total_cpu += d_cpu
+        node.total_rss += d_rss
+        dirty.add(node)
+        for ancestor in node.ancestors():
+            ancestor.total_cpu += d_cpu
+            ancestor.total_rss += d_rss
+            dirty.add(ancestor)
+
+    def _attach(self, node, parent, dirty):
+        parent_index = self._index_of_node(parent)
+        row = len(parent.children)
+        if self._notify:
+            self.beginInsertRows(parent_index, row, row)
+        node.parent = parent
+        node.row = row
+        parent.children.append(node)
+        if self._notify:
+            self.endInsertRows()
+        if parent is self._root and node.ppid and node.ppid != node.pid:
+            self._orphans.setdefault(node.ppid, set()).add(node)
+        self._propagate_subtree(node, 1, dirty)
+
+    def _propagate_subtree(self, node, sign, dirty):
+        """把整棵子树的合计值加到（或减出）祖先链"""
+        for ancestor in node.ancestors():
+            ancestor.total_cpu += sign * node.total_cpu
+            ancestor.total_rss += sign * node.total_rss
+            dirty.add(ancestor)
+
+    def _detach_rows(self, node):
+        """从父节点的子列表中摘除，并修正后续兄弟的行号"""
+        parent = node.parent
+        del parent.children[node.row]
+        for row in range(node.row, len(parent.children)):
+            parent.children[row].row = row
+
+    def _forget_orphan(self, node):
+        waiting = self._orphans.get(node.ppid)
+        if waiting is not None:
+            waiting.discard(node)
+            if not waiting:
+                del self._orphans[node.ppid]
+
+    def _remove(self, node, dirty):
+        """删除已退出的进程；它的子进程暂时挂到根下，等待下次快照给出新的父进程"""
+        for child in list(node.children):
+            self._move(child, self._root, dirty)
+            # 父进程已退出，不再等待该 PID（它可能被别的进程复用）
+            self._forget_orphan(child)
+        node.total_cpu = node.cpu
+        node.total_rss = node.rss
+        self._propagate_subtree(node, -1, dirty)
+        self._forget_orphan(node)
+        if self._notify:
+            self.beginRemoveRows(self._index_of_node(node.parent), node.row, node.row)
+        self._detach_rows(node)
+        if self._notify:
+            self.endRemoveRows()
+        node.parent = None
+        del self._nodes[node.pid]
+        dirty.discard(node)
+
+    def _reparent(self, node, dirty):
+        """父 PID 变化（或父进程出现）时把整棵子树移动到新父节点下"""
+        parent = self._parent_for(node)
+        if parent is not node.parent:
+            self._move(node, parent, dirty)
+        elif parent is self._root and node.ppid and node.ppid != node.pid:
+            self._orphans.setdefault(node.ppid, set()).add(node)
+
+    def _move(self, node, parent, dirty):
+        if parent is node.parent:
+            return
+        self._forget_orphan(node)
+        self._propagate_subtree(node, -1, dirty)
+        if self._notify:
+            self.beginMoveRows(self._index_of_node(node.parent), node.row, node.row,
+                               self._index_of_node(parent), len(parent.children))
+        self._detach_rows(node)
+        node.parent = parent
+        node.row = len(parent.children)
+        parent.children.append(node)
+        if self._notify:
+            self.endMoveRows()
+        if parent is self._root and node.ppid and node.ppid != node.pid:
+            self._orphans.setdefault(node.ppid, set()).add(node)
+        self._propagate_subtree(node, 1, dirty)
+
+    def _emit_changed(self, dirty):
+        """按父节点分组，把变化的行合并成连续区间后发出 dataChanged"""
+        by_parent = {}
+        for node in dirty:
+            if node.parent is not None:
+                by_parent.setdefault(id(node.parent), (node.parent, []))[1].append(node.row)
+        last_col = len(self.HEADERS) - 1
+        for parent, rows in by_parent.values():
+            rows.sort()
+            for start, end in contiguous_ranges(rows):
+                self.dataChanged.emit(
+                    self.createIndex(start, 0, parent.children[start]),
+                    self.createIndex(end, last_col, parent.children[end]),
+                    [QtCore.Qt.DisplayRole, SORT_ROLE])
+
+    def recompute_totals(self):
+        """从叶子向上完整重算合计值（仅用于校验增量结果）"""
+        def visit(node):
+            cpu, rss = node.cpu, node.rss
+            for child in node.children:
+                c, r = visit(child)
+                cpu += c
+                rss += r
+            return cpu, rss
+        return {node.pid: visit(node) for node in self._nodes.values()}
+
+
+class ProcessTreeProxyModel(ProcessFilterProxyModel):
+    """进程树的排序/过滤代理：子孙匹配时保留祖先，便于看清层级"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setRecursiveFilteringEnabled(True)
+
+    def lessThan(self, left, right):
+        # 直接比较两个节点的排序值，省去 data() 调用和 QVariant 转换
+        model = self.sourceModel()
+        col = left.column()
+        return (model.sort_key(left.internalPointer(), col)
+                < model.sort_key(right.internalPointer(), col))
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        result = self._index.result if self._index is not None else None
+        if result is None:
+            return True
+        model = self.sourceModel()
+        index = model.index(source_row, 0, source_parent)
+        return model.pid_at_index(index) in result
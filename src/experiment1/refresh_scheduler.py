@@ -0,0 +1,145 @@
+from PyQt5 import QtCore
+
+# 窗口状态
+ACTIVE, UNFOCUSED, HIDDEN = 'active', 'unfocused', 'hidden'
+
+
+class ScheduledChannel(object):
+    """一个按自适应间隔触发的刷新通道"""
+
+    def __init__(self, name, callback, interval, sampler_channel=None,
+                 hidden_interval=None, unfocused_factor=3, watching_interval=None):
+        self.name = name
+        self.callback = callback
+        self.interval = interval                    # 窗口激活时的基础间隔（毫秒）
+        self.hidden_interval = hidden_interval      # 窗口隐藏时的间隔，None 表示暂停
+        self.unfocused_factor = unfocused_factor    # 失去焦点时的放慢倍数
+        self.watching_interval = watching_interval  # 关注选中进程时的间隔
+        self.sampler_channel = sampler_channel
+        self.cost = 0.0        # 单次采集 CPU 时间的指数滑动平均（秒）
+        self.current = None    # 当前生效的间隔，None 表示暂停
+        self.timer = QtCore.QTimer()
+        self.timer.setSingleShot(True)
+
+
+class RefreshScheduler(QtCore.QObject):
+    """自适应刷新调度：窗口隐藏时暂停或放慢，失去焦点时放慢，关注选中进程时加快；
+    同时按实测的采集 CPU 时间拉长间隔，使采集线程的 CPU 占用不超过 budget"""
+    intervalsChanged = QtCore.pyqtSignal(dict)
+
+    # 采集耗时的平滑系数
+    COST_ALPHA = 0.3
+
+    def __init__(self, widget, budget=0.05, parent=None):
+        super().__init__(parent)
+        self.widget = widget
+        self.budget = budget       # 允许采集占用的单核 CPU 比例，例如 0.05 表示 5%
+        self.watching = False      # 是否正在关注某个选中的进程
+        self.state = None
+        self.channels = {}
+        self._running = False
+        widget.installEventFilter(self)
+
+    def add_channel(self, name, callback, interval, sampler_channel=None, **options):
+        channel = ScheduledChannel(name, callback, interval, sampler_channel, **options)
+        channel.timer.timeout.connect(lambda: self._fire(channel))
+        if sampler_channel is not None:
+            sampler_channel.sampled.connect(lambda result: self._measure(channel))
+        self.channels[name] = channel
+        return channel
+
+    def start(self):
+        """开始调度；窗口已经可见时各通道立即触发一次"""
+        self._running = True
+        self.state = self.window_state()
+        self._reschedule(fire_now=self.state != HIDDEN)
+
+    def stop(self):
+        self._running = False
+        for channel in self.channels.values():
+            channel.timer.stop()
+
+    def set_watching(self, watching):
+        if watching != self.watching:
+            self.watching = watching
+            self._reschedule()
+
+    def window_state(self):
+        widget = self.widget
+        if not widget.isVisible() or widget.isMinimized():
+            return HIDDEN
+        if not widget.isActiveWindow():
+            return UNFOCUSED
+        return ACTIVE
+
+    def update_state(self):
+        """重新判断窗口状态；从隐藏恢复时立即刷新一次，避免显示过期数据"""
+        state = self.window_state()
+        if state == self.state:
+            return
+        resumed = self.state == HIDDEN
+        self.state = state
+        self._reschedule(fire_now=resumed)
+
+    def interval_for(self, channel):
+        """计算通道当前应使用的间隔（毫秒），None 表示暂停"""
+        if self.state == HIDDEN:
+            interval = channel.hidden_interval
+            if interval is None:
+                return None
+        elif self.state == UNFOCUSED:
+            interval = channel.interval * channel.unfocused_factor
+        elif self.watching and channel.watching_interval:
+            interval = channel.watching_interval
+        else:
+            interval = channel.interval
+        if self.budget > 0 and channel.cost > 0:
+            # 预算在各通道间平分：cost / interval <= budget / 通道数
+            floor = channel.cost * len(self.channels) / self.budget * 1000
+            interval = max(interval, int(floor))
+        return interval
+
+    def eventFilter(self, obj, event):
+        if obj is self.widget and event.type() in (
+                QtCore.QEvent.Show, QtCore.QEvent.Hide, QtCore.QEvent.WindowStateChange,
+                QtCore.QEvent.WindowActivate, QtCore.QEvent.WindowDeactivate):
+            # 事件处理完后窗口状态才生效，排队到下一轮事件循环再判断
+            QtCore.QTimer.singleShot(0, self.update_state)
+        return False
+
+    def _reschedule(self, fire_now=False):
+        if not self._running:
+            return
+        for channel in self.channels.values():
+            interval = self.interval_for(channel)
+            if interval == channel.current and not fire_now:
+                continue
+            channel.current = interval
+            if interval is None:
+                channel.timer.stop()
+                continue
+            remaining = channel.timer.remainingTime() if channel.timer.isActive() else -1
+            if fire_now:
+                channel.timer.start(0)
+            elif remaining < 0 or remaining > interval:
+                # 间隔变短时立即按新间隔生效；变长时等当前这一轮触发后再生效
+                channel.timer.start(interval)
+        self.intervalsChanged.emit(self.intervals())
+
+    def intervals(self):
+        return {name: channel.current for name, channel in self.channels.items()}
+
+    def _fire(self, channel):
+        channel.callback()
+        if self._running and channel.current is not None:
+            channel.timer.start(channel.current)
+
+    def _measure(self, channel):
+        cost = channel.sampler_channel.cpu_time
+        channel.cost = (cost if channel.cost == 0 else
+                        channel.cost + self.COST_ALPHA * (cost - channel.cost))
+        interval = self.interval_for(channel)
+        if interval != channel.current and channel.current is not None:
+            # 采集变慢或变快时，下一轮按新间隔触发
+            channel.current = interval
+            self.intervalsChanged.emit(self.intervals())
@@ -0,0 +1,208 @@
+"""多主机远程采集：并发向多个进程代理（process_agent.py）请求快照并合并为一个快照
+
+合并后的 PID 为 主机序号 * HOST_PID_STRIDE + 原 PID（父进程 PID 同样换算），
+保证不同主机的进程不会冲突，进程树也按主机各自成树；额外的 host 列记录主机名。
+"""
+import asyncio
+import threading
+import time
+import zlib
+
+from process_agent import DEFAULT_PORT, HANDSHAKE
+from process_collector import ProcessSnapshot, SystemSample
+from snapshot_recorder import FRAME, SnapshotDecoder, decode_payload
+
+# Linux 的 PID 上限为 2^22
+HOST_PID_STRIDE = 1 << 22
+
+
+def parse_hosts(text):
+    """解析 "host[:port],..." 形式的主机列表"""
+    hosts = []
+    for item in text.split(','):
+        item = item.strip()
+        if not item:
+            continue
+        host, sep, port = item.rpartition(':')
+        if not sep or not port.isdigit():
+            host, port = item, DEFAULT_PORT
+        hosts.append((host.strip('[]'), int(port)))
+    if not hosts:
+        raise ValueError("没有指定远程主机")
+    return hosts
+
+
+class AgentConnection(object):
+    """到一个代理的连接；差分解码状态与连接绑定，同一时间只处理一个请求"""
+
+    def __init__(self, reader, writer, hostname):
+        self.reader = reader
+        self.writer = writer
+        self.hostname = hostname
+        self.decoder = SnapshotDecoder()
+
+    @classmethod
+    async def open(cls, host, port, token, timeout):
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+        try:
+            writer.write(HANDSHAKE + b' ' + token.encode('utf-8') + b'\n')
+            line = await asyncio.wait_for(reader.readline(), timeout)
+            if not line.startswith(b'OK'):
+                raise ConnectionError(f"{host}:{port} 拒绝连接（令牌错误？）")
+        except BaseException:
+            writer.close()
+            raise
+        return cls(reader, writer, line[3:].strip().decode('utf-8', 'replace') or host)
+
+    async def request(self, line):
+        """发送一个请求行并读取、解码一个回复帧"""
+        self.writer.write(line.encode('utf-8') + b'\n')
+        await self.writer.drain()
+        kind, length = FRAME.unpack(await self.reader.readexactly(FRAME.size))
+        frame = self.decoder.decode(kind, decode_payload(await self.reader.readexactly(length)))
+        if frame is None:
+            raise ConnectionError("收到无法解码的帧")
+        return frame
+
+    def close(self):
+        self.writer.close()
+
+
+class RemoteHost(object):
+    """一台远程主机：空闲连接池、最近一次的结果和错误"""
+
+    def __init__(self, index, host, port):
+        self.index = index
+        self.host = host
+        self.port = port
+        self.label = f"{host}:{port}"
+        self.idle = []
+        self.error = None
+        self.retry_at = 0.0   # 失败后在此之前不再尝试，避免每次刷新都等待超时
+
+    def __repr__(self):
+        return f"RemoteHost({self.label!r})"
+
+
+class RemoteCollector(object):
+    """远程采集器：接口与本地采集器一致（collect、columns），并提供 sample_system。
+
+    可被多个采样线程同时调用：请求都提交到内部事件循环线程中执行，
+    每台主机最多 max_connections 个连接，系统信息和进程列表请求可以并行。
+    """
+
+    RETRY_DELAY = 10.0
+
+    def __init__(self, hosts, token='', timeout=3.0, max_connections=2):
+        self.hosts = [RemoteHost(i, host, port) for i, (host, port) in enumerate(hosts)]
+        self.token = token
+        self.timeout = timeout
+        self.columns = ()
+        self._loop = asyncio.new_event_loop()
+        self._limits = None
+        self._thread = threading.Thread(target=self._loop.run_forever,
+                                        name="remote-hosts", daemon=True)
+        self._thread.start()
+        self._call(self._init_limits(max_connections))
+
+    async def _init_limits(self, max_connections):
+        self._limits = {host: asyncio.Semaphore(max_connections) for host in self.hosts}
+
+    def _call(self, coroutine):
+        future = asyncio.run_coroutine_threadsafe(coroutine, self._loop)
+        return future.result()
+
+    def online(self):
+        return [host for host in self.hosts if host.error is None]
+
+    def errors(self):
+        return {host.label: host.error for host in self.hosts if host.error is not None}
+
+    def close(self):
+        if self._loop.is_closed():
+            return
+        self._call(self._close_all())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+    async def _close_all(self):
+        for host in self.hosts:
+            for connection in host.idle:
+                connection.close()
+            host.idle.clear()
+
+    async def _request(self, host, line):
+        """从连接池取一个连接执行请求；超时或出错时丢弃该连接并记录错误"""
+        if host.error is not None and time.monotonic() < host.retry_at:
+            return None
+        async with self._limits[host]:
+            connection = host.idle.pop() if host.idle else None
+            try:
+                if connection is None:
+                    connection = await AgentConnection.open(host.host, host.port,
+                                                            self.token, self.timeout)
+                result = await asyncio.wait_for(connection.request(line), self.timeout)
+            except (OSError, EOFError, ValueError, KeyError, zlib.error,
+                    asyncio.TimeoutError, asyncio.IncompleteReadError) as e:
+                # 负载损坏（解压、JSON 或差分还原失败）同样只把该主机标记为离线
+                if connection is not None:
+                    connection.close()
+                host.error = str(e) or type(e).__name__
+                host.retry_at = time.monotonic() + self.RETRY_DELAY
+                return None
+            host.idle.append(connection)
+            host.error = None
+            return connection.hostname, result
+
+    async def _gather(self, line):
+        return await asyncio.gather(*(self._request(host, line) for host in self.hosts))
+
+    def collect(self):
+        """并发请求所有主机的进程快照并合并；所有主机都失败时抛出异常"""
+        columns = ','.join(key for key in self.columns if key != 'host')
+        results = self._call(self._gather(f"P {columns}"))
+        parts = [(host, result) for host, result in zip(self.hosts, results)
+                 if result is not None]
+        if not parts:
+            raise ConnectionError("所有远程主机都不可用：" + "; ".join(
+                f"{label}: {error}" for label, error in self.errors().items()))
+        return merge_snapshots(parts, self.columns)
+
+    def sample_system(self):
+        """合并各主机的系统指标：CPU 取平均，内存和进程数求和"""
+        results = [result for result in self._call(self._gather("S")) if result is not None]
+        if not results:
+            raise ConnectionError("所有远程主机都不可用")
+        samples = [sample for hostname, sample in results]
+        mem_total = sum(sample.mem_total for sample in samples)
+        mem_used = sum(sample.mem_used for sample in samples)
+        return SystemSample(
+            timestamp=max(sample.timestamp for sample in samples),
+            cpu_percent=round(sum(sample.cpu_percent for sample in samples) / len(samples), 1),
+            mem_total=mem_total,
+            mem_used=mem_used,
+            mem_percent=round(mem_used / mem_total * 100, 1) if mem_total else 0.0,
+            process_count=sum(sample.process_count for sample in samples),
+        )
+
+
+def merge_snapshots(parts, columns=()):
+    """把 [(RemoteHost, (主机名, 快照)), ...] 合并为一个快照，PID 按主机序号换算"""
+    extras = [key for key in columns if key != 'host'] + ['host']
+    merged = ProcessSnapshot(max(snapshot.timestamp for host, (name, snapshot) in parts),
+                             columns=extras)
+    for host, (hostname, snapshot) in parts:
+        base = host.index * HOST_PID_STRIDE
+        merged.pid.extend(base + pid for pid in snapshot.pid)
+        merged.ppid.extend(base + ppid if ppid else 0 for ppid in snapshot.ppid)
+        for field in ProcessSnapshot.FIELDS:
+            if field not in ('pid', 'ppid'):
+                getattr(merged, field).extend(getattr(snapshot, field))
+        count = len(snapshot.pid)
+        for key in extras:
+            if key == 'host':
+                merged.extra[key].extend([hostname] * count)
+            else:
+                merged.extra[key].extend(snapshot.extra.get(key) or [None] * count)
+    return merged
@@ -0,0 +1,85 @@
+import struct
+import zlib
+
+from PyQt5 import QtCore
+
+from process_collector import SystemSample
+from snapshot_recorder import read_frames
+
+# 读取或解码损坏的录制文件时可能出现的异常；增量帧缺字段、行号越界或值类型不对时
+# 是 KeyError/IndexError/TypeError
+FRAME_ERRORS = (OSError, ValueError, KeyError, IndexError, TypeError, struct.error, zlib.error)
+
+
+def describe_error(e):
+    if isinstance(e, (KeyError, IndexError, TypeError)):
+        return f"损坏的增量帧（{type(e).__name__}: {e}）"
+    return str(e)
+
+
+class ReplayPlayer(QtCore.QObject):
+    """按录制时的时间间隔（除以加速倍数）回放录制文件，信号与 ProcessSampler 一致"""
+    systemSampled = QtCore.pyqtSignal(object)
+    processesSampled = QtCore.pyqtSignal(object)
+    sampleFailed = QtCore.pyqtSignal(str)
+    finished = QtCore.pyqtSignal()
+
+    # 两帧之间最长等待（毫秒），避免录制中的长时间暂停拖慢回放
+    MAX_DELAY = 2000
+
+    def __init__(self, path, speed=10.0, parent=None):
+        super().__init__(parent)
+        self.path = path
+        self.speed = speed
+        self.frames = 0
+        self.error = None     # 因文件损坏提前结束时的错误信息
+        self._frames = None
+        self._next = None
+        self._timer = QtCore.QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._advance)
+
+    def start(self):
+        try:
+            self._frames = read_frames(self.path)
+            self._next = next(self._frames, None)
+        except FRAME_ERRORS as e:
+            self.error = describe_error(e)
+            self.sampleFailed.emit(self.error)
+            self.finished.emit()
+            return
+        self._timer.start(0)
+
+    def stop(self):
+        self._timer.stop()
+
+    def is_paused(self):
+        return not self._timer.isActive() and self._next is not None
+
+    def set_paused(self, paused):
+        if paused:
+            self._timer.stop()
+        elif self._next is not None and self._frames is not None:
+            self._timer.start(0)
+
+    def _advance(self):
+        frame = self._next
+        if frame is None:
+            self.finished.emit()
+            return
+        try:
+            self._next = next(self._frames, None)
+        except FRAME_ERRORS as e:  # 损坏的帧
+            self.error = describe_error(e)
+            self.sampleFailed.emit(self.error)
+            self._next = None
+        self.frames += 1
+        if isinstance(frame, SystemSample):
+            self.systemSampled.emit(frame)
+        else:
+            self.processesSampled.emit(frame)
+        if self._next is None:
+            self.finished.emit()
+            return
+        delay = (self._next.timestamp - frame.timestamp) * 1000 / self.speed
+        self._timer.start(int(min(max(delay, 0), self.MAX_DELAY)))
@@ -0,0 +1,230 @@
+"""快照录制与回放：把采样结果追加写入紧凑的二进制文件，帧之间做差分编码
+
+文件格式：文件头 MAGIC，之后是一连串帧。每帧为 struct FRAME（类型、负载长度）
+加上 zlib 压缩的 JSON 负载。进程帧分关键帧（完整快照）和差分帧（只记录
+新增、退出和数值变化的进程）；每 KEYFRAME_INTERVAL 帧及每次重新打开文件时
+写一个关键帧。文件尾部因崩溃而不完整的帧在读取时会被忽略，继续录制时先截掉。
+
+远程代理（process_agent.py）在网络上使用同样的帧格式和差分编码。
+"""
+import json
+import os
+import struct
+import threading
+import zlib
+
+from process_collector import ProcessSnapshot, SystemSample
+
+MAGIC = b'PMREC1\n'
+FRAME = struct.Struct('<cI')
+KEYFRAME, DELTA, SYSTEM = b'K', b'D', b'S'
+KEYFRAME_INTERVAL = 60
+
+
+def _columns(snapshot):
+    """快照中要编码的列：基础字段加上本次采集的可选列"""
+    columns = {field: getattr(snapshot, field) for field in ProcessSnapshot.FIELDS}
+    for key, values in snapshot.extra.items():
+        columns['extra.' + key] = values
+    return columns
+
+
+def encode_frame(kind, payload):
+    """把一帧编码为 帧头 + zlib 压缩的 JSON 负载"""
+    data = zlib.compress(json.dumps(payload, separators=(',', ':')).encode('utf-8'))
+    return FRAME.pack(kind, len(data)) + data
+
+
+def decode_payload(data):
+    return json.loads(zlib.decompress(data))
+
+
+class SnapshotEncoder(object):
+    """差分编码器：每个快照编码为关键帧，或相对上一次编码结果的差分帧"""
+
+    def __init__(self, keyframe_interval=KEYFRAME_INTERVAL):
+        self.keyframe_interval = keyframe_interval
+        self._previous = None   # pid -> 行值元组（与 _fields 对齐）
+        self._fields = None
+        self._since_keyframe = 0
+
+    def reset(self):
+        """下一帧强制为关键帧（例如对端重新连接时）"""
+        self._previous = None
+
+    def encode(self, snapshot):
+        """返回 (帧类型, 负载)"""
+        columns = _columns(snapshot)
+        fields = tuple(columns)
+        values = list(columns.values())
+        rows = {}
+        for i, pid in enumerate(snapshot.pid):
+            rows[pid] = tuple(column[i] for column in values)
+
+        previous = self._previous
+        if (previous is None or fields != self._fields
+                or self._since_keyframe >= self.keyframe_interval):
+            kind = KEYFRAME
+            payload = {'t': snapshot.timestamp, 'fields': fields,
+                       'rows': list(rows.values())}
+            self._since_keyframe = 0
+        else:
+            kind = DELTA
+            payload = {'t': snapshot.timestamp,
+                       'removed': [pid for pid in previous if pid not in rows],
+                       'added': [], 'changed': []}
+            for pid, row in rows.items():
+                old = previous.get(pid)
+                if old is None:
+                    payload['added'].append(row)
+                elif old != row:
+                    # 只记录变化的字段：[pid, [字段序号, 新值, ...]]
+                    diff = []
+                    for j, (a, b) in enumerate(zip(old, row)):
+                        if a != b:
+                            diff += (j, b)
+                    payload['changed'].append((pid, diff))
+            self._since_keyframe += 1
+        self._previous = rows
+        self._fields = fields
+        return kind, payload
+
+
+class SnapshotDecoder(object):
+    """差分解码器：按帧还原 SystemSample 或 ProcessSnapshot"""
+
+    def __init__(self):
+        self._rows = None     # pid -> 行值列表
+        self._fields = None
+
+    def decode(self, kind, payload):
+        """返回还原出的对象；无法还原（缺少关键帧或未知类型）时返回 None"""
+        if kind == SYSTEM:
+            return SystemSample(*payload)
+        if kind == KEYFRAME:
+            self._fields = payload['fields']
+            self._rows = {row[0]: row for row in payload['rows']}
+        elif kind == DELTA:
+            rows = self._rows
+            if rows is None:
+                return None
+            for pid in payload['removed']:
+                rows.pop(pid, None)
+            for row in payload['added']:
+                rows[row[0]] = row
+            for pid, diff in payload['changed']:
+                row = rows[pid] = list(rows[pid])
+                for j in range(0, len(diff), 2):
+                    row[diff[j]] = diff[j + 1]
+        else:
+            return None
+        return _build_snapshot(payload['t'], self._fields, self._rows.values())
+
+
+def complete_length(f):
+    """返回录制文件中最后一个完整帧的结束位置；文件头不完整时返回 0，
+    不是录制文件时返回 None"""
+    size = os.fstat(f.fileno()).st_size
+    f.seek(0)
+    head = f.read(len(MAGIC))
+    if head != MAGIC:
+        return 0 if MAGIC.startswith(head) else None
+    end = len(MAGIC)
+    while True:
+        header = f.read(FRAME.size)
+        if len(header) < FRAME.size:
+            return end
+        kind, length = FRAME.unpack(header)
+        if kind not in (KEYFRAME, DELTA, SYSTEM) or end + FRAME.size + length > size:
+            return end
+        end += FRAME.size + length
+        f.seek(end)
+
+
+def check_recording(path):
+    """返回已有录制文件中完整部分的长度（文件不存在时为 0）；不是录制文件时抛出 ValueError"""
+    if not os.path.exists(path):
+        return 0
+    with open(path, 'rb') as f:
+        end = complete_length(f)
+    if end is None:
+        raise ValueError(f"{path} 不是进程快照录制文件")
+    return end
+
+
+class SnapshotRecorder(object):
+    """追加写入录制文件；可被采样线程并发调用"""
+
+    def __init__(self, path, keyframe_interval=KEYFRAME_INTERVAL):
+        self.path = path
+        self.frames = 0
+        self.bytes_written = 0
+        self._lock = threading.Lock()
+        self._encoder = SnapshotEncoder(keyframe_interval)
+        # 上次录制中途崩溃时最后一帧可能只写了一部分，接在后面写入的帧
+        # 会全部错位，因此先截掉不完整的尾部
+        end = check_recording(path)
+        self._file = open(path, 'ab')
+        self._file.truncate(end)
+        if end == 0:
+            self._file.write(MAGIC)
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+    def record_system(self, sample):
+        with self._lock:
+            self._write_locked(encode_frame(SYSTEM, list(sample)))
+        return sample
+
+    def record_snapshot(self, snapshot):
+        """写入一帧进程快照并原样返回，便于包装采集函数"""
+        with self._lock:
+            self._write_locked(encode_frame(*self._encoder.encode(snapshot)))
+        return snapshot
+
+    def wrap(self, collect):
+        """返回一个采集函数：调用 collect 并录制结果"""
+        return lambda: self.record_snapshot(collect())
+
+    def _write_locked(self, frame):
+        if self._file.closed:
+            return
+        self._file.write(frame)
+        self._file.flush()
+        self.frames += 1
+        self.bytes_written += len(frame)
+
+
+def read_frames(path):
+    """逐帧解码录制文件，依次产出 SystemSample 或 ProcessSnapshot"""
+    decoder = SnapshotDecoder()
+    with open(path, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} 不是进程快照录制文件")
+        while True:
+            header = f.read(FRAME.size)
+            if len(header) < FRAME.size:
+                return
+            kind, length = FRAME.unpack(header)
+            if kind not in (KEYFRAME, DELTA, SYSTEM):
+                return  # 与 complete_length 一致：帧头损坏，之后的数据不可信
+            data = f.read(length)
+            if len(data) < length:
+                return  # 录制中断留下的不完整帧
+            frame = decoder.decode(kind, decode_payload(data))
+            if frame is not None:
+                yield frame
+
+
+def _build_snapshot(timestamp, fields, rows):
+    extras = [field[6:] for field in fields if field.startswith('extra.')]
+    snapshot = ProcessSnapshot(timestamp, columns=extras)
+    columns = [snapshot.extra[field[6:]] if field.startswith('extra.')
+               else getattr(snapshot, field) for field in fields]
+    for row in rows:
+        for column, value in zip(columns, row):
+            column.append(value)
+    return snapshot
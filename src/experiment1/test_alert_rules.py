@@ -0,0 +1,73 @@
+import pytest
+
+from alert_rules import AlertEngine, parse_rule
+from process_collector import ProcessSnapshot, SystemSample
+
+
+@pytest.mark.parametrize('text, metric, op, threshold, duration, system', [
+    ("rss > 2G for 30s", 'rss', '>', 2 * 1024 ** 3, 30.0, False),
+    ("cpu >= 90 for 60", 'cpu', '>=', 90.0, 60.0, False),
+    ("CPU<5", 'cpu', '<', 5.0, 0.0, False),
+    ("rss <= 512mb", 'rss', '<=', 512 * 1024 ** 2, 0.0, False),
+    ("rss > 1.5k", 'rss', '>', 1.5 * 1024, 0.0, False),
+    ("cpu > .5 for 2.5s", 'cpu', '>', 0.5, 2.5, False),
+    ("cpu > 5. for 10", 'cpu', '>', 5.0, 10.0, False),
+    ("  system.mem_percent > 95  ", 'mem_percent', '>', 95.0, 0.0, True),
+    ("System.cpu_percent >= 80 FOR 5S", 'cpu_percent', '>=', 80.0, 5.0, True),
+])
+def test_parse_rule(text, metric, op, threshold, duration, system):
+    rule = parse_rule(text)
+    assert (rule.metric, rule.op, rule.threshold, rule.duration, rule.system) == \
+        (metric, op, threshold, duration, system)
+
+
+@pytest.mark.parametrize('text', [
+    "", "cpu", "cpu > ", "cpu = 5", "cpu > 1.2.3", "cpu > 5 for", "cpu > 5 for 1.2.3s",
+    "cpu > 5 5", "rss > 2T", "foo > 1", "system.cpu > 1", "system.timestamp > 0",
+    "process.cpu > 1",
+])
+def test_parse_rule_rejects(text):
+    with pytest.raises(ValueError):
+        parse_rule(text)
+
+
+def test_describe_round_trips():
+    for text in ("rss > 2G for 30s", "cpu >= 90", "system.mem_percent > 95 for 10s"):
+        rule = parse_rule(text)
+        again = parse_rule(rule.name)
+        assert (again.metric, again.op, again.threshold, again.duration, again.system) == \
+            (rule.metric, rule.op, rule.threshold, rule.duration, rule.system)
+
+
+def snapshot(t, cpus):
+    s = ProcessSnapshot(t)
+    for pid, cpu in cpus.items():
+        s.append(pid, f"p{pid}", 'running', cpu, 0, 1.0)
+    return s
+
+
+def test_fires_after_duration_and_resolves():
+    engine = AlertEngine(["cpu > 50 for 10s"])
+    assert engine.evaluate_snapshot(snapshot(0, {1: 90, 2: 10})) == []
+    assert engine.evaluate_snapshot(snapshot(5, {1: 90, 2: 90})) == []
+    events = engine.evaluate_snapshot(snapshot(10, {1: 90, 2: 90}))
+    assert [(e.kind, e.pid) for e in events] == [('fired', 1)]
+    events = engine.evaluate_snapshot(snapshot(15, {2: 90}))   # 进程 1 退出
+    assert sorted((e.kind, e.pid) for e in events) == [('fired', 2), ('resolved', 1)]
+
+
+def test_gap_restarts_pending_timer():
+    engine = AlertEngine(["cpu > 50 for 10s"], max_gap=6)
+    engine.evaluate_snapshot(snapshot(0, {1: 90}))
+    assert engine.evaluate_snapshot(snapshot(20, {1: 90})) == []   # 间隔过长，重新计时
+    assert engine.evaluate_snapshot(snapshot(25, {1: 90})) == []
+    assert [e.kind for e in engine.evaluate_snapshot(snapshot(30, {1: 90}))] == ['fired']
+
+
+def test_system_rule():
+    engine = AlertEngine(["system.cpu_percent > 90 for 2s"])
+    sample = lambda t, cpu: SystemSample(t, cpu, 100, 50, 50.0, 1)
+    assert engine.evaluate_system(sample(0, 95)) == []
+    assert [e.kind for e in engine.evaluate_system(sample(2, 95))] == ['fired']
+    assert [e.kind for e in engine.evaluate_system(sample(3, 10))] == ['resolved']
+    assert engine.evaluate_snapshot(snapshot(3, {1: 100})) == []
@@ -0,0 +1,108 @@
+import math
+
+from metrics_history import MetricSeries, MetricsHistory, RingBuffer, Tier
+from process_collector import ProcessSnapshot, SystemSample
+
+
+def test_ring_buffer_wraps():
+    ring = RingBuffer(3)
+    assert math.isnan(ring.latest())
+    for value in range(5):
+        ring.append(value)
+    assert ring.values() == [2.0, 3.0, 4.0]
+    assert ring.latest() == 4.0
+    assert len(ring) == 3
+
+
+def test_tier_buckets_average_peak_and_gaps():
+    tier = Tier(10, 6)
+    for t, value in ((0, 1), (5, 3), (12, 4), (45, 8)):
+        tier.add(t, value)
+    tier.add(30, 100)   # 迟到的样本被丢弃
+    times, avg, peak = tier.series()
+    assert times == [0, 10, 20, 30, 40]
+    assert avg[:2] == [2.0, 4.0] and peak[:2] == [3.0, 4.0]
+    assert all(math.isnan(v) for v in avg[2:4])   # 缺失的桶用 NaN 占位
+    assert (avg[4], peak[4]) == (8.0, 8.0)        # 尚未结束的当前桶
+
+
+def test_coarser_tiers_cover_longer_spans():
+    series = MetricSeries(((1, 3600), (10, 24 * 3600), (60, 7 * 24 * 3600)))
+    assert [tier.span() for tier in series.tiers] == [3600, 24 * 3600, 7 * 24 * 3600]
+    assert series.tier_for(300).resolution == 1
+    assert series.tier_for(3600).resolution == 1
+    assert series.tier_for(2 * 3600).resolution == 10
+    assert series.tier_for(3 * 24 * 3600).resolution == 60
+    assert series.tier_for(30 * 24 * 3600).resolution == 60   # 超出全部层时用最粗的层
+
+
+def test_default_tiers_grow_coarser():
+    history = MetricsHistory()
+    for tiers in (history.cpu.tiers, MetricSeries(history.process_tiers).tiers):
+        spans = [tier.span() for tier in tiers]
+        resolutions = [tier.resolution for tier in tiers]
+        assert spans == sorted(set(spans))
+        assert resolutions == sorted(set(resolutions))
+
+
+def test_window_and_peak_use_matching_tier():
+    series = MetricSeries(((1, 60), (10, 600)))
+    for t in range(300):
+        series.add(t, 100.0 if t == 30 else 1.0)
+    # 最近 60 秒用 1 秒层，更早的尖峰只在 10 秒层中还能看到
+    times, avg, _ = series.window(240, 299)
+    assert times[0] == 240 and times[-1] == 299 and len(avg) == 60
+    assert series.peak(240, 299) == 1.0
+    assert series.peak(0, 299) == 100.0
+    assert math.isnan(series.peak(1000, 2000))
+
+
+def snapshot(t, pids):
+    s = ProcessSnapshot(t)
+    for pid in pids:
+        s.append(pid, f"p{pid}", 'running', float(pid), pid * 10, 1.0)
+    return s
+
+
+def test_system_samples_are_recorded():
+    history = MetricsHistory()
+    for t in range(5):
+        history.add_system(SystemSample(t, 10.0 * t, 100, 50, 50.0, 3))
+    assert history.cpu.tiers[0].series()[1] == [0.0, 10.0, 20.0, 30.0, 40.0]
+    assert history.latest == 4
+
+
+def test_exited_processes_expire():
+    history = MetricsHistory(process_tiers=((10, 100), (60, 300)))
+    history.add_snapshot(snapshot(0, [1, 2]))
+    history.add_snapshot(snapshot(200, [1]))
+    assert history.process(2, 1.0) is not None     # 仍在最粗一层的覆盖范围内
+    history.add_snapshot(snapshot(400, [1]))
+    assert history.process(2, 1.0) is None
+    assert history.process(1, 1.0).last_seen == 400
+
+
+def test_full_history_evicts_least_recently_seen():
+    history = MetricsHistory(max_processes=3)
+    history.add_snapshot(snapshot(0, [1, 2, 3]))
+    history.add_snapshot(snapshot(10, [1, 3]))
+    history.add_snapshot(snapshot(20, [1, 4]))      # 2 最久没有出现，被淘汰
+    assert sorted(pid for pid, _ in history.processes) == [1, 3, 4]
+    history.add_snapshot(snapshot(30, [1, 4, 5, 6]))  # 存活的进程本身超过上限
+    assert sorted(pid for pid, _ in history.processes) == [1, 4, 5]
+
+
+def test_top_processes():
+    history = MetricsHistory()
+    for t in range(0, 60, 10):
+        history.add_snapshot(snapshot(t, [1, 2, 3]))
+    ranked = history.top_processes(0, 60, 'cpu', top=2)
+    assert [h.pid for _, h in ranked] == [3, 2]
+
+
+def test_default_process_budget():
+    history = MetricsHistory()
+    slots = sum(span // resolution for resolution, span in history.process_tiers)
+    # 2 个指标 × 平均值和峰值 × float32，不含对象开销
+    assert slots * 2 * 2 * 4 * history.max_processes <= 8 * 1024 ** 2
+    assert history.seconds == 3600    # 已退出进程保留 1 小时
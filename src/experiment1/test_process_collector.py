@@ -0,0 +1,54 @@
+import os
+
+import psutil
+import pytest
+
+import process_collector
+from process_collector import PsutilCollector, start_stamp
+
+
+@pytest.fixture(params=[True, False], ids=['stat', 'no-stat'])
+def collector(request, monkeypatch):
+    # 两种复用检测路径都要覆盖：Linux 上的 starttime 比较，以及其他平台的异常时确认
+    if request.param and not process_collector.STAT_STARTTIME:
+        pytest.skip("当前平台或 psutil 版本不读取 starttime")
+    monkeypatch.setattr(process_collector, 'STAT_STARTTIME', request.param)
+    collector = PsutilCollector()
+    collector.collect()
+    return collector
+
+
+def test_start_stamp_is_stable():
+    proc = psutil.Process()
+    with proc.oneshot():
+        first = start_stamp(proc)
+    assert start_stamp(proc) == first
+
+
+def test_collect_reuses_cached_entries(collector):
+    entry = collector._cache[os.getpid()]
+    snapshot = collector.collect()
+    assert collector._cache[os.getpid()] is entry
+    assert os.getpid() in snapshot.pid
+
+
+def test_reused_pid_is_tracked_again(collector, monkeypatch):
+    entry = collector._cache[os.getpid()]
+    entry.name = 'stale'
+    if entry.start is not None:
+        entry.start = b'0'        # stat 中的原始 starttime 字段
+    else:
+        # 旧进程的累计 CPU 时间比新进程大，psutil 确认 PID 已被复用
+        entry.cpu_time = 1e9
+        monkeypatch.setattr(psutil.Process, 'is_running', lambda self: False)
+    collector.collect()
+    fresh = collector._cache[os.getpid()]
+    assert fresh is not entry
+    assert fresh.name == psutil.Process().name()
+
+
+def test_cpu_going_backwards_alone_keeps_entry(collector):
+    entry = collector._cache[os.getpid()]
+    entry.cpu_time = 1e9          # 进程仍然是同一个时只多一次确认，不重建缓存项
+    collector.collect()
+    assert collector._cache[os.getpid()] is entry
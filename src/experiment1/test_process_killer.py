@@ -0,0 +1,49 @@
+import subprocess
+import sys
+
+import psutil
+import pytest
+
+from process_collector import CREATE_TIME_TOLERANCE
+from process_killer import expand_tree, terminate_processes
+
+
+@pytest.fixture
+def child():
+    proc = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(60)'])
+    yield proc
+    proc.kill()
+    proc.wait()
+
+
+def key(pid):
+    return pid, psutil.Process(pid).create_time()
+
+
+def test_terminates_matching_process(child):
+    report = terminate_processes([key(child.pid)], timeout=5)
+    assert report.terminated == [child.pid] and report.ok
+
+
+def test_reused_pid_is_left_alone(child):
+    pid, create_time = key(child.pid)
+    report = terminate_processes([(pid, create_time - 10 * CREATE_TIME_TOLERANCE)])
+    assert report.gone == [pid]
+    assert child.poll() is None
+
+
+def test_zombie_is_reported_as_failure(child, monkeypatch):
+    def terminate(self):
+        raise psutil.ZombieProcess(self.pid)
+    monkeypatch.setattr(psutil.Process, 'terminate', terminate)
+    report = terminate_processes([key(child.pid)])
+    assert report.failed == {child.pid: "僵尸进程"}
+    assert report.gone == []
+
+
+def test_expand_tree_puts_children_first():
+    children = {1: [2, 3], 2: [4]}
+    order = expand_tree([1], children)
+    assert sorted(order) == [1, 2, 3, 4]
+    assert order.index(4) < order.index(2) < order.index(1)
+    assert order.index(3) < order.index(1)
@@ -0,0 +1,46 @@
+import csv
+import io
+
+import pytest
+
+import process_monitor
+from process_collector import ProcessSnapshot, ProcFsCollector
+from process_monitor import CsvWriter
+
+
+def snapshot(t):
+    s = ProcessSnapshot(t)
+    s.append(1, 'init', 'sleeping', 0.5, 100, 1.0, 'root', 0)
+    return s
+
+
+def write_csv(path, t):
+    with open(path, 'a', encoding='utf-8', newline='') as stream:
+        CsvWriter(stream).write(None, snapshot(t), [0])
+
+
+def test_csv_header_written_once_when_appending(tmp_path):
+    path = tmp_path / 'out.csv'
+    write_csv(path, 1)
+    write_csv(path, 2)
+    with open(path, encoding='utf-8', newline='') as f:
+        rows = list(csv.reader(f))
+    assert rows[0][0] == 'timestamp'
+    assert [row[0] for row in rows[1:]] == ['1', '2']
+
+
+def test_csv_header_on_unseekable_stream():
+    class Pipe(io.StringIO):
+        def tell(self):
+            raise io.UnsupportedOperation("tell")
+    stream = Pipe()
+    CsvWriter(stream)
+    assert stream.getvalue().startswith('timestamp,')
+
+
+def test_unavailable_backend_leaves_no_output(tmp_path, monkeypatch):
+    monkeypatch.setattr(ProcFsCollector, 'available', staticmethod(lambda procfs='/proc': False))
+    path = tmp_path / 'out.csv'
+    with pytest.raises(SystemExit):
+        process_monitor.main(['--backend', 'procfs', '--output', str(path)])
+    assert not path.exists()
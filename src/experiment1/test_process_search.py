@@ -0,0 +1,113 @@
+import re
+
+import pytest
+
+from process_search import ProcessQuery, ProcessSearchIndex
+
+
+@pytest.mark.parametrize('text, kind, value', [
+    ('', 'all', None),
+    ('   ', 'all', None),
+    ('Python', 'text', 'python'),
+    ('pid: 42', 'pid', 42),
+    ('PID:7', 'pid', 7),
+    ('user:Root', 'user', 'root'),
+])
+def test_query_kinds(text, kind, value):
+    query = ProcessQuery(text)
+    assert query.kind == kind
+    assert query.value == value
+    assert query.error is None
+
+
+def test_query_regex_forms():
+    for text in ('re:^py', '/^py/'):
+        query = ProcessQuery(text)
+        assert query.kind == 'regex'
+        assert query.value.pattern == '^py'
+        assert query.value.flags & re.IGNORECASE
+
+
+@pytest.mark.parametrize('text', ['pid:abc', 're:(', '/[/'])
+def test_query_errors_match_nothing(text):
+    query = ProcessQuery(text)
+    assert query.error
+    assert not query.matches(1, 'abc', 'root')
+
+
+def test_query_matches():
+    assert ProcessQuery('').matches(1, 'x', '')
+    assert ProcessQuery('ytho').matches(1, 'python', '')
+    assert ProcessQuery('123').matches(123, 'bash', '')
+    assert not ProcessQuery('123').matches(12, 'bash', '')
+    assert ProcessQuery('user:oo').matches(1, 'bash', 'root')
+    assert ProcessQuery('/^ba/').matches(1, 'bash', '')
+
+
+def make_index():
+    index = ProcessSearchIndex()
+    index.add(1, 'systemd', 'root')
+    index.add(2, 'Python3', 'alice')
+    index.add(3, 'python3', 'bob')
+    index.add(4, 'bash', 'alice')
+    index.add(123, 'nginx', 'www-data')
+    return index
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('python', {2, 3}),
+    ('yth', {2, 3}),
+    ('th', {2, 3}),        # 少于三个字符时逐个名称比较
+    ('zzz', set()),
+    ('pythonx', set()),
+    ('123', {123}),        # 纯数字同时匹配 PID
+    ('pid:4', {4}),
+    ('pid:99', set()),
+    ('user:ali', {2, 4}),
+    ('re:^(bash|nginx)$', {4, 123}),
+    ('re:(', set()),
+])
+def test_search(text, expected):
+    assert make_index().search(ProcessQuery(text)) == expected
+
+
+def test_search_agrees_with_query_matches():
+    index = make_index()
+    info = {1: ('systemd', 'root'), 2: ('python3', 'alice'), 3: ('python3', 'bob'),
+            4: ('bash', 'alice'), 123: ('nginx', 'www-data')}
+    for text in ('sys', 'on3', 'a', 'ng', 'user:b', '/h$/', '12'):
+        query = ProcessQuery(text)
+        expected = {pid for pid, (name, user) in info.items() if query.matches(pid, name, user)}
+        assert index.search(query) == expected, text
+
+
+def test_remove_drops_unused_trigrams():
+    index = make_index()
+    index.remove(2)
+    assert index.search(ProcessQuery('python')) == {3}
+    index.remove(3)
+    assert index.search(ProcessQuery('python')) == set()
+    assert 'pyt' not in index._trigrams
+    index.remove(3)   # 重复删除不报错
+    assert len(index) == 3
+
+
+def test_readd_replaces_name():
+    index = make_index()
+    index.add(4, 'zsh', 'alice')
+    assert index.search(ProcessQuery('bash')) == set()
+    assert index.search(ProcessQuery('zsh')) == {4}
+    assert len(index) == 5
+
+
+def test_result_set_follows_add_and_remove():
+    index = make_index()
+    index.set_query(ProcessQuery('python'))
+    assert index.result == {2, 3}
+    index.add(5, 'ipython', 'carol')
+    index.add(6, 'perl', 'carol')
+    assert index.result == {2, 3, 5}
+    index.remove(2)
+    assert index.result == {3, 5}
+    index.set_query(ProcessQuery(''))
+    assert index.result is None
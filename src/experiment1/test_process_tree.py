@@ -0,0 +1,146 @@
+import random
+
+import pytest
+
+from process_collector import ProcessSnapshot
+from process_tree import ProcessTreeModel
+
+
+def make_snapshot(procs):
+    """procs: {pid: (ppid, cpu, rss)}"""
+    snapshot = ProcessSnapshot(0.0)
+    for pid, (ppid, cpu, rss) in procs.items():
+        snapshot.append(pid, f"p{pid}", 'running', cpu, rss, 1.0, 'root', ppid)
+    return snapshot
+
+
+def check(model, procs):
+    """合计值与完整重算一致，行号和父子关系自洽"""
+    totals = model.recompute_totals()
+    assert set(totals) == set(procs)
+    for pid, (cpu, rss) in totals.items():
+        node = model._nodes[pid]
+        assert node.total_cpu == pytest.approx(cpu)
+        assert node.total_rss == rss
+    stack = [model._root]
+    while stack:
+        node = stack.pop()
+        for row, child in enumerate(node.children):
+            assert child.row == row
+            assert child.parent is node
+            stack.append(child)
+
+
+def test_totals_sum_descendants():
+    procs = {1: (0, 1.0, 100), 2: (1, 2.0, 200), 3: (2, 4.0, 400), 4: (1, 8.0, 800)}
+    model = ProcessTreeModel()
+    model.update_snapshot(make_snapshot(procs))
+    check(model, procs)
+    assert model._nodes[1].total_cpu == 15.0
+    assert model._nodes[2].total_rss == 600
+    assert model.rowCount() == 1
+
+
+def test_value_changes_propagate_to_ancestors():
+    procs = {1: (0, 1.0, 100), 2: (1, 2.0, 200), 3: (2, 4.0, 400)}
+    model = ProcessTreeModel()
+    model.update_snapshot(make_snapshot(procs))
+    procs[3] = (2, 10.0, 1000)
+    model.update_snapshot(make_snapshot(procs))
+    check(model, procs)
+    assert model._nodes[1].total_cpu == 13.0
+
+
+def test_leaf_exit_and_new_children():
+    procs = {1: (0, 1.0, 100), 2: (1, 2.0, 200), 3: (1, 4.0, 400)}
+    model = ProcessTreeModel()
+    model.update_snapshot(make_snapshot(procs))
+    del procs[2]
+    procs[5] = (3, 1.5, 50)
+    procs[6] = (1, 0.5, 10)
+    model.update_snapshot(make_snapshot(procs))
+    check(model, procs)
+    assert [child.pid for child in model._nodes[1].children] == [3, 6]
+
+
+def test_parent_exit_moves_children_to_root():
+    procs = {1: (0, 1.0, 100), 2: (1, 2.0, 200), 3: (2, 4.0, 400)}
+    model = ProcessTreeModel()
+    model.update_snapshot(make_snapshot(procs))
+    del procs[2]
+    model.update_snapshot(make_snapshot(procs))
+    check(model, procs)
+    assert model._nodes[3].parent is model._root
+    assert model._nodes[1].total_cpu == 1.0
+
+
+def test_child_seen_before_parent_is_adopted():
+    model = ProcessTreeModel()
+    procs = {1: (0, 1.0, 100), 7: (5, 2.0, 200)}
+    model.update_snapshot(make_snapshot(procs))
+    assert model._nodes[7].parent is model._root
+    procs[5] = (1, 4.0, 400)
+    model.update_snapshot(make_snapshot(procs))
+    check(model, procs)
+    assert model._nodes[7].parent is model._nodes[5]
+    assert model._nodes[1].total_cpu == 7.0
+
+
+def test_reparent_moves_subtree():
+    procs = {1: (0, 1.0, 100), 2: (1, 2.0, 200), 3: (2, 4.0, 400), 9: (0, 8.0, 800)}
+    model = ProcessTreeModel()
+    model.update_snapshot(make_snapshot(procs))
+    procs[2] = (9, 2.0, 200)
+    model.update_snapshot(make_snapshot(procs))
+    check(model, procs)
+    assert model._nodes[9].total_cpu == 14.0
+    assert model._nodes[1].total_cpu == 1.0
+
+
+def test_cycle_does_not_loop():
+    procs = {1: (2, 1.0, 100), 2: (1, 2.0, 200)}
+    model = ProcessTreeModel()
+    model.update_snapshot(make_snapshot(procs))
+    check(model, procs)
+
+
+def random_rounds(rng, churn, simple, rounds=30):
+    """随机生成一串快照；simple 时只有叶子退出、新进程挂到已有进程下、父进程不变"""
+    procs = {1: (0, 0.0, 0)}
+    next_pid = 2
+    for _ in range(rounds):
+        parents = {ppid for ppid, _, _ in procs.values()}
+        candidates = [pid for pid in procs if pid != 1 and not (simple and pid in parents)]
+        for pid in rng.sample(candidates, min(churn // 2, len(candidates))):
+            del procs[pid]
+        existing = list(procs)
+        for _ in range(churn):
+            procs[next_pid] = (rng.choice(existing if simple else list(procs)), 0.0, 0)
+            next_pid += 1
+        for pid in rng.sample(list(procs), min(5, len(procs))):
+            ppid = procs[pid][0]
+            if not simple and rng.random() < 0.3:
+                ppid = rng.choice(list(procs))   # 换父进程，也可能形成环
+            procs[pid] = (ppid, round(rng.random() * 10, 1), rng.randrange(1 << 20))
+        yield dict(procs)
+
+
+# 少量且简单的变化走按父节点逐区间发出信号的路径，其余走一次布局变化
+@pytest.mark.parametrize('churn, simple', [(3, True), (3, False), (200, False)])
+def test_random_churn_matches_recompute(churn, simple):
+    model = ProcessTreeModel()
+    for procs in random_rounds(random.Random(churn), churn, simple):
+        model.update_snapshot(make_snapshot(procs))
+        check(model, procs)
+
+
+def test_reused_pid_updates_create_time():
+    # 数值、名称和父进程都不变的 PID 复用：选中时取到的键必须是新进程的
+    procs = {1: (0, 1.0, 100), 2: (1, 2.0, 200)}
+    model = ProcessTreeModel()
+    model.update_snapshot(make_snapshot(procs))
+    snapshot = make_snapshot(procs)
+    snapshot.create_time[1] = 5.0
+    model.update_snapshot(snapshot)
+    index = model.index(0, 0, model.index(0, 0))
+    assert model.key_at_index(index) == (2, 5.0)
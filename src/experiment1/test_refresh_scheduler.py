@@ -0,0 +1,59 @@
+import pytest
+from PyQt5 import QtCore
+
+from refresh_scheduler import ACTIVE, HIDDEN, UNFOCUSED, RefreshScheduler
+
+
+@pytest.fixture
+def scheduler():
+    # interval_for 只依赖 state、watching 和各通道的参数，不需要真实窗口
+    scheduler = RefreshScheduler(QtCore.QObject(), budget=0)
+    scheduler.add_channel('system', lambda: None, 1000, hidden_interval=10000)
+    scheduler.add_channel('processes', lambda: None, 2000, watching_interval=500)
+    scheduler.add_channel('cores', lambda: None, 1000, unfocused_factor=5)
+    return scheduler
+
+
+def intervals(scheduler):
+    return {name: scheduler.interval_for(channel)
+            for name, channel in scheduler.channels.items()}
+
+
+def test_active(scheduler):
+    scheduler.state = ACTIVE
+    assert intervals(scheduler) == {'system': 1000, 'processes': 2000, 'cores': 1000}
+
+
+def test_unfocused_slows_down(scheduler):
+    scheduler.state = UNFOCUSED
+    assert intervals(scheduler) == {'system': 3000, 'processes': 6000, 'cores': 5000}
+
+
+def test_hidden_pauses_unless_hidden_interval(scheduler):
+    scheduler.state = HIDDEN
+    assert intervals(scheduler) == {'system': 10000, 'processes': None, 'cores': None}
+
+
+def test_watching_only_when_active(scheduler):
+    scheduler.watching = True
+    scheduler.state = ACTIVE
+    assert intervals(scheduler)['processes'] == 500
+    assert intervals(scheduler)['system'] == 1000   # 没有 watching_interval 的通道不变
+    scheduler.state = UNFOCUSED
+    assert intervals(scheduler)['processes'] == 6000
+
+
+def test_budget_floor(scheduler):
+    scheduler.state = ACTIVE
+    scheduler.budget = 0.05
+    channel = scheduler.channels['processes']
+    channel.cost = 0.01
+    # 三个通道平分 5% 的预算：0.01 秒 * 3 / 0.05 = 0.6 秒，低于基础间隔时不起作用
+    assert scheduler.interval_for(channel) == 2000
+    channel.cost = 0.1
+    assert scheduler.interval_for(channel) == 6000
+    scheduler.state = HIDDEN
+    assert scheduler.interval_for(channel) is None   # 暂停优先于预算
+    scheduler.budget = 0
+    scheduler.state = ACTIVE
+    assert scheduler.interval_for(channel) == 2000   # 预算为 0 表示不限制
@@ -0,0 +1,208 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+import process_agent
+import remote_hosts
+from process_agent import ProcessAgent
+from process_collector import ProcessSnapshot
+from remote_hosts import HOST_PID_STRIDE, RemoteCollector
+from snapshot_recorder import DELTA, KEYFRAME, SnapshotEncoder
+
+TOKEN = 'secret'
+
+
+class FakeCollector(object):
+    """按 procs 生成快照：{pid: (ppid, cpu, rss)}"""
+
+    def __init__(self, procs):
+        self.columns = ()
+        self.procs = procs
+
+    def collect(self):
+        snapshot = ProcessSnapshot(columns=self.columns)
+        for pid, (ppid, cpu, rss) in self.procs.items():
+            snapshot.append(pid, f"p{pid}", 'running', cpu, rss, 100.0 + pid, 'root', ppid)
+            snapshot.append_extra(None)
+        return snapshot
+
+
+class AgentLoop(object):
+    """在后台线程的事件循环中运行进程代理，RemoteCollector 有自己的循环线程"""
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+        self.servers = []
+
+    def call(self, coroutine):
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result(5)
+
+    def start(self, procs, port=0):
+        agent = ProcessAgent(min_interval=0, token=TOKEN)
+        agent.collector = FakeCollector(procs)
+        server = self.call(agent.start('127.0.0.1', port))
+        self.servers.append(server)
+        return agent, server.sockets[0].getsockname()[1]
+
+    def stop(self, server):
+        """停止监听，已建立的连接不受影响"""
+        self.loop.call_soon_threadsafe(server.close)
+        while server.is_serving():
+            time.sleep(0.01)
+
+    def close(self):
+        for server in self.servers:
+            self.stop(server)
+        self.call(self._shutdown())
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+
+    async def _shutdown(self):
+        """结束仍在处理的连接，关闭采集用的线程池"""
+        tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await self.loop.shutdown_default_executor()
+
+
+@pytest.fixture
+def agents():
+    agents = AgentLoop()
+    yield agents
+    agents.close()
+
+
+@pytest.fixture
+def collectors():
+    created = []
+
+    def make(ports, token=TOKEN, timeout=2.0):
+        collector = RemoteCollector([('127.0.0.1', port) for port in ports], token, timeout)
+        created.append(collector)
+        return collector
+    yield make
+    for collector in created:
+        collector.close()
+
+
+@pytest.fixture
+def kinds(monkeypatch):
+    """记录代理编码出的进程帧类型"""
+    kinds = []
+
+    class SpyEncoder(SnapshotEncoder):
+        def encode(self, snapshot):
+            kind, payload = super().encode(snapshot)
+            kinds.append(kind)
+            return kind, payload
+    monkeypatch.setattr(process_agent, 'SnapshotEncoder', SpyEncoder)
+    return kinds
+
+
+def rows(snapshot):
+    return {snapshot.pid[i]: (snapshot.ppid[i], snapshot.cpu[i], snapshot.rss[i],
+                              snapshot.extra['host'][i])
+            for i in range(len(snapshot))}
+
+
+def test_good_token_is_accepted(agents, collectors):
+    agent, port = agents.start({1: (0, 0.0, 100)})
+    collector = collectors([port])
+    assert rows(collector.collect()) == {1: (0, 0.0, 100, agent.hostname)}
+    assert collector.errors() == {}
+    assert agent.connections == 1
+
+
+def test_bad_token_is_rejected(agents, collectors):
+    agent, port = agents.start({1: (0, 0.0, 100)})
+    collector = collectors([port], token='wrong')
+    with pytest.raises(ConnectionError):
+        collector.collect()
+    assert "令牌" in collector.errors()[f"127.0.0.1:{port}"]
+    assert agent.connections == 0
+
+
+def test_keyframe_then_deltas(agents, collectors, kinds):
+    procs = {1: (0, 0.0, 100), 2: (1, 1.5, 200)}
+    agent, port = agents.start(procs)
+    collector = collectors([port])
+    hostname = agent.hostname
+    collector.collect()
+    del procs[1]                      # 进程退出
+    procs[2] = (0, 3.0, 250)          # 数值变化，并在父进程退出后被重新托管
+    procs[3] = (2, 0.5, 50)           # 新进程
+    assert rows(collector.collect()) == {2: (0, 3.0, 250, hostname), 3: (2, 0.5, 50, hostname)}
+    procs[3] = (2, 0.75, 60)
+    assert rows(collector.collect()) == {2: (0, 3.0, 250, hostname), 3: (2, 0.75, 60, hostname)}
+    assert kinds == [KEYFRAME, DELTA, DELTA]
+
+
+def test_hosts_get_separate_pid_ranges(agents, collectors):
+    agent, first = agents.start({1: (0, 0.0, 100), 7: (1, 2.0, 700)})
+    _, second = agents.start({1: (0, 0.0, 10), 7: (1, 1.0, 70), 9: (7, 0.0, 90)})
+    merged = rows(collectors([first, second]).collect())
+    host = agent.hostname
+    assert merged == {
+        1: (0, 0.0, 100, host), 7: (1, 2.0, 700, host),
+        # 第二台主机的 PID 和父 PID 都加上 HOST_PID_STRIDE，根进程的父 PID 0 保持不变
+        HOST_PID_STRIDE + 1: (0, 0.0, 10, host),
+        HOST_PID_STRIDE + 7: (HOST_PID_STRIDE + 1, 1.0, 70, host),
+        HOST_PID_STRIDE + 9: (HOST_PID_STRIDE + 7, 0.0, 90, host),
+    }
+
+
+def count_opens(monkeypatch):
+    opens = []
+    open_connection = remote_hosts.AgentConnection.open.__func__
+
+    async def counting(cls, host, port, token, timeout):
+        opens.append(port)
+        return await open_connection(cls, host, port, token, timeout)
+    monkeypatch.setattr(remote_hosts.AgentConnection, 'open', classmethod(counting))
+    return opens
+
+
+def test_unreachable_host_is_marked_and_retried(agents, collectors, monkeypatch):
+    _, good = agents.start({1: (0, 0.0, 100)})
+    _, down = agents.start({5: (0, 0.0, 500)})
+    agents.stop(agents.servers[-1])
+    collector = collectors([good, down])
+    opens = count_opens(monkeypatch)
+
+    assert set(rows(collector.collect())) == {1}
+    label = f"127.0.0.1:{down}"
+    assert list(collector.errors()) == [label]
+    assert collector.hosts[1].retry_at > time.monotonic()
+    # 重试时间之前不再连接离线主机
+    collector.collect()
+    assert opens.count(down) == 1
+
+    agents.start({5: (0, 0.0, 500)}, port=down)
+    collector.hosts[1].retry_at = 0.0
+    assert set(rows(collector.collect())) == {1, HOST_PID_STRIDE + 5}
+    assert collector.errors() == {}
+    assert opens.count(down) == 2
+
+
+def test_silent_host_times_out(agents, collectors):
+    _, good = agents.start({1: (0, 0.0, 100)})
+
+    async def silent(reader, writer):
+        await reader.read()           # 接受连接但从不回复握手
+        writer.close()
+    server = agents.call(asyncio.start_server(silent, '127.0.0.1', 0))
+    agents.servers.append(server)
+    slow = server.sockets[0].getsockname()[1]
+    collector = collectors([good, slow], timeout=0.2)
+
+    started = time.monotonic()
+    assert set(rows(collector.collect())) == {1}
+    assert time.monotonic() - started < 2
+    assert list(collector.errors()) == [f"127.0.0.1:{slow}"]
+    assert collector.hosts[1].retry_at > time.monotonic()
@@ -0,0 +1,61 @@
+import pytest
+from PyQt5 import QtCore
+
+from process_collector import ProcessSnapshot
+from replay_player import ReplayPlayer
+from snapshot_recorder import DELTA, SnapshotRecorder, encode_frame
+
+
+@pytest.fixture(scope='module')
+def app():
+    return QtCore.QCoreApplication.instance() or QtCore.QCoreApplication([])
+
+
+def play(path, player=None):
+    """同步回放整个文件，返回按顺序收到的 (信号, 值)"""
+    player = player or ReplayPlayer(str(path), speed=1000)
+    events = []
+    player.processesSampled.connect(lambda s: events.append(('snapshot', s.timestamp)))
+    player.sampleFailed.connect(lambda message: events.append(('failed', message)))
+    player.finished.connect(lambda: events.append(('finished', None)))
+    loop = QtCore.QEventLoop()
+    player.finished.connect(loop.quit)
+    QtCore.QTimer.singleShot(5000, loop.quit)
+    player.start()
+    if ('finished', None) not in events:
+        loop.exec_()
+    return events
+
+
+def record(path, deltas):
+    snapshot = ProcessSnapshot(0.0)
+    snapshot.append(1, 'init', 'sleeping', 0.0, 100, 1.0, 'root', 0)
+    recorder = SnapshotRecorder(str(path))
+    recorder.record_snapshot(snapshot)
+    recorder.close()
+    with open(path, 'ab') as f:
+        for payload in deltas:
+            f.write(encode_frame(DELTA, payload))
+
+
+def test_plays_all_frames(app, tmp_path):
+    path = tmp_path / 'rec.pmr'
+    record(path, [{'t': 0.01, 'removed': [], 'added': [], 'changed': [[1, [3, 2.5]]]}])
+    player = ReplayPlayer(str(path), speed=1000)
+    assert [kind for kind, _ in play(path, player)] == ['snapshot', 'snapshot', 'finished']
+    assert player.error is None
+
+
+@pytest.mark.parametrize('payload', [
+    {'t': 0.01, 'added': [], 'changed': []},                                  # 缺少字段
+    {'t': 0.01, 'removed': [], 'added': [], 'changed': [[99, [3, 2.5]]]},     # 未知的 PID
+    {'t': 0.01, 'removed': [], 'added': [], 'changed': [[1, [50, 2.5]]]},     # 列号越界
+    {'t': 0.01, 'removed': [], 'added': [], 'changed': [[1, [4, 2.5]]]},      # 类型不对
+])
+def test_corrupt_delta_reports_failure(app, tmp_path, payload):
+    path = tmp_path / 'rec.pmr'
+    record(path, [payload])
+    player = ReplayPlayer(str(path), speed=1000)
+    events = play(path, player)
+    assert [kind for kind, _ in events] == ['failed', 'snapshot', 'finished']
+    assert player.error == events[0][1]
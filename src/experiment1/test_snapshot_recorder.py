@@ -0,0 +1,133 @@
+import pytest
+
+from process_collector import ProcessSnapshot, SystemSample
+from snapshot_recorder import (DELTA, FRAME, KEYFRAME, MAGIC, SnapshotDecoder, SnapshotEncoder,
+                               SnapshotRecorder, complete_length, decode_payload,
+                               encode_frame, read_frames)
+
+
+def make_snapshot(t, procs, columns=()):
+    """procs: {pid: (cpu, rss)}；可选列的值由 pid 和时间决定"""
+    snapshot = ProcessSnapshot(t, columns=columns)
+    for pid, (cpu, rss) in procs.items():
+        snapshot.append(pid, f"p{pid}", 'running', cpu, rss, 100.0 + pid, 'root', 1)
+        snapshot.append_extra({name: pid + int(t) for name in columns})
+    return snapshot
+
+
+def rows(snapshot):
+    """与行顺序无关的比较形式"""
+    result = {}
+    for i in range(len(snapshot)):
+        extra = tuple(column[i] for _, column in sorted(snapshot.extra.items()))
+        result[snapshot.pid[i]] = snapshot.row(i) + extra
+    return result
+
+
+def snapshots():
+    procs = {1: (0.0, 100), 2: (1.5, 200), 3: (3.0, 300)}
+    result = [make_snapshot(0, procs, ('threads',))]
+    for t in range(1, 8):
+        procs = dict(procs)
+        procs.pop(min(procs))                 # 一个进程退出
+        procs[10 + t] = (0.5, 50 * t)         # 一个进程新出现
+        pid = max(procs)
+        procs[pid] = (procs[pid][0] + 1, procs[pid][1])
+        result.append(make_snapshot(t, procs, ('threads',)))
+    return result
+
+
+def test_encoder_round_trip():
+    encoder = SnapshotEncoder(keyframe_interval=3)
+    decoder = SnapshotDecoder()
+    kinds = []
+    for snapshot in snapshots():
+        kind, payload = encoder.encode(snapshot)
+        kinds.append(kind)
+        frame = encode_frame(kind, payload)
+        kind2, length = FRAME.unpack(frame[:FRAME.size])
+        assert (kind2, length) == (kind, len(frame) - FRAME.size)
+        decoded = decoder.decode(kind, decode_payload(frame[FRAME.size:]))
+        assert decoded.timestamp == snapshot.timestamp
+        assert rows(decoded) == rows(snapshot)
+    assert kinds == [KEYFRAME, DELTA, DELTA, DELTA, KEYFRAME, DELTA, DELTA, DELTA]
+
+
+def test_delta_without_keyframe_is_skipped():
+    encoder = SnapshotEncoder()
+    first, second = snapshots()[:2]
+    encoder.encode(first)
+    kind, payload = encoder.encode(second)
+    assert kind == DELTA
+    assert SnapshotDecoder().decode(kind, payload) is None
+
+
+def test_columns_change_forces_keyframe():
+    encoder = SnapshotEncoder()
+    encoder.encode(make_snapshot(0, {1: (0.0, 1)}))
+    kind, _ = encoder.encode(make_snapshot(1, {1: (0.0, 1)}, ('nice',)))
+    assert kind == KEYFRAME
+
+
+def record(path, items, keyframe_interval=3):
+    recorder = SnapshotRecorder(str(path), keyframe_interval)
+    for item in items:
+        if isinstance(item, SystemSample):
+            recorder.record_system(item)
+        else:
+            recorder.record_snapshot(item)
+    recorder.close()
+
+
+def test_file_round_trip(tmp_path):
+    path = tmp_path / 'rec.pmr'
+    system = SystemSample(0.5, 12.5, 1000, 400, 40.0, 3)
+    items = snapshots()
+    record(path, [items[0], system] + items[1:])
+    frames = list(read_frames(str(path)))
+    assert frames[1] == system
+    assert [rows(frame) for frame in frames[:1] + frames[2:]] == [rows(s) for s in items]
+
+
+def test_reopen_starts_with_keyframe(tmp_path):
+    path = tmp_path / 'rec.pmr'
+    items = snapshots()
+    record(path, items[:4], keyframe_interval=100)
+    record(path, items[4:], keyframe_interval=100)
+    assert [rows(frame) for frame in read_frames(str(path))] == [rows(s) for s in items]
+
+
+@pytest.mark.parametrize('tail', [b'K', FRAME.pack(DELTA, 1000) + b'x' * 10,
+                                  FRAME.pack(b'?', 0)])
+def test_torn_tail_is_ignored_and_truncated(tmp_path, tail):
+    path = tmp_path / 'rec.pmr'
+    items = snapshots()
+    record(path, items[:4])
+    size = path.stat().st_size
+    with open(path, 'ab') as f:
+        f.write(tail)
+    with open(path, 'rb') as f:
+        assert complete_length(f) == size
+    # 读取时忽略不完整或帧头损坏的尾部
+    assert [rows(frame) for frame in read_frames(str(path))] == [rows(s) for s in items[:4]]
+    # 继续录制前截掉尾部，之后写入的帧仍能正常读出
+    record(path, items[4:])
+    assert [rows(frame) for frame in read_frames(str(path))] == [rows(s) for s in items]
+
+
+def test_partial_magic_is_rewritten(tmp_path):
+    path = tmp_path / 'rec.pmr'
+    path.write_bytes(MAGIC[:3])
+    record(path, snapshots()[:1])
+    assert path.read_bytes().startswith(MAGIC)
+    assert len(list(read_frames(str(path)))) == 1
+
+
+def test_foreign_file_is_left_alone(tmp_path):
+    path = tmp_path / 'notes.txt'
+    path.write_bytes(b'hello world\n')
+    with pytest.raises(ValueError):
+        SnapshotRecorder(str(path))
+    with pytest.raises(ValueError):
+        list(read_frames(str(path)))
+    assert path.read_bytes() == b'hello world\n'
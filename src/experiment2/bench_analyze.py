@@ -0,0 +1,94 @@
+"""文本分析基准：比较逐字符多次遍历的旧实现与查表的单次遍历实现（char_classes）"""
+import argparse
+import random
+import sys
+import time
+
+from char_classes import (CHINESE, CJK_PUNCT, DIGIT, HANGUL, HIRAGANA, KATAKANA, LETTER,
+                          OTHER, CharClassifier)
+
+SIZES = {'1K': 1 << 10, '1M': 1 << 20, '100M': 100 << 20}
+
+# 合成语料的字符来源：常用汉字、ASCII、全角和其他脚本的字母数字、标点与空白
+POOLS = [
+    (0.55, [chr(c) for c in range(0x4e00, 0x9fa6)]),
+    (0.20, list("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ")),
+    (0.08, list("0123456789")),
+    (0.10, list("，。！？、；：“”（）  ,.!?;:-\n")),
+    (0.07, list("ａｂｃＡＢＣ１２３¹²③αβγДжあいうカキ한국")),
+]
+
+
+def make_corpus(size, seed=0):
+    """生成 size 个字符的文本：先随机生成 64K 字符的块，再重复拼接"""
+    rng = random.Random(seed)
+    weights = [weight for weight, chars in POOLS]
+    pools = [chars for weight, chars in POOLS]
+    block = ''.join(rng.choice(pools[rng.choices(range(len(pools)), weights)[0]])
+                    for _ in range(min(size, 1 << 16)))
+    return (block * (size // len(block) + 1))[:size]
+
+
+def is_chinese(char):
+    return '\u4e00' <= char <= '\u9fff'
+
+
+def analyze_legacy(text):
+    """原实现：四次生成器遍历，逐字符调用判断函数"""
+    chinese = sum(1 for c in text if is_chinese(c))
+    digit = sum(1 for c in text if c.isdigit())
+    letter = sum(1 for c in text if c.isalpha() and not is_chinese(c))
+    return chinese, digit, letter, len(text) - chinese - digit - letter
+
+
+def analyze_table(text, classifier):
+    """查表实现；为了与旧实现对比，假名、谚文并入字母，中日韩标点并入其他字符
+    （合成语料中的汉字都在基本区，两者的汉字计数相同）"""
+    counts = classifier.count(text)
+    letter = counts[LETTER] + counts[HIRAGANA] + counts[KATAKANA] + counts[HANGUL]
+    return (int(counts[CHINESE]), int(counts[DIGIT]), int(letter),
+            int(counts[OTHER] + counts[CJK_PUNCT]))
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="文本分析基准")
+    parser.add_argument("sizes", nargs="*", default=list(SIZES),
+                        help="语料大小：" + "、".join(SIZES))
+    parser.add_argument("--skip-legacy", action="store_true",
+                        help="不运行旧实现（100M 语料上需要较长时间）")
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.sizes if name not in SIZES]
+    if unknown:
+        parser.error("未知的语料大小: " + ",".join(unknown))
+
+    classifier = CharClassifier()
+    cold, _ = timed(analyze_table, make_corpus(1 << 16, seed=1), classifier)
+    print(f"首次填充查找表（64K 字符）：{cold * 1000:.1f} ms")
+    print(f"{'语料':>6} {'旧实现(s)':>10} {'查表(s)':>9} {'加速':>7} {'查表(M字符/s)':>11}")
+    failed = False
+    for name in args.sizes:
+        text = make_corpus(SIZES[name])
+        table_time, table_result = timed(analyze_table, text, classifier)
+        if args.skip_legacy:
+            legacy = "-"
+            speedup = "-"
+        else:
+            legacy_time, legacy_result = timed(analyze_legacy, text)
+            if legacy_result != table_result:
+                print(f"结果不一致：{legacy_result} != {table_result}")
+                failed = True
+            legacy = f"{legacy_time:.4f}"
+            speedup = f"{legacy_time / table_time:.1f}x"
+        rate = SIZES[name] / (1 << 20) / table_time
+        print(f"{name:>8} {legacy:>12} {table_time:>10.4f} {speedup:>8} {rate:>12.1f}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,172 @@
+"""字符分类引擎：按码位查表，对整段文本只遍历一次就统计出各类字符的数量
+
+汉字、假名、谚文和中日韩标点由下面内嵌的区间表决定，导入时一次性写入码位查找表；
+数字和字母仍按 str.isdigit / str.isalpha 判断，某个码位第一次出现时才计算并缓存。
+区间表按 Unicode 区块划分（平假名和片假名混排的假名区块按实际文字拆分），
+不依赖当前 Python 自带的 Unicode 数据版本。
+"""
+from bisect import bisect_right
+
+import numpy as np
+
+# 字符类别，数值即统计数组中的下标
+(OTHER, CHINESE, DIGIT, LETTER,
+ HIRAGANA, KATAKANA, HANGUL, CJK_PUNCT) = range(8)
+CLASS_NAMES = ("其他字符", "汉字", "数字", "字母",
+               "平假名", "片假名", "谚文", "中日韩标点")
+# 统计结果中各类别的键名
+CLASS_KEYS = ("other", "chinese", "digit", "letter",
+              "hiragana", "katakana", "hangul", "cjk_punct")
+
+# 码位总数（0 ~ U+10FFFF）
+CODE_POINTS = 0x110000
+# 表中尚未计算的码位
+_UNKNOWN = 255
+# 每次转换和查表的字符数，限制大文本处理时的临时内存
+CHUNK_SIZE = 1 << 20
+
+# 中日韩字符区间表：(起始码位, 结束码位（含）, 类别)，按起始码位排序且互不重叠
+CJK_RANGES = (
+    (0x1100, 0x11FF, HANGUL),       # 谚文字母
+    (0x3000, 0x3004, CJK_PUNCT),    # 中日韩符号和标点（其中的汉字另列）
+    (0x3005, 0x3005, CHINESE),      # 々
+    (0x3006, 0x3006, CJK_PUNCT),
+    (0x3007, 0x3007, CHINESE),      # 〇
+    (0x3008, 0x3020, CJK_PUNCT),
+    (0x3021, 0x3029, CHINESE),      # 苏州码子
+    (0x302A, 0x3037, CJK_PUNCT),
+    (0x3038, 0x303B, CHINESE),
+    (0x303C, 0x303F, CJK_PUNCT),
+    (0x3040, 0x309F, HIRAGANA),
+    (0x30A0, 0x30FF, KATAKANA),
+    (0x3130, 0x318F, HANGUL),       # 谚文兼容字母
+    (0x31F0, 0x31FF, KATAKANA),     # 片假名语音扩展
+    (0x3400, 0x4DBF, CHINESE),      # 扩展 A
+    (0x4E00, 0x9FFF, CHINESE),      # 基本区
+    (0xA960, 0xA97F, HANGUL),       # 谚文字母扩展 A
+    (0xAC00, 0xD7AF, HANGUL),       # 谚文音节
+    (0xD7B0, 0xD7FF, HANGUL),       # 谚文字母扩展 B
+    (0xF900, 0xFAFF, CHINESE),      # 兼容汉字
+    (0xFE10, 0xFE1F, CJK_PUNCT),    # 竖排标点
+    (0xFE30, 0xFE4F, CJK_PUNCT),    # 中日韩兼容形式
+    (0xFF01, 0xFF0F, CJK_PUNCT),    # 全角标点（全角字母和数字仍按字母、数字统计）
+    (0xFF1A, 0xFF20, CJK_PUNCT),
+    (0xFF3B, 0xFF40, CJK_PUNCT),
+    (0xFF5B, 0xFF65, CJK_PUNCT),    # 含半角中日韩标点
+    (0xFF66, 0xFF9F, KATAKANA),     # 半角片假名
+    (0xFFA0, 0xFFDC, HANGUL),       # 半角谚文
+    (0x1AFF0, 0x1AFFF, KATAKANA),   # 假名扩展 B
+    (0x1B000, 0x1B000, KATAKANA),   # 假名补充：古体片假名 e
+    (0x1B001, 0x1B11F, HIRAGANA),   # 假名补充、假名扩展 A：变体假名和古体平假名
+    (0x1B120, 0x1B122, KATAKANA),   # 假名扩展 A：古体片假名
+    (0x1B132, 0x1B132, HIRAGANA),   # 小写假名扩展：小写平假名 ko
+    (0x1B150, 0x1B152, HIRAGANA),   # 小写平假名 wi、we、wo
+    (0x1B155, 0x1B155, KATAKANA),   # 小写片假名 ko
+    (0x1B164, 0x1B167, KATAKANA),   # 小写片假名 wi、we、wo、n
+    (0x20000, 0x2A6DF, CHINESE),    # 扩展 B
+    (0x2A700, 0x2B73F, CHINESE),    # 扩展 C
+    (0x2B740, 0x2B81F, CHINESE),    # 扩展 D
+    (0x2B820, 0x2CEAF, CHINESE),    # 扩展 E
+    (0x2CEB0, 0x2EBEF, CHINESE),    # 扩展 F
+    (0x2EBF0, 0x2EE5F, CHINESE),    # 扩展 I
+    (0x2F800, 0x2FA1F, CHINESE),    # 兼容汉字补充
+    (0x30000, 0x3134F, CHINESE),    # 扩展 G
+    (0x31350, 0x323AF, CHINESE),    # 扩展 H
+    (0x323B0, 0x3347F, CHINESE),    # 扩展 J
+)
+_RANGE_STARTS = [start for start, end, cls in CJK_RANGES]
+
+
+def cjk_class(code):
+    """在区间表中二分查找码位的类别，不属于任何区间时返回 None"""
+    i = bisect_right(_RANGE_STARTS, code) - 1
+    if i >= 0 and code <= CJK_RANGES[i][1]:
+        return CJK_RANGES[i][2]
+    return None
+
+
+def classify_char(char):
+    """按单个字符判断类别：先查中日韩区间表，其次数字、字母"""
+    cls = cjk_class(ord(char))
+    if cls is not None:
+        return cls
+    if char.isdigit():
+        return DIGIT
+    if char.isalpha():
+        return LETTER
+    return OTHER
+
+
+def join_surrogates(text):
+    """把成对出现的 UTF-16 代理码位合并为一个字符（例如来自 UTF-16 数据的扩展 B 汉字），
+    孤立的代理码位保持不变"""
+    return text.encode('utf-16-le', 'surrogatepass').decode('utf-16-le', 'surrogatepass')
+
+
+def code_points(text):
+    """把字符串转换为码位数组（UTF-32 编码后零拷贝解释为 uint32）"""
+    # surrogatepass：保留字符串中孤立的代理码位，而不是抛出异常
+    return np.frombuffer(text.encode('utf-32-le', 'surrogatepass'), dtype=np.uint32)
+
+
+def _is_high_surrogate(char):
+    return '\ud800' <= char <= '\udbff'
+
+
+class CharClassifier(object):
+    """码位 -> 类别的查找表；区间表中的字符在创建时写入，其余码位第一次出现时才计算"""
+
+    def __init__(self):
+        self.table = np.full(CODE_POINTS, _UNKNOWN, dtype=np.uint8)
+        for start, end, cls in CJK_RANGES:
+            self.table[start:end + 1] = cls
+
+    def classify(self, char):
+        code = ord(char)
+        cls = self.table[code]
+        if cls == _UNKNOWN:
+            cls = self.table[code] = classify_char(char)
+        return int(cls)
+
+    def is_chinese(self, char):
+        return self.table[ord(char)] == CHINESE
+
+    def classes(self, codes):
+        """码位数组 -> 类别数组"""
+        classes = self.table[codes]
+        unknown = classes == _UNKNOWN
+        if unknown.any():
+            # 只对这一批中新出现的不同码位逐个计算，之后同一码位直接查表
+            for code in np.unique(codes[unknown]).tolist():
+                self.table[code] = classify_char(chr(code))
+            classes = self.table[codes]
+        return classes
+
+    def count(self, text, counts=None):
+        """统计各类字符的数量，返回按类别下标排列的数组；成对的代理码位按一个字符统计。
+        传入 counts 时在其基础上累加，便于分段处理流式输入"""
+        if counts is None:
+            counts = np.zeros(len(CLASS_NAMES), dtype=np.int64)
+        start = 0
+        while start < len(text):
+            end = start + CHUNK_SIZE
+            if end < len(text) and _is_high_surrogate(text[end - 1]):
+                end += 1   # 不把一对代理码位拆到两个分段中
+            chunk = text[start:end]
+            codes = code_points(chunk)
+            if ((codes & 0xFFFFF800) == 0xD800).any():
+                codes = code_points(join_surrogates(chunk))
+            counts += np.bincount(self.classes(codes), minlength=len(CLASS_NAMES))
+            start = end
+        return counts
+
+    def count_stream(self, chunks):
+        """统计一串文本片段（例如按块读取的大文件）"""
+        counts = np.zeros(len(CLASS_NAMES), dtype=np.int64)
+        for chunk in chunks:
+            self.count(chunk, counts)
+        return counts
+
+
+# 进程内共用的分类器，导入时按区间表生成一次
+classifier = CharClassifier()
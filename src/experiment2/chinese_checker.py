@@ -2,6 +2,14 @@ from PyQt5 import QtCore, QtGui, QtWidgets
 import sys
 import re
 
+from char_classes import CLASS_KEYS, CLASS_NAMES, classifier, join_surrogates
+
+# 逐字符说明最多列出的字符数，长文本只给出统计结果
+MAX_DETAIL_CHARS = 200
+# 摘要中各类字符的列出顺序
+SUMMARY_ORDER = ("chinese", "digit", "letter", "hiragana", "katakana", "hangul",
+                 "cjk_punct", "other")
+
 class Ui_Dialog(object):
     def setupUi(self, Dialog):
         Dialog.setObjectName("Dialog")
@@ -246,27 +254,21 @@ class Ui_Dialog(object):
         self.regexInputEdit.textChanged.connect(self.on_regex_text_changed)
 
     def is_chinese(self, char):
-        """判断单个字符是否为汉字"""
-        return '\u4e00' <= char <= '\u9fff'
+        """判断单个字符是否为汉字（含扩展 A-I 区和兼容汉字），查表 O(1)"""
+        return classifier.is_chinese(char)
 
     def analyze_text(self, text):
-        """分析文本组成"""
-        total_chars = len(text)
-        if total_chars == 0:
+        """分析文本组成：按码位查表，整段文本只遍历一次"""
+        if not text:
             return None
         
-        chinese_chars = sum(1 for c in text if self.is_chinese(c))
-        digit_chars = sum(1 for c in text if c.isdigit())
-        letter_chars = sum(1 for c in text if c.isalpha() and not self.is_chinese(c))
-        other_chars = total_chars - chinese_chars - digit_chars - letter_chars
-        
-        return {
-            'total': total_chars,
-            'chinese': (chinese_chars, chinese_chars / total_chars * 100),
-            'digit': (digit_chars, digit_chars / total_chars * 100),
-            'letter': (letter_chars, letter_chars / total_chars * 100),
-            'other': (other_chars, other_chars / total_chars * 100)
-        }
+        counts = classifier.count(text)
+        # 成对的代理码位按一个字符统计，总数以分类结果为准
+        total_chars = int(counts.sum())
+        stats = {'total': total_chars}
+        for key, count in zip(CLASS_KEYS, counts.tolist()):
+            stats[key] = (count, count / total_chars * 100)
+        return stats
 
     def get_text_summary(self, stats):
         """生成文本统计摘要"""
@@ -275,14 +277,11 @@ class Ui_Dialog(object):
         
         # 生成主要组成部分的描述
         components = []
-        if stats['chinese'][0] > 0:
-            components.append(f"汉字{stats['chinese'][0]}个({stats['chinese'][1]:.1f}%)")
-        if stats['digit'][0] > 0:
-            components.append(f"数字{stats['digit'][0]}个({stats['digit'][1]:.1f}%)")
-        if stats['letter'][0] > 0:
-            components.append(f"字母{stats['letter'][0]}个({stats['letter'][1]:.1f}%)")
-        if stats['other'][0] > 0:
-            components.append(f"其他字符{stats['other'][0]}个({stats['other'][1]:.1f}%)")
+        for key in SUMMARY_ORDER:
+            count, percent = stats[key]
+            if count > 0:
+                name = CLASS_NAMES[CLASS_KEYS.index(key)]
+                components.append(f"{name}{count}个({percent:.1f}%)")
         
         # 生成文本类型描述
         if stats['chinese'][0] == stats['total']:
@@ -298,7 +297,7 @@ class Ui_Dialog(object):
 
     def check_chinese(self):
         """检查输入文本中的汉字"""
-        text = self.inputEdit.text()
+        text = join_surrogates(self.inputEdit.text())
         if not text:
             self.summaryLabel.setText("请输入文本")
             self.resultLabel.setText("")
@@ -310,12 +309,11 @@ class Ui_Dialog(object):
         
         # 显示详细信息
         result = []
-        for i, char in enumerate(text):
-            char_type = "汉字" if self.is_chinese(char) else (
-                "数字" if char.isdigit() else (
-                "字母" if char.isalpha() else "其他字符"
-            ))
+        for i, char in enumerate(text[:MAX_DETAIL_CHARS]):
+            char_type = CLASS_NAMES[classifier.classify(char)]
             result.append(f"字符 '{char}' (位置 {i+1}) 是{char_type}")
+        if len(text) > MAX_DETAIL_CHARS:
+            result.append(f"……其余 {len(text) - MAX_DETAIL_CHARS} 个字符未逐个列出")
         
         self.resultLabel.setText("\n".join(result))
 
@@ -0,0 +1,120 @@
+import numpy as np
+import pytest
+
+import char_classes
+from char_classes import (CHINESE, CJK_PUNCT, CLASS_NAMES, DIGIT, HANGUL, HIRAGANA, KATAKANA,
+                          LETTER, OTHER, CharClassifier, _UNKNOWN, classify_char, code_points,
+                          join_surrogates)
+
+EXT_B = '\U00020000'              # 扩展 B 汉字
+EXT_B_PAIR = '\ud840\udc00'      # 同一个字的 UTF-16 代理对
+
+
+def counts_of(**expected):
+    counts = [0] * len(CLASS_NAMES)
+    for key, value in expected.items():
+        counts[char_classes.CLASS_KEYS.index(key)] = value
+    return counts
+
+
+@pytest.fixture
+def classifier():
+    return CharClassifier()
+
+
+def test_counts_all_eight_classes(classifier):
+    text = "中文々〇 abcＡ 123１２ ひら カタｶ 한글ㄱ 、。「」！ 😀\t"
+    counts = classifier.count(text)
+    assert counts.dtype == np.int64
+    assert counts.tolist() == counts_of(
+        chinese=4, letter=4, digit=5, hiragana=2, katakana=3, hangul=3, cjk_punct=5,
+        other=9)   # 7 个空格、表情符号和制表符
+
+
+def test_count_matches_classify(classifier):
+    text = "Hello，世界！１２３ｶﾀｶﾅ한국어\U0002B740〇é"
+    counts = classifier.count(text)
+    expected = np.bincount([classify_char(c) for c in text], minlength=len(CLASS_NAMES))
+    assert counts.tolist() == expected.tolist()
+
+
+def test_table_is_filled_lazily(classifier):
+    table = classifier.table
+    assert table[ord('中')] == CHINESE       # 区间表中的码位在创建时写入
+    assert table[ord('a')] == _UNKNOWN
+    assert table[ord('7')] == _UNKNOWN
+    classifier.count("a7a7")
+    assert table[ord('a')] == LETTER
+    assert table[ord('7')] == DIGIT
+    assert table[ord('b')] == _UNKNOWN       # 没有出现过的码位保持未计算
+    assert classifier.classify('b') == LETTER
+    assert table[ord('b')] == LETTER
+
+
+def test_count_accumulates(classifier):
+    counts = classifier.count("ab")
+    classifier.count("中", counts)
+    assert counts.tolist() == counts_of(letter=2, chinese=1)
+    assert classifier.count_stream(["ab", "中", ""]).tolist() == counts.tolist()
+
+
+def test_surrogate_pair_counts_once(classifier):
+    assert classifier.count(EXT_B_PAIR).tolist() == counts_of(chinese=1)
+    assert classifier.count(EXT_B).tolist() == counts_of(chinese=1)
+    # 孤立的代理码位保留为其他字符，不会抛出异常
+    assert classifier.count('\ud840x\udc00').tolist() == counts_of(other=2, letter=1)
+
+
+@pytest.mark.parametrize('prefix', range(0, 9))
+def test_chunk_boundary_keeps_pairs_together(classifier, monkeypatch, prefix):
+    monkeypatch.setattr(char_classes, 'CHUNK_SIZE', 4)
+    # 代理对落在分段边界的各个位置时，结果都与不分段时一致
+    text = 'a' * prefix + EXT_B_PAIR + 'b' + EXT_B_PAIR * 3 + '\ud840'
+    counts = classifier.count(text)
+    assert counts.tolist() == counts_of(letter=prefix + 1, chinese=4, other=1)
+
+
+def test_join_surrogates_and_code_points():
+    assert join_surrogates('x' + EXT_B_PAIR) == 'x' + EXT_B
+    assert join_surrogates('\udc00') == '\udc00'
+    assert code_points('a' + EXT_B).tolist() == [0x61, 0x20000]
+    assert code_points('\ud840').tolist() == [0xD840]
+
+
+@pytest.mark.parametrize('char, cls', [
+    ('中', CHINESE), ('あ', HIRAGANA), ('ア', KATAKANA), ('ｱ', KATAKANA), ('가', HANGUL),
+    ('。', CJK_PUNCT), ('Ａ', LETTER), ('５', DIGIT), ('é', LETTER), ('$', OTHER),
+])
+def test_classify(classifier, char, cls):
+    assert classifier.classify(char) == cls
+    assert classify_char(char) == cls
+
+
+def test_ranges_sorted_and_disjoint():
+    ranges = char_classes.CJK_RANGES
+    assert all(start <= end for start, end, _ in ranges)
+    assert all(a[1] < b[0] for a, b in zip(ranges, ranges[1:]))
+    assert all(cls in (CHINESE, HIRAGANA, KATAKANA, HANGUL, CJK_PUNCT) for _, _, cls in ranges)
+
+
+@pytest.mark.parametrize('code, cls', [
+    (0x4E00, CHINESE), (0x9FFF, CHINESE), (0x20000, CHINESE), (0x323AF, CHINESE),
+    (0x323B0, CHINESE), (0x3347F, CHINESE),         # 扩展 J
+    (0x1B000, KATAKANA),                            # 古体片假名 e
+    (0x1B001, HIRAGANA), (0x1B0FF, HIRAGANA), (0x1B11F, HIRAGANA),
+    (0x1B120, KATAKANA), (0x1B122, KATAKANA),
+    (0x1B132, HIRAGANA), (0x1B150, HIRAGANA), (0x1B152, HIRAGANA),
+    (0x1B155, KATAKANA), (0x1B164, KATAKANA), (0x1B167, KATAKANA),
+    (0x1AFF0, KATAKANA), (0x31F0, KATAKANA), (0xFF66, KATAKANA),
+    (0x3005, CHINESE), (0x3006, CJK_PUNCT), (0xFF01, CJK_PUNCT),
+    (0x1100, HANGUL), (0xAC00, HANGUL),
+])
+def test_range_table(classifier, code, cls):
+    assert char_classes.cjk_class(code) == cls
+    assert classifier.table[code] == cls
+
+
+@pytest.mark.parametrize('code', [0x1B123, 0x1B131, 0x1B156, 0x1B168, 0x1B170, 0x33480, 0xFF10])
+def test_outside_range_table(code):
+    # 区块中未分配的码位、女书和全角数字都不在区间表中，按通用规则判断
+    assert char_classes.cjk_class(code) is None